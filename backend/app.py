@@ -1,16 +1,25 @@
-import threading
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import codecs
 import os
 from dotenv import load_dotenv
 from services.llm_chosen import LLMRouter
 
 from classifier.model_classifier import ModelRouter
-from vector_store import PineconeVectorStore
+from config import Config
+from vector_store import create_vector_store
+from vector_store.chunking import StreamingChunker
+from vector_store.ingestion import get_ingestion_service
+from vector_store.retention import get_retention_service
+from vector_store.model_registry import get_model_registry, preload_models
 
 # Load environment variables
 load_dotenv()
 
+# Load shared models before gunicorn forks its workers
+if Config.PRELOAD_MODELS:
+    preload_models()
+
 app = Flask(__name__)
 CORS(app)
 
@@ -21,11 +30,17 @@ previous_output = ""
 vector_store = None # TODO: replace with uid
 llm_router = None
 
+# Vector types a client may tag posted context with
+CONTEXT_TYPES = ("context", "conversation")
+
 def initialize_model_router():
     """Initialize the model router asynchronously"""
     global model_router
     try:
-        model_router = ModelRouter()
+        router = ModelRouter()
+        if Config.ROUTER_WARMUP:
+            router.warm_up()
+        model_router = router
         print("Model router initialized successfully")
         return True
     except Exception as e:
@@ -39,9 +54,11 @@ def initialize_vector_store():
     global vector_store
 
     try:
-        vector_store = PineconeVectorStore(index_name=f"alerihglhiuaerg")
+        vector_store = create_vector_store(index_name=f"alerihglhiuaerg")
+        get_retention_service(vector_store)
         return True
     except Exception as e:
+        print(f"Error initializing vector store: {e}")
         vector_store = None
         return False
 
@@ -68,6 +85,23 @@ def health_check():
         "model_router": router_status
     })
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Runtime statistics for sizing caches and queues"""
+    global vector_store, model_router
+    if vector_store is None:
+        return jsonify({"error": "Vector store not initialized"}), 500
+    return jsonify({
+        "embedding_cache": vector_store.embedding_manager.cache_stats(),
+        "embedding_batcher": vector_store.embedding_manager.batch_stats(),
+        "ingestion": get_ingestion_service(vector_store).stats(),
+        "retrieval_cache": vector_store.retrieval_cache.stats() if vector_store.retrieval_cache else {},
+        "retention": get_retention_service(vector_store).stats(),
+        "hot_tier": vector_store.hot_tier.stats() if vector_store.hot_tier else {},
+        "router": model_router.stats() if model_router is not None else {},
+        "models": get_model_registry().stats()
+    })
+
 @app.route('/api/get_voice_llm', methods=['GET'])
 def get_llm():
     """Get the LLM for """
@@ -99,7 +133,8 @@ def get_context():
         })
     else:
         user_prompt = "Help me answer general questions"
-        results = vector_store.query(user_prompt, top_k=7)
+        uid = request.args.get('uid', '')
+        results = vector_store.query(user_prompt, top_k=7, namespace=uid)
 
         context_parts = []
         for result in results:
@@ -109,6 +144,15 @@ def get_context():
             "context": "\n".join(context_parts)
         })
 
+def create_context_chunker():
+    """Chunker that splits context into pieces the embedding model can embed whole"""
+    embedding_manager = vector_store.embedding_manager
+    return StreamingChunker(
+        max_tokens=min(Config.CONTEXT_CHUNK_TOKENS, embedding_manager.max_tokens - 2),
+        overlap_tokens=Config.CONTEXT_CHUNK_OVERLAP_TOKENS,
+        count_tokens=embedding_manager.count_tokens
+    )
+
 @app.route('/api/post_context', methods=['POST'])
 def post_context():
     """Post the context for the user"""
@@ -120,18 +164,30 @@ def post_context():
     else:
         data = request.get_json()
         context = data.get('context', '')
+        uid = data.get('uid', '')
+        # Voice turns are posted as "conversation" so retention policies for turns apply to them
+        context_type = data.get('type', 'context')
+        if not context:
+            return jsonify({"error": "No context provided"}), 400
+        if context_type not in CONTEXT_TYPES:
+            return jsonify({"error": f"Unsupported context type: {context_type}"}), 400
         try:
-            def ingest_worker():
-                try:
-                    assert vector_store is not None
-                    vector_store.upsert_texts([context])
-                    print(f"✅ Context ingested asynchronously: {context[:50]}...")
-                except Exception as e:
-                    print(f"❌ Error ingesting context asynchronously: {e}")
-            
-            # Start ingestion in background thread
-            thread = threading.Thread(target=ingest_worker, daemon=True)
-            thread.start()
+            # Queue each chunk for background ingestion; rejected up front when the queue
+            # cannot take them all, so a retry does not repeat a partially queued context
+            chunker = create_context_chunker()
+            service = get_ingestion_service(vector_store)
+            chunks = chunker.feed(context) + chunker.close()
+            if service.free_slots() < len(chunks):
+                return jsonify({
+                    "error": "Context could not be queued for ingestion, try again later",
+                    "chunks_queued": 0
+                }), 503
+            for queued, chunk in enumerate(chunks):
+                if not service.submit(chunk, namespace=uid, metadata={"type": context_type}):
+                    return jsonify({
+                        "error": "Context could not be queued for ingestion, try again later",
+                        "chunks_queued": queued
+                    }), 503
             
         except Exception as e:
             print(f"Error starting async context ingestion: {e}")
@@ -141,6 +197,63 @@ def post_context():
             "message": "Context posted successfully"
         })
 
+@app.route('/api/post_context/stream', methods=['POST'])
+def post_context_stream():
+    """Stream a large plain-text context; chunks are queued for ingestion as they arrive"""
+    global vector_store
+    if vector_store is None:
+        return jsonify({
+            "error": "Vector store not initialized"
+        }), 500
+
+    charset = request.mimetype_params.get('charset', 'utf-8')
+    try:
+        decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+    except LookupError:
+        return jsonify({"error": f"Unsupported charset: {charset}"}), 400
+
+    uid = request.args.get('uid', '')
+    chunker = create_context_chunker()
+    service = get_ingestion_service(vector_store)
+    queued = 0
+
+    def submit_all(chunks):
+        nonlocal queued
+        for chunk in chunks:
+            # A full queue stalls the upload (backpressure) before rejecting it
+            if not service.submit(chunk, namespace=uid, timeout=Config.STREAM_PUT_TIMEOUT,
+                                  metadata={"type": "context"}):
+                return False
+            queued += 1
+        return True
+
+    try:
+        while True:
+            data = request.stream.read(Config.STREAM_READ_BYTES)
+            if not data:
+                break
+            if not submit_all(chunker.feed(decoder.decode(data))):
+                return jsonify({
+                    "error": "Context could not be queued for ingestion, try again later",
+                    "chunks_queued": queued
+                }), 503
+        if not submit_all(chunker.feed(decoder.decode(b'', final=True)) + chunker.close()):
+            return jsonify({
+                "error": "Context could not be queued for ingestion, try again later",
+                "chunks_queued": queued
+            }), 503
+    except Exception as e:
+        print(f"Error streaming context: {e}")
+        return jsonify({"error": "Failed to read context stream", "chunks_queued": queued}), 500
+
+    if not queued:
+        return jsonify({"error": "No context provided"}), 400
+    return jsonify({
+        "success": True,
+        "message": "Context posted successfully",
+        "chunks_queued": queued
+    })
+
 @app.route('/api/initialize', methods=['POST'])
 def initialize_router():
     """Manual endpoint to initialize the model router"""
@@ -0,0 +1,94 @@
+"""
+Benchmark embedding inference backends (torch, onnx, onnx-int8) on this machine.
+
+Reports throughput (texts/sec) for batched encodes, p50/p95 latency for
+single-text encodes, and how far each backend's embeddings are from the
+torch embeddings. Exits with status 1 if a backend falls outside its
+tolerance.
+
+Usage (from the backend directory):
+    python benchmarks/embedding_backends.py --backends torch onnx onnx-int8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_store.model_registry import get_model_registry
+
+# Minimum cosine similarity to the torch embedding of the same text
+TOLERANCES = {"torch": 1.0 - 1e-6, "onnx": 0.9999, "onnx-int8": 0.98}
+
+WORDS = (
+    "schedule meeting tomorrow email project deadline lunch calendar budget report "
+    "review travel flight hotel invoice client team update notes call reminder weekly "
+    "draft proposal summary question answer code bug deploy server database"
+).split()
+
+
+def make_texts(count: int, seed: int) -> list:
+    """Short conversational sentences of varying length."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 40))) for _ in range(count)]
+
+
+def encode(model, texts: list, batch_size: int) -> np.ndarray:
+    return np.asarray(
+        model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True),
+        dtype=np.float32
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare embedding inference backends")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    registry = get_model_registry()
+    texts = make_texts(args.texts, args.seed)
+    reference = encode(registry.get(args.model, "torch"), texts, args.batch_size)
+
+    failed = False
+    print(f"model={args.model}  texts={args.texts}  batch_size={args.batch_size}")
+    for backend in args.backends:
+        model = registry.get(args.model, backend)
+        encode(model, texts[:args.batch_size], args.batch_size)  # warm-up
+
+        start = time.perf_counter()
+        embeddings = encode(model, texts, args.batch_size)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        latencies = []
+        for text in texts[:args.latency_samples]:
+            start = time.perf_counter()
+            encode(model, [text], 1)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        p50, p95 = np.percentile(latencies, [50, 95])
+
+        cosine = np.sum(embeddings * reference, axis=1)
+        max_abs = float(np.abs(embeddings - reference).max())
+        ok = float(cosine.min()) >= TOLERANCES.get(backend, 0.98)
+        failed |= not ok
+
+        print(f"\n  {backend}")
+        print(f"    throughput: {throughput:.0f} texts/sec")
+        print(f"    latency:    p50={p50:.2f} ms  p95={p95:.2f} ms (single text)")
+        print(f"    vs torch:   min cosine={cosine.min():.6f}  mean cosine={cosine.mean():.6f}  "
+              f"max abs diff={max_abs:.2e}  {'OK' if ok else 'OUT OF TOLERANCE'}")
+
+    print(f"\n{registry.stats()}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark the HNSW index against exact (brute-force) search.
+
+Builds an index at several sizes and reports recall@k, build time and query
+latency for each ef_search value.
+
+Usage (from the backend directory):
+    python benchmarks/hnsw_recall.py --sizes 1000 10000 50000 --ef 16 64 128
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_store.hnsw import HNSWIndex
+
+
+def make_vectors(rng: np.random.Generator, count: int, dimension: int, clusters: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real sentence embeddings than uniform noise."""
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=count)
+    vectors = centers[assignments] + rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Ground-truth neighbours by brute force."""
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def run(size: int, args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+    vectors = make_vectors(rng, size + args.queries, args.dimension, args.clusters)
+    data, queries = vectors[:size], vectors[size:]
+    labels = [str(i) for i in range(size)]
+
+    start = time.perf_counter()
+    index = HNSWIndex(args.dimension, M=args.M, ef_construction=args.ef_construction)
+    index.add(labels, data)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    truth = exact_top_k(data, queries, args.k)
+    exact_ms = (time.perf_counter() - start) / len(queries) * 1000.0
+
+    print(f"\nn={size}  dim={args.dimension}  M={args.M}  ef_construction={args.ef_construction}")
+    print(f"  build: {build_time:.1f}s ({build_time / size * 1000.0:.2f} ms/insert)")
+    print(f"  exact: {exact_ms:.3f} ms/query (batched)")
+    for ef in args.ef:
+        hits = 0
+        start = time.perf_counter()
+        for query, expected in zip(queries, truth):
+            found = {int(label) for label, _ in index.search(query, args.k, ef=ef)}
+            hits += len(found.intersection(expected.tolist()))
+        latency_ms = (time.perf_counter() - start) / len(queries) * 1000.0
+        recall = hits / (len(queries) * args.k)
+        print(f"  ef={ef:<4d} recall@{args.k}={recall:.4f}  latency={latency_ms:.3f} ms/query")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HNSW recall@k vs exact search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=100)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 64, 128])
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark the Pinecone REST and gRPC data-plane transports against local stub servers.
+
+Both stubs implement just enough of the data-plane API (upsert and query)
+for the official clients to talk to them, and add an optional fixed delay
+per request to stand in for network round trips. Reports query latency
+p50/p95, upsert throughput with sequential and parallel async batches, and
+the request payload size each transport puts on the wire.
+
+Requires pinecone[grpc]. Usage (from the backend directory):
+    python benchmarks/pinecone_transport.py --vectors 5000 --server-delay-ms 20
+"""
+
+import argparse
+import importlib
+import json
+import threading
+import time
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import grpc
+import numpy as np
+from pinecone import Pinecone
+from pinecone.grpc import GRPCClientConfig, PineconeGRPC, index_grpc
+
+# Generated protobuf modules of the installed client version
+pb2 = importlib.import_module(index_grpc.UpsertRequest.__module__)
+pb2_grpc = importlib.import_module(pb2.__name__ + "_grpc")
+
+
+class PayloadStats:
+    """Request body sizes seen by a stub server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sizes = {}
+
+    def record(self, operation: str, size: int) -> None:
+        with self._lock:
+            self.sizes.setdefault(operation, []).append(size)
+
+    def mean(self, operation: str) -> float:
+        sizes = self.sizes.get(operation, [])
+        return sum(sizes) / len(sizes) if sizes else 0.0
+
+
+def make_rest_server(delay: float, top_k_ids: list, payloads: PayloadStats) -> ThreadingHTTPServer:
+    """HTTP server answering /vectors/upsert and /query like the REST data plane."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            request = json.loads(body or b"{}")
+            time.sleep(delay)
+            if self.path == "/vectors/upsert":
+                payloads.record("upsert", len(body))
+                response = {"upsertedCount": len(request.get("vectors", []))}
+            elif self.path == "/query":
+                payloads.record("query", len(body))
+                response = {
+                    "matches": [{"id": vector_id, "score": 1.0 - i * 0.01} for i, vector_id in enumerate(top_k_ids)],
+                    "namespace": request.get("namespace", "")
+                }
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+
+def make_grpc_server(delay: float, top_k_ids: list, payloads: PayloadStats):
+    """gRPC server implementing Upsert and Query of the data-plane VectorService."""
+
+    class Servicer(pb2_grpc.VectorServiceServicer):
+        def Upsert(self, request, context):
+            payloads.record("upsert", request.ByteSize())
+            time.sleep(delay)
+            return pb2.UpsertResponse(upserted_count=len(request.vectors))
+
+        def Query(self, request, context):
+            payloads.record("query", request.ByteSize())
+            time.sleep(delay)
+            return pb2.QueryResponse(
+                matches=[pb2.ScoredVector(id=vector_id, score=1.0 - i * 0.01) for i, vector_id in enumerate(top_k_ids)],
+                namespace=request.namespace
+            )
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=16))
+    pb2_grpc.add_VectorServiceServicer_to_server(Servicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    return server, port
+
+
+def run_client(index, vectors: np.ndarray, queries: np.ndarray, batch_size: int, top_k: int) -> dict:
+    """Time queries, sequential upserts and parallel async upserts."""
+    rows = [{"id": f"v{i}", "values": vector, "metadata": {"type": "document"}}
+            for i, vector in enumerate(vectors.tolist())]
+    batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+
+    index.query(vector=queries[0].tolist(), top_k=top_k, namespace="bench")  # warm-up
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.query(vector=query.tolist(), top_k=top_k, namespace="bench")
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+    start = time.perf_counter()
+    for batch in batches:
+        index.upsert(vectors=batch, namespace="bench")
+    sequential = len(rows) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    requests = [index.upsert(vectors=batch, namespace="bench", async_req=True) for batch in batches]
+    for request in requests:
+        request.result() if hasattr(request, "result") else request.get()
+    parallel = len(rows) / (time.perf_counter() - start)
+
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {"p50": p50, "p95": p95, "sequential": sequential, "parallel": parallel}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare Pinecone REST and gRPC transports on stub servers")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--pool-threads", type=int, default=4)
+    parser.add_argument("--server-delay-ms", type=float, default=0.0,
+                        help="Fixed delay per request, standing in for network latency")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.vectors, args.dimension)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dimension)).astype(np.float32)
+    top_k_ids = [f"v{i}" for i in range(args.top_k)]
+    delay = args.server_delay_ms / 1000.0
+
+    rest_payloads = PayloadStats()
+    rest_server = make_rest_server(delay, top_k_ids, rest_payloads)
+    threading.Thread(target=rest_server.serve_forever, daemon=True).start()
+    grpc_payloads = PayloadStats()
+    grpc_server, grpc_port = make_grpc_server(delay, top_k_ids, grpc_payloads)
+    grpc_server.start()
+
+    try:
+        rest_index = Pinecone(api_key="stub").Index(
+            host=f"http://127.0.0.1:{rest_server.server_address[1]}", pool_threads=args.pool_threads
+        )
+        grpc_index = PineconeGRPC(api_key="stub").Index(
+            host=f"127.0.0.1:{grpc_port}", grpc_config=GRPCClientConfig(secure=False),
+            pool_threads=args.pool_threads
+        )
+
+        print(f"vectors={args.vectors}  dimension={args.dimension}  batch_size={args.batch_size}  "
+              f"pool_threads={args.pool_threads}  server_delay={args.server_delay_ms} ms")
+        for name, index, payloads in (("rest", rest_index, rest_payloads), ("grpc", grpc_index, grpc_payloads)):
+            result = run_client(index, vectors, queries, args.batch_size, args.top_k)
+            print(f"\n  {name}")
+            print(f"    query latency:   p50={result['p50']:.2f} ms  p95={result['p95']:.2f} ms")
+            print(f"    upsert:          {result['sequential']:.0f} vectors/sec sequential, "
+                  f"{result['parallel']:.0f} vectors/sec parallel async")
+            print(f"    request payload: query {payloads.mean('query') / 1024:.1f} KiB, "
+                  f"upsert batch {payloads.mean('upsert') / 1024:.1f} KiB")
+    finally:
+        rest_server.shutdown()
+        grpc_server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark int8 and binary quantization against exact float32 search.
+
+Reports RAM per vector, recall@k of the raw code scores and recall@k after
+rescoring top_k * factor candidates with their float32 vectors.
+
+Usage (from the backend directory):
+    python benchmarks/quantization_recall.py --size 100000 --rescore 1 4 10
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_store.quantization import code_scores, code_size, quantize
+from hnsw_recall import exact_top_k, make_vectors
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f.tolist()).intersection(t.tolist())) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Quantized search recall@k and memory vs float32")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, nargs="+", default=[1, 4, 10, 30])
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = make_vectors(rng, args.size + args.queries, args.dimension, args.clusters)
+    data, queries = vectors[:args.size], vectors[args.size:]
+    truth = exact_top_k(data, queries, args.k)
+
+    float_bytes = code_size(args.dimension, "none")
+    print(f"n={args.size}  dim={args.dimension}  k={args.k}")
+    print(f"  float32: {float_bytes} bytes/vector, {float_bytes * args.size / 2**20:.1f} MiB")
+
+    for mode in ("int8", "binary"):
+        codes, scales = quantize(data, mode)
+        per_vector = code_size(args.dimension, mode)
+        print(f"\n  {mode}: {per_vector} bytes/vector, {per_vector * args.size / 2**20:.1f} MiB "
+              f"({float_bytes / per_vector:.1f}x smaller)")
+
+        for factor in args.rescore:
+            candidates_k = min(args.k * factor, args.size)
+            found = []
+            start = time.perf_counter()
+            for query in queries:
+                scores = code_scores(codes, scales, query, mode)
+                candidates = np.sort(np.argpartition(-scores, candidates_k - 1)[:candidates_k])
+                exact = data[candidates] @ query
+                found.append(candidates[np.argsort(-exact)[:args.k]])
+            latency_ms = (time.perf_counter() - start) / len(queries) * 1000.0
+            label = "codes only" if factor == 1 else f"rescore x{factor}"
+            print(f"    {label:<12s} recall@{args.k}={recall(np.array(found), truth):.4f}  "
+                  f"latency={latency_ms:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Bulk document loader: chunk, embed and upsert JSONL, text and markdown files.
+
+Documents are streamed from the inputs, chunked, embedded by a pool of
+worker processes and upserted into the configured vector store (Pinecone
+or local) in batches bounded by vector count and payload size. Every
+--checkpoint-interval seconds the store is flushed to disk and progress is
+checkpointed, so rerunning the same command after an interruption skips
+the documents that were already loaded.
+
+Usage (from the backend directory):
+    python bulk_ingest.py notes/ export.jsonl --namespace <uid> --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from config import Config
+from vector_store import create_vector_store
+from vector_store.chunking import chunk_markdown, chunk_text
+
+TEXT_EXTENSIONS = {".txt": "text", ".md": "markdown", ".markdown": "markdown", ".jsonl": "jsonl"}
+
+# Chunk: (vector ID, text, metadata, file, document index, last chunk of its document).
+# Chunks with an empty ID carry no text: they mark empty documents, and
+# document index END_OF_FILE marks a fully read file.
+Chunk = Tuple[str, str, Dict[str, Any], str, int, bool]
+END_OF_FILE = -1
+
+
+# --- Embedding worker processes ---
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, backend: str, threads: int) -> None:
+    """Load the embedding model once per worker process."""
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from vector_store.model_registry import get_model_registry
+    _worker_model = get_model_registry().get(model_name, backend)
+
+
+def _embed(texts: List[str]) -> np.ndarray:
+    """Embed a batch of texts in a worker process."""
+    return np.asarray(_worker_model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+
+# --- Input streaming ---
+
+def discover_files(paths: List[str]) -> List[str]:
+    """Expand directories into the supported files they contain, in a stable order."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    if os.path.splitext(name)[1].lower() in TEXT_EXTENSIONS:
+                        files.append(os.path.join(root, name))
+        elif os.path.splitext(path)[1].lower() in TEXT_EXTENSIONS:
+            files.append(path)
+        else:
+            print(f"❌ Skipping unsupported file: {path}")
+    return files
+
+
+def read_documents(path: str, text_field: str, id_field: str,
+                   skip: int = 0) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Stream documents from one file.
+
+    JSONL files yield one document per line (blank and invalid lines yield
+    an empty document so indexes match line numbers); text and markdown
+    files are a single document.
+
+    Args:
+        path: File to read
+        text_field: JSONL field holding the text
+        id_field: JSONL field holding the document ID
+        skip: Number of leading documents to skip without parsing
+
+    Yields:
+        (document ID, text, extra metadata)
+    """
+    kind = TEXT_EXTENSIONS[os.path.splitext(path)[1].lower()]
+    if kind != "jsonl":
+        if skip < 1:
+            with open(path, "r", encoding="utf-8") as f:
+                yield path, f.read(), {"source": path}
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f):
+            if line_number < skip:
+                continue
+            line = line.strip()
+            if not line:
+                yield f"{path}:{line_number}", "", {}
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"❌ Skipping invalid JSON at {path}:{line_number + 1}: {e}")
+                yield f"{path}:{line_number}", "", {}
+                continue
+            doc_id = str(record.get(id_field) or f"{path}:{line_number}")
+            yield doc_id, str(record.get(text_field) or ""), {"source": path, "doc_id": doc_id}
+
+
+def iter_chunks(files: List[str], checkpoint: "Checkpoint", args: argparse.Namespace,
+                max_tokens: int, count_tokens: Callable[[str], int]) -> Iterator[Chunk]:
+    """Chunk every document that the checkpoint does not mark as loaded into model-sized pieces."""
+    for path in files:
+        done = checkpoint.docs_done(path)
+        if done is None:
+            continue
+        chunker = chunk_markdown if path.lower().endswith((".md", ".markdown")) else chunk_text
+        documents = read_documents(path, args.text_field, args.id_field, skip=done)
+        for doc_index, (doc_id, text, extra) in enumerate(documents, start=done):
+            chunks = chunker(text, max_tokens, args.chunk_overlap_tokens, count_tokens) if text else []
+            if not chunks:
+                # Empty documents still advance the checkpoint
+                yield "", "", {}, path, doc_index, True
+                continue
+            for i, chunk in enumerate(chunks):
+                metadata = {**extra, "type": "document", "chunk": i}
+                yield f"{doc_id}#{i}", chunk, metadata, path, doc_index, i == len(chunks) - 1
+        yield "", "", {}, path, END_OF_FILE, False
+
+
+# --- Checkpointing ---
+
+class Checkpoint:
+    """
+    Per-file progress: the number of leading documents whose chunks have all
+    been upserted, or "complete" once a file has been fully loaded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Any] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.files = json.load(f).get("files", {})
+
+    def docs_done(self, path: str) -> Optional[int]:
+        """Documents already loaded from a file, or None if the file is complete."""
+        state = self.files.get(os.path.abspath(path), 0)
+        return None if state == "complete" else state
+
+    def advance(self, path: str, docs_done: int) -> None:
+        key = os.path.abspath(path)
+        if self.files.get(key) != "complete":
+            self.files[key] = max(docs_done, self.files.get(key, 0))
+
+    def mark_complete(self, path: str) -> None:
+        self.files[os.path.abspath(path)] = "complete"
+
+    def save(self) -> None:
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"files": self.files}, f)
+        os.replace(self.path + ".tmp", self.path)
+
+
+# --- Loader ---
+
+class BulkLoader:
+    """
+    Embeds chunks in a process pool and upserts them in order, in batches
+    bounded by vector count and estimated request size.
+    """
+
+    def __init__(self, vector_store, checkpoint: Checkpoint, args: argparse.Namespace):
+        self.vector_store = vector_store
+        self.checkpoint = checkpoint
+        self.args = args
+
+        self.pending: List[Tuple[Chunk, np.ndarray]] = []
+        self.pending_vectors = 0
+        self.pending_bytes = 0
+        self.docs = 0
+        self.chunks = 0
+        self.upserts = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+        self._last_checkpoint = self.start
+
+    def add(self, chunks: List[Chunk], embeddings: np.ndarray) -> None:
+        """Queue embedded chunks, flushing whenever a batch limit is reached."""
+        for chunk, embedding in zip(chunks, embeddings):
+            size = self._estimate_bytes(chunk, embedding) if chunk[0] else 0
+            if self.pending_vectors and (self.pending_vectors >= self.args.max_batch_vectors
+                                         or self.pending_bytes + size > self.args.max_batch_bytes):
+                self.flush()
+            self.pending.append((chunk, embedding))
+            self.pending_vectors += int(bool(chunk[0]))
+            self.pending_bytes += size
+
+    @staticmethod
+    def _estimate_bytes(chunk: Chunk, embedding: np.ndarray) -> int:
+        """Rough JSON request size of one vector: values, ID and metadata."""
+        _, text, metadata, _, _, _ = chunk
+        return embedding.size * 12 + len(chunk[0]) + len(text.encode("utf-8")) + len(json.dumps(metadata)) + 64
+
+    def flush(self) -> None:
+        """Upsert the pending batch and advance the checkpoint, saving it when due."""
+        rows = [i for i, (chunk, _) in enumerate(self.pending) if chunk[0]]
+        if rows:
+            batch = [self.pending[i] for i in rows]
+            self.vector_store.upsert_embeddings(
+                np.stack([embedding for _, embedding in batch]),
+                [chunk[1] for chunk, _ in batch],
+                ids=[chunk[0] for chunk, _ in batch],
+                namespace=self.args.namespace,
+                metadatas=[chunk[2] for chunk, _ in batch]
+            )
+            self.upserts += 1
+            self.chunks += len(batch)
+
+        for (_, _, _, path, doc_index, last), _ in self.pending:
+            if doc_index == END_OF_FILE:
+                self.checkpoint.mark_complete(path)
+                continue
+            self.checkpoint.advance(path, doc_index + 1 if last else doc_index)
+            self.docs += int(last)
+        self.pending = []
+        self.pending_vectors = 0
+        self.pending_bytes = 0
+        if time.perf_counter() - self._last_checkpoint >= self.args.checkpoint_interval:
+            self.save_checkpoint()
+        self.report()
+
+    def save_checkpoint(self) -> None:
+        """Persist everything upserted so far, then record it in the checkpoint."""
+        # The local store only writes to disk on flush; the checkpoint must never get ahead of it
+        self.vector_store.flush()
+        self.checkpoint.save()
+        self._last_checkpoint = time.perf_counter()
+
+    def report(self, final: bool = False) -> None:
+        now = time.perf_counter()
+        if not final and now - self._last_report < 5.0:
+            return
+        self._last_report = now
+        elapsed = max(now - self.start, 1e-9)
+        print(f"{'✅ Done' if final else '   Progress'}: {self.docs} docs, {self.chunks} chunks, "
+              f"{self.upserts} upserts in {elapsed:.1f}s "
+              f"({self.docs / elapsed:.1f} docs/sec, {self.chunks / elapsed:.1f} chunks/sec)")
+
+
+def run(args: argparse.Namespace) -> None:
+    files = discover_files(args.inputs)
+    if not files:
+        print("❌ No .jsonl, .txt or .md files found")
+        return
+
+    checkpoint = Checkpoint(args.checkpoint)
+    # Persisted once per checkpoint instead of after every upsert
+    vector_store = create_vector_store(index_name=args.index_name, backend=args.backend, autosave=False)
+    loader = BulkLoader(vector_store, checkpoint, args)
+    # Chunks are capped at the embedding model's sequence length, so none is truncated
+    embedding_manager = vector_store.embedding_manager
+    max_tokens = min(args.chunk_tokens, embedding_manager.max_tokens - 2)
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(vector_store.model_name, Config.EMBEDDING_BACKEND, threads)
+    ) as pool:
+        # Results are consumed in submission order, so checkpoints only ever cover a loaded prefix
+        in_flight = deque()
+        batch: List[Chunk] = []
+
+        def submit(chunks: List[Chunk]) -> None:
+            texts = [chunk[1] for chunk in chunks if chunk[0]]
+            in_flight.append((chunks, pool.submit(_embed, texts) if texts else None))
+            while len(in_flight) > args.workers * 2:
+                drain_one()
+
+        def drain_one() -> None:
+            chunks, future = in_flight.popleft()
+            embeddings = iter(future.result() if future is not None else [])
+            empty = np.zeros(vector_store.dimension, dtype=np.float32)
+            loader.add(chunks, [next(embeddings) if chunk[0] else empty for chunk in chunks])
+
+        for chunk in iter_chunks(files, checkpoint, args, max_tokens, embedding_manager.count_tokens):
+            batch.append(chunk)
+            if len(batch) >= args.embed_batch_size:
+                submit(batch)
+                batch = []
+        if batch:
+            submit(batch)
+        while in_flight:
+            drain_one()
+
+    loader.flush()
+    loader.save_checkpoint()
+    loader.report(final=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk load documents into the vector store")
+    parser.add_argument("inputs", nargs="+", help="Files or directories (.jsonl, .txt, .md)")
+    parser.add_argument("--namespace", default="", help="Namespace (user ID) to load into")
+    parser.add_argument("--index-name", default="alerihglhiuaerg")
+    parser.add_argument("--backend", default=None, help="pinecone or local (default: VECTOR_STORE_BACKEND)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    parser.add_argument("--max-batch-vectors", type=int, default=100,
+                        help="Maximum vectors per upsert (Pinecone allows up to 1000)")
+    parser.add_argument("--max-batch-bytes", type=int, default=2 * 1024 * 1024,
+                        help="Maximum estimated upsert request size (Pinecone allows 2 MB)")
+    parser.add_argument("--chunk-tokens", type=int, default=Config.CONTEXT_CHUNK_TOKENS)
+    parser.add_argument("--chunk-overlap-tokens", type=int, default=Config.CONTEXT_CHUNK_OVERLAP_TOKENS)
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the text")
+    parser.add_argument("--id-field", default="id", help="JSONL field holding the document ID")
+    parser.add_argument("--checkpoint", default=".bulk_ingest_checkpoint.json",
+                        help="Progress file; rerun with the same file to resume")
+    parser.add_argument("--checkpoint-interval", type=float, default=30.0,
+                        help="Seconds between store flushes and checkpoint saves")
+    args = parser.parse_args()
+
+    try:
+        run(args)
+    except KeyboardInterrupt:
+        print(f"\n❌ Interrupted; rerun the same command to resume from {args.checkpoint}")
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
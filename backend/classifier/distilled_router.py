@@ -0,0 +1,167 @@
+"""
+Routing decision log and the distilled local router trained from it.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+
+class RoutingLog:
+    """
+    Append-only JSONL dataset of (prompt, model family) decisions made by
+    the LLM classifier, used to train the distilled router.
+
+    Each decision is one line written with a single append, so several
+    worker processes can share the file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the log.
+
+        Args:
+            path: JSONL file decisions are appended to
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, prompts: List[str], families: List[str], source: str = "llm") -> None:
+        """
+        Record routing decisions.
+
+        Args:
+            prompts: Routed prompts
+            families: Model family chosen for each prompt
+            source: Tier that made the decisions
+        """
+        now = time.time()
+        lines = "".join(
+            json.dumps({"prompt": prompt, "family": family, "source": source, "created_at": now}) + "\n"
+            for prompt, family in zip(prompts, families)
+        )
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"❌ Failed to log routing decisions to {self.path}: {e}")
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        """Yield (prompt, family) for every logged decision, oldest first."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash
+                    continue
+                yield entry["prompt"], entry["family"]
+
+
+class DistilledRouter:
+    """
+    Logistic regression over classifier prompt embeddings, trained offline
+    (train_router.py) to reproduce the LLM classifier's decisions.
+
+    Inference is one matrix multiply and a softmax in NumPy, so scikit-learn
+    is only needed for training.
+    """
+
+    def __init__(self, classes: List[str], coef: np.ndarray, intercept: np.ndarray, model_name: str,
+                 backend: str = "torch"):
+        """
+        Initialize the router from trained weights.
+
+        Args:
+            classes: Model families, in the order of the weight rows
+            coef: Weights, one row per class (a single row for two classes)
+            intercept: Bias per weight row
+            model_name: Embedding model the router was trained on
+            backend: Inference backend that computed the training embeddings
+        """
+        self.classes = list(classes)
+        self.coef = np.asarray(coef, dtype=np.float32)
+        self.intercept = np.asarray(intercept, dtype=np.float32)
+        self.model_name = model_name
+        self.backend = backend
+
+    @classmethod
+    def load(cls, path: str, model_name: str, backend: str = "torch") -> Optional["DistilledRouter"]:
+        """
+        Load a trained router.
+
+        Args:
+            path: .npz file written by save()
+            model_name: Embedding model in use; a router trained on another model is not loaded
+            backend: Inference backend in use; a router trained on embeddings from
+                another backend (e.g. torch vs onnx-int8) is not loaded
+
+        Returns:
+            The router, or None if there is no usable file
+        """
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                # Routers saved before the backend was recorded were trained with torch
+                router = cls(
+                    [str(c) for c in data["classes"]], data["coef"], data["intercept"], str(data["model_name"]),
+                    str(data["backend"]) if "backend" in data else "torch"
+                )
+        except Exception as e:
+            print(f"❌ Failed to load distilled router {path}: {e}")
+            return None
+        if router.model_name != model_name:
+            print(f"Ignoring distilled router {path}: trained on {router.model_name}, not {model_name}")
+            return None
+        if router.backend != backend:
+            print(f"Ignoring distilled router {path}: trained on {router.backend} embeddings, not {backend}")
+            return None
+        print(f"✅ Loaded distilled router {path} ({len(router.classes)} families)")
+        return router
+
+    def save(self, path: str) -> None:
+        """
+        Save the weights.
+
+        Args:
+            path: .npz file to write
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f, classes=np.array(self.classes, dtype=str), coef=self.coef,
+                intercept=self.intercept, model_name=np.array(self.model_name),
+                backend=np.array(self.backend)
+            )
+        os.replace(temp_path, path)
+
+    def predict_many(self, embeddings: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Predict the model family of prompts from their embeddings.
+
+        Args:
+            embeddings: Prompt embeddings, one row per prompt
+
+        Returns:
+            One (model family, probability) per prompt
+        """
+        logits = np.asarray(embeddings, dtype=np.float32) @ self.coef.T + self.intercept
+        if logits.shape[1] == 1:
+            # Binary logistic regression scores only the second class
+            logits = np.hstack([np.zeros_like(logits), logits])
+        probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return [(self.classes[idx], float(probabilities[row, idx])) for row, idx in enumerate(best)]
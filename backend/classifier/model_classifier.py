@@ -1,6 +1,16 @@
 import os
 import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from openai import OpenAI
+from config import Config
+from .distilled_router import DistilledRouter, RoutingLog
+from .nlp_classifier import ModelRouter as NLPModelRouter
+from .routing_cache import RoutingCache
 from .vellum_scraper import run_vellum_scraper
 
 class ModelRouter:
@@ -35,6 +45,17 @@ output: gemini
 user: what is two plus two?
 output: gpt
     """
+
+    # Appointment and email prompts always go to the GPT-backed agents
+    AGENT_KEYWORDS = [
+        'appointment', 'schedule', 'booking', 'meeting', 'calendar',
+        'reserve', 'book', 'arrange', 'set up', 'organize',
+        'tomorrow', 'next week', 'this week', 'today at',
+        '2 pm', '3 pm', '4 pm', '5 pm', 'morning', 'afternoon', 'evening',
+        'email', 'send email', 'mail'
+    ]
+    AGENT_RULE = re.compile("|".join(re.escape(keyword) for keyword in AGENT_KEYWORDS), re.IGNORECASE)
+
     def __init__(self):
         # Get the directory where this file is located and construct the path
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -66,6 +87,23 @@ output: gpt
         self.classification_prompt = self._create_classification_prompt()
         self.system_prompt = self.SYSTEM_PROMPT
 
+        # Local embedding tier; its model loads on first use
+        self.embedding_router = NLPModelRouter()
+        # LLM decisions reused for near-identical prompts
+        self.routing_cache: Optional[RoutingCache] = None
+        # LLM decisions are logged to train the distilled router (train_router.py),
+        # which answers in place of the LLM once trained
+        self.routing_log = RoutingLog(Config.ROUTER_LOG_PATH) if Config.ROUTER_LOG_PATH else None
+        self.distilled_router = DistilledRouter.load(
+            Config.ROUTER_DISTILLED_PATH, Config.CLASSIFIER_MODEL, Config.EMBEDDING_BACKEND
+        )
+        self._stats_lock = threading.Lock()
+        self._tier_stats: Dict[str, Dict[str, float]] = {}
+        # Unsure prompts of a batch are sent to the LLM concurrently, one request each
+        self._llm_executor = ThreadPoolExecutor(
+            max_workers=max(1, Config.ROUTER_LLM_CONCURRENCY), thread_name_prefix="llm-router"
+        )
+
     def _create_classification_prompt(self) -> str:
         """Create the classification prompt for the LLM"""
         categories_text = "\n".join([f"- {category}" for category in self.categories])
@@ -123,7 +161,7 @@ output: gpt
 
     def classify(self, prompt: str) -> str:
         """
-        Classify a prompt using LLM-based classification.
+        Classify a prompt through the routing cascade.
         
         Args:
             prompt: The user's input prompt to classify
@@ -131,11 +169,194 @@ output: gpt
         Returns:
             The selected LLM model family (gpt, gemini, claude, groq)
         """
-        try:
-            # Create the full classification prompt
-            full_prompt = prompt
+        return self.route(prompt)["model"]
+
+    def route(self, prompt: str) -> Dict[str, Any]:
+        """
+        Route a prompt: compiled rules first, then the routing cache of
+        earlier LLM decisions, then the local embedding classifier. When its
+        confidence is below Config.ROUTER_CONFIDENCE_THRESHOLD, the distilled
+        router answers if it is trained and sure enough, and the LLM
+        classifier otherwise.
+        
+        Args:
+            prompt: The user's input prompt to classify
+            
+        Returns:
+            Decision with the model family, the tier that answered
+            ("rules", "cache", "embedding", "distilled", "llm" or "fallback"), its confidence and latency
+        """
+        decision = self.route_many([prompt])[0]
+        print(f"Routed to {decision['model']} by {decision['tier']} tier in {decision['latency_ms']:.1f} ms")
+        return decision
+
+    def classify_many(self, prompts: List[str]) -> List[str]:
+        """
+        Classify many prompts through the routing cascade.
+        
+        Args:
+            prompts: The user's input prompts
+            
+        Returns:
+            One model family per prompt
+        """
+        return [decision["model"] for decision in self.route_many(prompts)]
+
+    def route_many(self, prompts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Batch version of route(): the prompts are embedded in one batch, looked
+        up in the routing cache and scored with one matrix multiply each, and
+        the unsure ones go to the LLM concurrently, one request per prompt with
+        the same instructions as route().
+        
+        Args:
+            prompts: The user's input prompts
+            
+        Returns:
+            One decision per prompt, as returned by route(); latency_ms is the
+            prompt's share of the batched tiers it passed through plus its own
+            LLM request, if it needed one
+        """
+        if not prompts:
+            return []
+        routed = self._route_many(prompts)
+
+        decisions = []
+        with self._stats_lock:
+            for model, tier, confidence, latency_ms in routed:
+                tier_stats = self._tier_stats.setdefault(tier, {"count": 0, "total_ms": 0.0})
+                tier_stats["count"] += 1
+                tier_stats["total_ms"] += latency_ms
+                decisions.append({"model": model, "tier": tier, "confidence": confidence, "latency_ms": latency_ms})
+        return decisions
+
+    def _route_many(self, prompts: List[str]) -> List[Tuple[str, str, Optional[float], float]]:
+        """
+        Run the cascade; returns (model family, tier, confidence, latency in ms) per prompt.
+
+        A batched tier's time is shared by the prompts it handled, so a prompt
+        answered by the rules is not charged for the LLM requests of others.
+        """
+        results: List[Optional[Tuple[str, str, Optional[float]]]] = [None] * len(prompts)
+        spent_ms = [0.0] * len(prompts)
+
+        def charge(indices: List[int], since: float) -> None:
+            if indices:
+                share = (time.perf_counter() - since) * 1000.0 / len(indices)
+                for i in indices:
+                    spent_ms[i] += share
+
+        phase_start = time.perf_counter()
+        pending = []
+        for i, prompt in enumerate(prompts):
+            if self.AGENT_RULE.search(prompt):
+                results[i] = ("gpt", "rules", 1.0)
+            else:
+                pending.append(i)
+        charge(list(range(len(prompts))), phase_start)
+
+        # Prompts the embedding tier is unsure about: (index, embedding answer, confidence, embedding)
+        unsure: List[Tuple[int, Optional[str], Optional[float], Optional[np.ndarray]]] = []
+        if pending:
+            phase_start = time.perf_counter()
+            try:
+                prompt_embeddings = self.embedding_router.embed_many([prompts[i] for i in pending])
+            except Exception as e:
+                print(f"Error in embedding classification: {e}")
+                prompt_embeddings = None
+
+            if prompt_embeddings is None:
+                unsure = [(i, None, None, None) for i in pending]
+            else:
+                routing_cache = self._get_routing_cache(prompt_embeddings.shape[1])
+                if routing_cache is not None:
+                    cached = routing_cache.get_many(prompt_embeddings)
+                    for i, cached_model in zip(pending, cached):
+                        if cached_model is not None:
+                            results[i] = (cached_model, "cache", None)
+                uncached = [row for row, i in enumerate(pending) if results[i] is None]
+
+                try:
+                    classified = self.embedding_router.classify_many_with_confidence(
+                        [prompts[pending[row]] for row in uncached], prompt_embeddings[uncached]
+                    )
+                except Exception as e:
+                    print(f"Error in embedding classification: {e}")
+                    classified = [(None, None)] * len(uncached)
+                for row, (embedding_model, confidence) in zip(uncached, classified):
+                    if confidence is not None and confidence >= Config.ROUTER_CONFIDENCE_THRESHOLD:
+                        results[pending[row]] = (embedding_model, "embedding", confidence)
+                    else:
+                        unsure.append((pending[row], embedding_model, confidence, prompt_embeddings[row]))
+            # Embedding, cache lookup and scoring are one batch for every pending prompt
+            charge(pending, phase_start)
+
+        if unsure and self.distilled_router is not None and unsure[0][3] is not None:
+            phase_start = time.perf_counter()
+            predicted = self.distilled_router.predict_many(np.stack([embedding for _, _, _, embedding in unsure]))
+            charge([entry[0] for entry in unsure], phase_start)
+            still_unsure = []
+            for entry, (distilled_model, probability) in zip(unsure, predicted):
+                if probability >= Config.ROUTER_DISTILLED_THRESHOLD:
+                    results[entry[0]] = (distilled_model, "distilled", probability)
+                else:
+                    still_unsure.append(entry)
+            unsure = still_unsure
+
+        if unsure:
+            classified = self._classify_llm_many([prompts[i] for i, _, _, _ in unsure])
+            llm_models = [llm_model for llm_model, _ in classified]
+            # Each LLM request is the prompt's own
+            for (i, _, _, _), (_, llm_ms) in zip(unsure, classified):
+                spent_ms[i] += llm_ms
+            if self.routing_log is not None:
+                logged = [(prompts[i], llm_model) for (i, _, _, _), llm_model in zip(unsure, llm_models) if llm_model]
+                if logged:
+                    self.routing_log.append([prompt for prompt, _ in logged], [model for _, model in logged])
+            for (i, embedding_model, confidence, prompt_embedding), llm_model in zip(unsure, llm_models):
+                if llm_model is not None:
+                    if prompt_embedding is not None and self.routing_cache is not None:
+                        self.routing_cache.put(prompt_embedding, llm_model)
+                    results[i] = (llm_model, "llm", None)
+                elif embedding_model is not None:
+                    results[i] = (embedding_model, "embedding", confidence)
+                else:
+                    results[i] = ("gpt", "fallback", None)
+        return [(*result, latency_ms) for result, latency_ms in zip(results, spent_ms)]
+
+    def warm_up(self) -> None:
+        """
+        Load the local embedding tier and the routing cache before the first
+        request, so that request is not stalled by model loading.
+        """
+        self.embedding_router.warm_up()
+        self._get_routing_cache(self.embedding_router.category_embeddings.shape[1])
+
+    def _get_routing_cache(self, dimension: int) -> Optional[RoutingCache]:
+        """Create the routing cache once the prompt embedding dimension is known."""
+        if self.routing_cache is None and Config.ROUTER_CACHE_SIZE > 0:
+            with self._stats_lock:
+                if self.routing_cache is None:
+                    self.routing_cache = RoutingCache(
+                        dimension,
+                        Config.CLASSIFIER_MODEL,
+                        max_entries=Config.ROUTER_CACHE_SIZE,
+                        threshold=Config.ROUTER_CACHE_THRESHOLD,
+                        path=Config.ROUTER_CACHE_PATH or None
+                    )
+        return self.routing_cache
+
+    def _classify_llm(self, prompt: str) -> Optional[str]:
+        """
+        Classify a prompt with the LLM.
+        
+        Args:
+            prompt: The user's input prompt to classify
             
-            # Get classification from LLM
+        Returns:
+            The model family, or None if the LLM failed or answered something unknown
+        """
+        try:
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
@@ -145,46 +366,71 @@ output: gpt
                     },
                     {
                         "role": "user",
-                        "content": full_prompt
+                        "content": prompt
                     }
                 ],
                 max_tokens=50,
                 temperature=0.001  # Low temperature for consistent classification
             )
 
-            appointment_keywords = [
-            'appointment', 'schedule', 'booking', 'meeting', 'calendar',
-            'reserve', 'book', 'arrange', 'set up', 'organize',
-            'tomorrow', 'next week', 'this week', 'today at',
-            '2 pm', '3 pm', '4 pm', '5 pm', 'morning', 'afternoon', 'evening'
-            ]
-            if any(keyword in prompt.lower() for keyword in appointment_keywords):
-                return "gpt"
-            
-            # Keywords that trigger email routing
-            email_keywords = [
-                'email', 'send email', 'mail'
-            ]
-            if any(keyword in prompt.lower() for keyword in email_keywords):
-                return "gpt"
-            # Extract the classified category
             response_content = response.choices[0].message.content
             if response_content is None:
                 print("Warning: LLM returned empty response, using fallback")
-                return "gpt"
+                return None
             
             classified_model = response_content.strip()
-            print(f"LLM classified prompt as: {classified_model}")
-            
-            # Map the category to model family
             if classified_model in self.model_categories.values():
                 print(f"LLM classified prompt as: {classified_model}")
                 return classified_model
-            else:
-                # Fallback if classification doesn't match any category
-                print(f"Warning: LLM returned unknown category '{classified_model}', using fallback")
-                return "gpt"  # Default fallback
+            print(f"Warning: LLM returned unknown category '{classified_model}', using fallback")
+            return None
                 
         except Exception as e:
             print(f"Error in LLM classification: {e}")
-            return "gpt"  # Fallback to GPT on error
\ No newline at end of file
+            return None
+
+    def _classify_llm_timed(self, prompt: str) -> Tuple[Optional[str], float]:
+        """_classify_llm() and the duration of its request in milliseconds."""
+        start = time.perf_counter()
+        model = self._classify_llm(prompt)
+        return model, (time.perf_counter() - start) * 1000.0
+
+    def _classify_llm_many(self, prompts: List[str]) -> List[Tuple[Optional[str], float]]:
+        """
+        Classify prompts with the LLM, up to Config.ROUTER_LLM_CONCURRENCY requests at a time.
+        
+        Each prompt is sent in its own request, exactly as by _classify_llm(),
+        so a prompt gets the same answer whether it is routed alone or in a batch.
+        
+        Args:
+            prompts: The user's input prompts to classify
+            
+        Returns:
+            One (model family, request milliseconds) per prompt; the model family
+            is None where the LLM failed or answered something unknown
+        """
+        if len(prompts) == 1:
+            return [self._classify_llm_timed(prompts[0])]
+        classified = list(self._llm_executor.map(self._classify_llm_timed, prompts))
+        print(f"LLM classified {len(prompts)} prompts")
+        return classified
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-tier routing counts and average latency, and routing cache statistics.
+        
+        Returns:
+            Dictionary with tier and cache statistics
+        """
+        with self._stats_lock:
+            tiers = {
+                tier: {
+                    "count": tier_stats["count"],
+                    "avg_ms": tier_stats["total_ms"] / tier_stats["count"]
+                }
+                for tier, tier_stats in self._tier_stats.items()
+            }
+        return {
+            "tiers": tiers,
+            "cache": self.routing_cache.stats() if self.routing_cache is not None else {}
+        }
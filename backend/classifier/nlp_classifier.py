@@ -1,9 +1,15 @@
-from sentence_transformers import SentenceTransformer, util
-import torch
 import os
+import hashlib
+import threading
 from .vellum_scraper import run_vellum_scraper
 import json
 from pathlib import Path
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+from config import Config
+from vector_store.batcher import EmbeddingBatcher
+from vector_store.model_registry import get_model_registry
 
 class ModelRouter:
     def __init__(self):
@@ -26,8 +32,30 @@ class ModelRouter:
 
         self.model_categories = self.preprocess_model_categories(model_categories)
         self.categories = list(self.model_categories.keys())
+        # Each family scores as its best matching category
+        self.families = list(dict.fromkeys(self.model_categories.values()))
+        self._family_columns = [
+            np.array([i for i, category in enumerate(self.categories) if self.model_categories[category] == family])
+            for family in self.families
+        ]
         self.model = None
-        self.category_embeddings = torch.tensor([])
+        self.batcher = None
+        self._init_lock = threading.Lock()
+
+        # Category embeddings are persisted per model, inference backend and category list,
+        # so only the first start after a model, backend or leaderboard change has to encode
+        # them (quantized backends produce slightly different vectors)
+        categories_hash = hashlib.sha256(json.dumps(self.categories).encode("utf-8")).hexdigest()[:16]
+        model_slug = Config.CLASSIFIER_MODEL.replace("/", "--")
+        self.category_embeddings_path = os.path.join(
+            data_dir, f"category_embeddings.{model_slug}.{Config.EMBEDDING_BACKEND}.{categories_hash}.npy"
+        )
+        self.category_embeddings: Optional[np.ndarray] = None
+        if os.path.exists(self.category_embeddings_path):
+            try:
+                self.category_embeddings = np.load(self.category_embeddings_path, mmap_mode="r")
+            except Exception as e:
+                print(f"Failed to load category embeddings {self.category_embeddings_path}: {e}")
     
 
     def preprocess_model_categories(self, model_categories: dict) -> dict:
@@ -66,17 +94,128 @@ class ModelRouter:
         return category_to_model_family
 
     def initialize_model(self):
-        self.model = SentenceTransformer("thenlper/gte-base")
-        self.category_embeddings = torch.tensor(self.model.encode(self.categories, normalize_embeddings=True))
+        with self._init_lock:
+            if self.model is not None:
+                return
+            model = get_model_registry().get(Config.CLASSIFIER_MODEL, Config.EMBEDDING_BACKEND)
+            if self.category_embeddings is None:
+                self.category_embeddings = self._encode_categories(model)
+            # Share encodes between concurrent classify calls
+            self.batcher = EmbeddingBatcher(
+                lambda texts: model.encode(texts, normalize_embeddings=True),
+                max_batch_size=Config.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=Config.EMBEDDING_BATCH_MAX_WAIT_MS,
+                name="embedding-batcher-classifier"
+            )
+            self.model = model
+
+    def _encode_categories(self, model) -> np.ndarray:
+        """Encode the categories and persist them next to the leaderboard data."""
+        embeddings = np.asarray(model.encode(self.categories, normalize_embeddings=True), dtype=np.float32)
+        temp_path = f"{self.category_embeddings_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                np.save(f, embeddings)
+            os.replace(temp_path, self.category_embeddings_path)
+            print(f"Saved category embeddings to {self.category_embeddings_path}")
+        except Exception as e:
+            print(f"Failed to save category embeddings {self.category_embeddings_path}: {e}")
+        return embeddings
+
+    def warm_up(self) -> None:
+        """
+        Load the model and run one classification, so the first request
+        does not pay for model loading, category encoding or first inference.
+        """
+        start = time.perf_counter()
+        self.classify("warm up")
+        print(f"Classifier warmed up in {time.perf_counter() - start:.1f}s")
     
     def classify(self, prompt: str) -> str:
+        return self.classify_with_confidence(prompt)[0]
+
+    def classify_many(self, prompts: List[str]) -> List[str]:
+        """
+        Classify many prompts with one encode and one matrix multiply.
+
+        Args:
+            prompts: The user's input prompts
+
+        Returns:
+            One model family per prompt, the same as classify() would return
+        """
+        return [family for family, _ in self.classify_many_with_confidence(prompts)]
+
+    def embed(self, prompt: str) -> np.ndarray:
+        """
+        Embed a prompt with the classifier model.
+
+        Args:
+            prompt: The user's input prompt
+
+        Returns:
+            Normalized 1D prompt embedding
+        """
+        return self.embed_many([prompt])[0]
+
+    def embed_many(self, prompts: List[str]) -> np.ndarray:
+        """
+        Embed prompts in one batch with the classifier model.
+
+        Args:
+            prompts: The user's input prompts
+
+        Returns:
+            Normalized prompt embeddings, one row per prompt
+        """
         if self.model is None:
             self.initialize_model()
-        assert self.model is not None
-        prompt_embedding = torch.tensor(self.model.encode([prompt], normalize_embeddings=True))
+        assert self.model is not None and self.batcher is not None
+        return np.asarray(self.batcher.embed(prompts), dtype=np.float32)
+
+    def classify_with_confidence(self, prompt: str,
+                                 prompt_embedding: Optional[np.ndarray] = None) -> Tuple[str, float]:
+        """
+        Classify a prompt and estimate how sure the classifier is.
+
+        Each model family scores as its best matching category; the
+        confidence is the winning family's share of a softmax over those
+        scores (Config.ROUTER_EMBEDDING_TEMPERATURE).
+
+        Args:
+            prompt: The user's input prompt to classify
+            prompt_embedding: Precomputed embed(prompt), to avoid encoding twice
+
+        Returns:
+            Tuple of (model family, confidence between 0 and 1)
+        """
+        embeddings = None if prompt_embedding is None else np.asarray(prompt_embedding).reshape(1, -1)
+        return self.classify_many_with_confidence([prompt], embeddings)[0]
+
+    def classify_many_with_confidence(self, prompts: List[str],
+                                      prompt_embeddings: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        Batch version of classify_with_confidence().
+
+        Args:
+            prompts: The user's input prompts
+            prompt_embeddings: Precomputed embed_many(prompts), to avoid encoding twice
+
+        Returns:
+            One (model family, confidence) per prompt
+        """
+        if not prompts:
+            return []
+        if prompt_embeddings is None:
+            prompt_embeddings = self.embed_many(prompts)
         
-        # classify prompt
-        print("Classifying prompt...")
-        scores = util.dot_score(prompt_embedding, self.category_embeddings)[0]
-        best_idx = scores.argmax()
-        return self.model_categories[self.categories[best_idx]]
\ No newline at end of file
+        # classify prompts
+        print(f"Classifying {len(prompts)} prompt(s)...")
+        scores = np.asarray(prompt_embeddings, dtype=np.float32) @ np.asarray(self.category_embeddings).T
+        family_scores = np.stack([scores[:, columns].max(axis=1) for columns in self._family_columns], axis=1)
+
+        logits = family_scores / Config.ROUTER_EMBEDDING_TEMPERATURE
+        probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return [(self.families[idx], float(probabilities[row, idx])) for row, idx in enumerate(best)]
@@ -0,0 +1,200 @@
+"""
+Semantic cache of routing decisions keyed by prompt embedding.
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+class RoutingCache:
+    """
+    Reuses the model family chosen for an earlier prompt when a new prompt's
+    embedding is within a cosine threshold of it.
+
+    Embeddings are kept normalized in one preallocated matrix, so a lookup is
+    a single matrix-vector product. When the cache is full the least recently
+    used entry is overwritten. With a path, entries are saved to an .npz file
+    (at most every save_interval seconds and at exit) and loaded on startup,
+    unless they were written by a different model.
+    """
+
+    def __init__(self, dimension: int, model_name: str, max_entries: int = 5000,
+                 threshold: float = 0.95, path: Optional[str] = None, save_interval: float = 60.0):
+        """
+        Initialize the cache, loading saved entries from path if present.
+
+        Args:
+            dimension: Prompt embedding dimension
+            model_name: Model producing the embeddings (saved entries of other models are ignored)
+            max_entries: Maximum number of cached decisions
+            threshold: Minimum cosine similarity for a cached decision to be reused
+            path: Optional .npz file the entries are persisted to
+            save_interval: Minimum seconds between saves triggered by new entries
+        """
+        self.dimension = dimension
+        self.model_name = model_name
+        self.max_entries = max(1, max_entries)
+        self.threshold = threshold
+        self.path = path
+        self.save_interval = save_interval
+
+        self._lock = threading.Lock()
+        self._embeddings = np.zeros((self.max_entries, dimension), dtype=np.float32)
+        self._families = np.empty(self.max_entries, dtype=object)
+        self._last_used = np.zeros(self.max_entries, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            self._load()
+            atexit.register(self.save)
+
+    def get(self, embedding: np.ndarray) -> Optional[str]:
+        """
+        Look up the decision of the most similar cached prompt.
+
+        Args:
+            embedding: Prompt embedding
+
+        Returns:
+            The cached model family, or None if no cached prompt is close enough
+        """
+        return self.get_many(np.asarray(embedding).reshape(1, -1))[0]
+
+    def get_many(self, embeddings: np.ndarray) -> List[Optional[str]]:
+        """
+        Look up many prompts with one matrix multiply.
+
+        Args:
+            embeddings: Prompt embeddings, one row per prompt
+
+        Returns:
+            The cached model family per prompt, or None where no cached prompt is close enough
+        """
+        queries = np.stack([self._normalize(embedding) for embedding in embeddings]) if len(embeddings) else None
+        results: List[Optional[str]] = [None] * len(embeddings)
+        with self._lock:
+            if self._size and queries is not None:
+                scores = queries @ self._embeddings[:self._size].T
+                best = scores.argmax(axis=1)
+                for row, slot in enumerate(best):
+                    if scores[row, slot] >= self.threshold:
+                        self._clock += 1
+                        self._last_used[slot] = self._clock
+                        results[row] = self._families[slot]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put(self, embedding: np.ndarray, family: str) -> None:
+        """
+        Cache a decision, replacing the entry of a near-identical prompt if there is one.
+
+        Args:
+            embedding: Prompt embedding
+            family: Model family chosen for the prompt
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            slot = None
+            if self._size:
+                scores = self._embeddings[:self._size] @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    slot = best
+            if slot is None:
+                if self._size < self.max_entries:
+                    slot = self._size
+                    self._size += 1
+                else:
+                    slot = int(np.argmin(self._last_used))
+            self._embeddings[slot] = vector
+            self._families[slot] = family
+            self._clock += 1
+            self._last_used[slot] = self._clock
+            self._dirty = True
+            save = self.path is not None and time.monotonic() - self._last_save >= self.save_interval
+        if save:
+            self.save()
+
+    def _normalize(self, embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimension:
+            raise ValueError(f"Expected a {self.dimension}-dimensional embedding, got {vector.shape[0]}")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def save(self) -> None:
+        """Write the entries to path if anything changed since the last save."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            order = np.argsort(self._last_used[:self._size])
+            embeddings = self._embeddings[:self._size][order]
+            families = np.array([str(family) for family in self._families[:self._size][order]], dtype=str)
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                np.savez(f, model_name=np.array(self.model_name), embeddings=embeddings, families=families)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"❌ Failed to save routing cache {self.path}: {e}")
+
+    def _load(self) -> None:
+        """Load saved entries, keeping the most recently used ones that fit."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["model_name"]) != self.model_name or data["embeddings"].shape[1] != self.dimension:
+                    print(f"Ignoring routing cache {self.path}: written by another model")
+                    return
+                # Saved oldest first
+                embeddings = data["embeddings"][-self.max_entries:]
+                families = data["families"][-self.max_entries:]
+        except Exception as e:
+            print(f"❌ Failed to load routing cache {self.path}: {e}")
+            return
+
+        self._size = len(embeddings)
+        self._embeddings[:self._size] = embeddings
+        self._families[:self._size] = [str(family) for family in families]
+        self._last_used[:self._size] = np.arange(1, self._size + 1)
+        self._clock = self._size
+        print(f"✅ Loaded {self._size} routing decisions from {self.path}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and the cache size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": self._size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "path": self.path
+            }
@@ -19,8 +19,129 @@ class Config:
     ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
     
     # Vector Store settings
+    VECTOR_STORE_BACKEND = os.getenv('VECTOR_STORE_BACKEND', 'pinecone')  # "pinecone" or "local"
     FAISS_INDEX_PATH = os.getenv('FAISS_INDEX_PATH', './data/faiss_index')
+    LOCAL_INDEX_PATH = os.getenv('LOCAL_INDEX_PATH', FAISS_INDEX_PATH)
     EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+    CLASSIFIER_MODEL = os.getenv('CLASSIFIER_MODEL', 'thenlper/gte-base')
+    
+    # Pinecone data-plane transport ("rest" or "grpc", which needs pinecone[grpc]); one client
+    # and index handle per process, with PINECONE_POOL_THREADS sending upsert batches in parallel
+    PINECONE_TRANSPORT = os.getenv('PINECONE_TRANSPORT', 'rest')
+    PINECONE_POOL_THREADS = int(os.getenv('PINECONE_POOL_THREADS', 4))
+    PINECONE_UPSERT_BATCH_SIZE = int(os.getenv('PINECONE_UPSERT_BATCH_SIZE', 100))
+    
+    # Pinecone keeps only IDs and filter fields; chunk texts live in a local SQLite
+    # store in this directory (empty keeps the texts in Pinecone metadata)
+    DOCUMENT_STORE_DIR = os.getenv('DOCUMENT_STORE_DIR', './data/documents')
+    
+    # Inference backend for SentenceTransformer models ("torch", "onnx" or "onnx-int8").
+    # "onnx-int8" exports and quantizes each model into EMBEDDING_ONNX_DIR on first use;
+    # EMBEDDING_ONNX_QUANTIZATION picks the CPU target ("arm64", "avx2", "avx512", "avx512_vnni")
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')
+    EMBEDDING_ONNX_DIR = os.getenv('EMBEDDING_ONNX_DIR', './data/onnx_models')
+    EMBEDDING_ONNX_QUANTIZATION = os.getenv('EMBEDDING_ONNX_QUANTIZATION', 'avx2')
+    
+    # Models loaded into the shared registry at import time, so a pre-forking
+    # server (gunicorn --preload) shares them copy-on-write across workers
+    PRELOAD_MODELS = [name.strip() for name in os.getenv('PRELOAD_MODELS', '').split(',') if name.strip()]
+    
+    # Local index type ("flat" for exact search, "hnsw" for the approximate graph index,
+    # "segmented" for memory-mapped append-only segments shared by all worker processes).
+    # Only "segmented" supports several processes writing one LOCAL_INDEX_PATH, e.g.
+    # gunicorn workers or bulk_ingest.py next to a running server; flat, hnsw and
+    # quantized indexes live in one process's memory and refuse a second writer.
+    LOCAL_INDEX_TYPE = os.getenv('LOCAL_INDEX_TYPE', 'flat')
+    # Local namespaces changed by writes are persisted at most once per LOCAL_PERSIST_INTERVAL seconds
+    LOCAL_PERSIST_INTERVAL = float(os.getenv('LOCAL_PERSIST_INTERVAL', 1.0))
+    HNSW_M = int(os.getenv('HNSW_M', 16))
+    HNSW_EF_CONSTRUCTION = int(os.getenv('HNSW_EF_CONSTRUCTION', 100))
+    HNSW_EF_SEARCH = int(os.getenv('HNSW_EF_SEARCH', 64))
+    
+    # Flat local index quantization ("none", "int8" or "binary"); the best
+    # top_k * QUANTIZATION_RESCORE_FACTOR candidates are rescored in float32
+    LOCAL_QUANTIZATION = os.getenv('LOCAL_QUANTIZATION', 'none')
+    QUANTIZATION_RESCORE_FACTOR = int(os.getenv('QUANTIZATION_RESCORE_FACTOR', 4))
+    
+    # Segmented local index compaction
+    SEGMENT_MAX_COUNT = int(os.getenv('SEGMENT_MAX_COUNT', 8))
+    SEGMENT_MAX_DELETED_RATIO = float(os.getenv('SEGMENT_MAX_DELETED_RATIO', 0.3))
+    SEGMENT_COMPACT_INTERVAL = float(os.getenv('SEGMENT_COMPACT_INTERVAL', 30))
+    
+    # Embedding cache settings (size 0 disables the cache, empty path disables the disk tier)
+    EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 10000))
+    EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', '')
+    
+    # Embedding micro-batching settings (max wait 0 disables batching)
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv('EMBEDDING_BATCH_MAX_SIZE', 64))
+    EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv('EMBEDDING_BATCH_MAX_WAIT_MS', 5))
+    
+    # Background ingestion settings
+    INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', 1000))
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', 2))
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 64))
+    INGEST_FLUSH_INTERVAL_MS = float(os.getenv('INGEST_FLUSH_INTERVAL_MS', 250))
+    INGEST_PUT_TIMEOUT = float(os.getenv('INGEST_PUT_TIMEOUT', 0.5))
+    
+    # Retrieval cache settings (size 0 disables the cache)
+    RETRIEVAL_CACHE_SIZE = int(os.getenv('RETRIEVAL_CACHE_SIZE', 2048))
+    RETRIEVAL_CACHE_TTL = float(os.getenv('RETRIEVAL_CACHE_TTL', 300))
+    
+    # Context chunking: chunks are capped at the embedding model's sequence length
+    CONTEXT_CHUNK_TOKENS = int(os.getenv('CONTEXT_CHUNK_TOKENS', 200))
+    CONTEXT_CHUNK_OVERLAP_TOKENS = int(os.getenv('CONTEXT_CHUNK_OVERLAP_TOKENS', 32))
+    # Streaming uploads: bytes read per step, and how long a full ingestion queue
+    # may stall the upload before the request is rejected
+    STREAM_READ_BYTES = int(os.getenv('STREAM_READ_BYTES', 65536))
+    STREAM_PUT_TIMEOUT = float(os.getenv('STREAM_PUT_TIMEOUT', 10))
+    
+    # Ingest deduplication: vector IDs are content hashes, so exact repeats overwrite;
+    # with DEDUP_NEAR_DUPLICATES, texts within DEDUP_MAX_DISTANCE SimHash bits of a stored
+    # text are not embedded at all. Off by default: an edited fact or deadline in a long
+    # chunk is only a bit or two away, so the update would be dropped
+    DEDUP_NEAR_DUPLICATES = os.getenv('DEDUP_NEAR_DUPLICATES', 'False').lower() == 'true'
+    DEDUP_MAX_DISTANCE = int(os.getenv('DEDUP_MAX_DISTANCE', 3))
+    
+    # Retention: "type:max_age_days:max_count" per vector type (empty field = no limit, e.g.
+    # "conversation::5000"), enforced every RETENTION_INTERVAL seconds (0 disables the job).
+    # No policies by default. Only the worker process holding RETENTION_LOCK_PATH runs the job.
+    # Types: conversation (chat and voice turns), context (posted documents), appointment,
+    # email, document (bulk_ingest.py) and summary. On Pinecone the job only sees vectors
+    # recorded in this host's DOCUMENT_STORE_DIR, so it must run on the host that ingests them.
+    # With RETENTION_SUMMARIZE, removed conversation turns are first consolidated into summary vectors
+    RETENTION_POLICIES = os.getenv('RETENTION_POLICIES', '')
+    RETENTION_INTERVAL = float(os.getenv('RETENTION_INTERVAL', 3600))
+    RETENTION_LOCK_PATH = os.getenv('RETENTION_LOCK_PATH', './data/retention.lock')
+    RETENTION_SUMMARIZE = os.getenv('RETENTION_SUMMARIZE', 'False').lower() == 'true'
+    RETENTION_SUMMARY_GROUP_SIZE = int(os.getenv('RETENTION_SUMMARY_GROUP_SIZE', 10))
+    
+    # Hot tier: each user's latest HOT_TIER_SIZE writes are kept in memory and searched
+    # alongside the index, so they are visible before the upsert lands (size 0 disables it)
+    HOT_TIER_SIZE = int(os.getenv('HOT_TIER_SIZE', 32))
+    HOT_TIER_MAX_NAMESPACES = int(os.getenv('HOT_TIER_MAX_NAMESPACES', 1000))
+    
+    # Model routing cascade: keyword rules, then the local embedding classifier, and the
+    # LLM classifier only when the embedding confidence is below ROUTER_CONFIDENCE_THRESHOLD
+    ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv('ROUTER_CONFIDENCE_THRESHOLD', 0.6))
+    ROUTER_EMBEDDING_TEMPERATURE = float(os.getenv('ROUTER_EMBEDDING_TEMPERATURE', 0.05))
+    # Concurrent LLM classifier requests (one per unsure prompt) made by classify_many()
+    ROUTER_LLM_CONCURRENCY = int(os.getenv('ROUTER_LLM_CONCURRENCY', 8))
+    # LLM routing decisions are logged to ROUTER_LOG_PATH (empty disables the log); a router
+    # distilled from them with train_router.py answers instead of the LLM when it is at
+    # least ROUTER_DISTILLED_THRESHOLD sure
+    ROUTER_LOG_PATH = os.getenv('ROUTER_LOG_PATH', './data/routing_log.jsonl')
+    ROUTER_DISTILLED_PATH = os.getenv('ROUTER_DISTILLED_PATH', './data/router_distilled.npz')
+    ROUTER_DISTILLED_THRESHOLD = float(os.getenv('ROUTER_DISTILLED_THRESHOLD', 0.8))
+    # Load the classifier model and category embeddings before the server reports ready
+    ROUTER_WARMUP = os.getenv('ROUTER_WARMUP', 'True').lower() == 'true'
+    # Routing cache: LLM decisions are reused for prompts whose embedding is within
+    # ROUTER_CACHE_THRESHOLD cosine similarity (size 0 disables it, empty path keeps it in memory)
+    ROUTER_CACHE_SIZE = int(os.getenv('ROUTER_CACHE_SIZE', 5000))
+    ROUTER_CACHE_THRESHOLD = float(os.getenv('ROUTER_CACHE_THRESHOLD', 0.95))
+    ROUTER_CACHE_PATH = os.getenv('ROUTER_CACHE_PATH', './data/router_cache.npz')
+    
+    # Hybrid retrieval: fuse BM25 keyword hits with dense results
+    HYBRID_RETRIEVAL = os.getenv('HYBRID_RETRIEVAL', 'True').lower() == 'true'
     
     # RAG settings
     MAX_CONTEXT_LENGTH = 2000
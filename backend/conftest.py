@@ -0,0 +1,9 @@
+"""
+Make the backend modules importable as top-level packages (as app.py
+imports them) when pytest runs from the repository root.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
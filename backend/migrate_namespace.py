@@ -0,0 +1,91 @@
+"""
+Move stored vectors from one namespace to another.
+
+Vectors written before stores were partitioned by user live in the default
+"" namespace, which per-user queries no longer search. This one-off
+migration copies them, with their embeddings and metadata, into a user's
+namespace and deletes the originals. It is safe to rerun after an
+interruption: vectors already moved are no longer in the source namespace.
+
+Usage (from the backend directory):
+    python migrate_namespace.py --to <uid>
+"""
+
+import argparse
+from typing import List
+import numpy as np
+from vector_store import create_vector_store
+
+
+def list_ids(vector_store, namespace: str) -> List[str]:
+    """
+    List every vector ID in a namespace.
+
+    Pinecone lists IDs itself, which includes vectors written before the
+    document store existed; other stores are scanned.
+    """
+    index = getattr(vector_store, "index", None)
+    if index is not None and hasattr(index, "list"):
+        try:
+            return [vector_id for page in index.list(namespace=namespace) for vector_id in page]
+        except Exception as e:
+            # Pod-based indexes cannot list IDs
+            print(f"   Listing Pinecone IDs failed ({e}); scanning the document store instead")
+    return [vector_id for vector_id, _ in vector_store.scan(namespace=namespace)]
+
+
+def migrate(vector_store, source: str, target: str, batch_size: int = 100) -> int:
+    """
+    Move every vector of a namespace into another namespace.
+
+    Args:
+        vector_store: Vector store holding both namespaces
+        source: Namespace to move vectors out of
+        target: Namespace to move vectors into
+        batch_size: Vectors fetched and upserted per call
+
+    Returns:
+        Number of vectors moved
+    """
+    ids = list_ids(vector_store, source)
+    moved = 0
+    for start in range(0, len(ids), batch_size):
+        records = vector_store.fetch(ids[start:start + batch_size], namespace=source)
+        if not records:
+            continue
+        metadatas = [dict(record.get("metadata") or {}) for record in records]
+        vector_store.upsert_embeddings(
+            np.asarray([record["values"] for record in records], dtype=np.float32),
+            [metadata.pop("text", "") for metadata in metadatas],
+            ids=[record["id"] for record in records],
+            namespace=target,
+            metadatas=metadatas
+        )
+        # Only delete once the copies are written
+        vector_store.delete([record["id"] for record in records], namespace=source)
+        moved += len(records)
+        print(f"   Moved {moved}/{len(ids)} vectors")
+    vector_store.flush()
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move vectors from one namespace to another")
+    parser.add_argument("--to", required=True, dest="target", help="Namespace (user ID) to move vectors into")
+    parser.add_argument("--from", default="", dest="source",
+                        help="Namespace to move vectors out of (default: the legacy \"\" namespace)")
+    parser.add_argument("--index-name", default="alerihglhiuaerg")
+    parser.add_argument("--backend", default=None, help="pinecone or local (default: VECTOR_STORE_BACKEND)")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        parser.error("--from and --to must differ")
+
+    vector_store = create_vector_store(args.index_name, backend=args.backend, autosave=False)
+    moved = migrate(vector_store, args.source, args.target, args.batch_size)
+    print(f"✅ Moved {moved} vectors from namespace '{args.source}' to '{args.target}'")
+
+
+if __name__ == "__main__":
+    main()
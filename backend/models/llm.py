@@ -1,10 +1,10 @@
 import os
-import threading
 from abc import ABC, abstractmethod
 from typing import Optional
 from dotenv import load_dotenv
 
-from vector_store import PineconeVectorStore
+from vector_store import BaseVectorStore
+from vector_store.ingestion import get_ingestion_service
 
 # Load environment variables from .env
 load_dotenv()
@@ -36,7 +36,7 @@ class BaseLLM(ABC):
             token_limit: int = 1000,
             system_prompt: str = "",
             user_id: Optional[str] = None,
-            vector_store: Optional[PineconeVectorStore] = None
+            vector_store: Optional[BaseVectorStore] = None
             ):
         """
         Initialize the LLM.
@@ -46,7 +46,7 @@ class BaseLLM(ABC):
             temperature: Temperature for text generation (0.0 to 1.0)
             token_limit: Maximum tokens for responses
             system_prompt: System prompt for the model
-            user_id: User identifier for vector store isolation
+            user_id: User identifier; also the vector store namespace for this user
             vector_store: Vector store instance for context management
 
         Raises:
@@ -91,7 +91,8 @@ class BaseLLM(ABC):
             A string containing relevant context chunks, or empty string if none found
         """
         try:
-            results = self.vector_store.query(prompt, top_k=7)
+            # Only search this user's namespace
+            results = self.vector_store.query(prompt, top_k=7, namespace=self.user_id)
             
             if not results:
                 return ""
@@ -112,6 +113,9 @@ class BaseLLM(ABC):
         """
         Ingest context into the vector store asynchronously.
         
+        The context is queued on the shared ingestion service, which batches
+        it with other pending turns into a single upsert.
+        
         Args:
             context: The context data to ingest
         """
@@ -119,17 +123,10 @@ class BaseLLM(ABC):
             return
             
         try:
-            def ingest_worker():
-                try:
-                    self.vector_store.upsert_texts([context])
-                    print(f"✅ Context ingested asynchronously: {context[:50]}...")
-                except Exception as e:
-                    print(f"❌ Error ingesting context asynchronously: {e}")
-            
-            # Start ingestion in background thread
-            thread = threading.Thread(target=ingest_worker, daemon=True)
-            thread.start()
-            
+            if not get_ingestion_service(self.vector_store).submit(
+                context, namespace=self.user_id, metadata={"type": "conversation"}
+            ):
+                print(f"Warning: Context was not queued for ingestion: {context[:50]}...")
         except Exception as e:
             print(f"Error starting async context ingestion: {e}")
 
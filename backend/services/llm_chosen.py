@@ -1,7 +1,7 @@
 import re
 from models import GPT, Gemini, Claude, GroqAI
 from models.agent import Agent
-from vector_store import PineconeVectorStore
+from vector_store import BaseVectorStore
 
 class LLMRouter:
     def __init__(self):
@@ -88,7 +88,7 @@ class LLMRouter:
         
         return False
     
-    def llm_response(self, llm_name: str, uid: str, vector_store: PineconeVectorStore, 
+    def llm_response(self, llm_name: str, uid: str, vector_store: BaseVectorStore, 
                     prompt: str, previous_prompt: str, previous_output: str):
         """Enhanced LLM response with automatic agent routing"""
         
@@ -122,7 +122,7 @@ class LLMRouter:
                     # Convert appointment details to text format for vector store
                     appointment_text = self._format_appointment_for_vector_store()
                     if appointment_text:
-                        vector_store.upsert_texts([appointment_text])
+                        vector_store.upsert_texts([appointment_text], namespace=uid, metadatas=[{"type": "appointment"}])
                     self.agent.clear_after_scheduling()
                 
                 # Clear agent conversation after successful email sending
@@ -130,7 +130,7 @@ class LLMRouter:
                     # Convert email details to text format for vector store
                     email_text = self._format_email_for_vector_store()
                     if email_text:
-                        vector_store.upsert_texts([email_text])
+                        vector_store.upsert_texts([email_text], namespace=uid, metadatas=[{"type": "email"}])
                     self.agent.clear_after_emailing()
             
             return agent_response
@@ -211,7 +211,7 @@ class LLMRouter:
         return email_text
 
 # Backward compatibility function
-def llm_response(llm_name: str, uid: str, vector_store: PineconeVectorStore, prompt: str, previous_prompt: str, previous_output: str):
+def llm_response(llm_name: str, uid: str, vector_store: BaseVectorStore, prompt: str, previous_prompt: str, previous_output: str):
     """Legacy function for backward compatibility"""
     router = LLMRouter()
     return router.llm_response(llm_name, uid, vector_store, prompt, previous_prompt, previous_output)
\ No newline at end of file
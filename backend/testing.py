@@ -14,6 +14,7 @@ class Config:
                  test_embeddings: bool = True,
                  test_index_manager: bool = True,
                  test_pinecone: bool = True,
+                 test_local_vector_store: bool = True,
                  test_llm_models: bool = True,
                  test_simple_agent: bool = True,
                  test_emailing: bool = True,
@@ -23,6 +24,7 @@ class Config:
         self.test_embeddings = test_embeddings
         self.test_index_manager = test_index_manager
         self.test_pinecone = test_pinecone
+        self.test_local_vector_store = test_local_vector_store
         self.test_llm_models = test_llm_models
         self.test_simple_agent = test_simple_agent
         self.test_emailing = test_emailing
@@ -81,6 +83,8 @@ def test_embeddings():
     print(f"Number of embeddings: {len(embeddings)}")
     print(f"Embedding dimension: {len(embeddings[0])}")
     print(f"First embedding (first 5 values): {embeddings[0][:5]}")
+    embedding_array = embedding_manager.embed_array(["Hello, world!", "This is a test."])
+    print(f"Embedding array: shape {embedding_array.shape}, dtype {embedding_array.dtype}")
 
 
 def test_index_manager():
@@ -263,6 +267,38 @@ def test_pinecone():
         except:
             pass
 
+def test_local_vector_store():
+    from vector_store import LocalVectorStore
+    import shutil
+    import tempfile
+    print("=== Local Vector Store Test ===\n")
+
+    index_path = tempfile.mkdtemp()
+    try:
+        # 1. Upsert and query
+        print("1. Upserting texts into a local index...")
+        vector_store = LocalVectorStore(index_name="test-local-store", index_path=index_path)
+        vector_ids = vector_store.upsert_texts([
+            "Machine learning is a subset of artificial intelligence",
+            "Python is a popular programming language for data science",
+            "The quick brown fox jumps over the lazy dog"
+        ])
+        results = vector_store.query("What is machine learning?", top_k=2)
+        for i, result in enumerate(results):
+            print(f"   {i+1}. Score: {result['score']:.4f}, Text: {result['metadata']['text'][:50]}...")
+
+        # 2. Delete and reload from disk
+        print("\n2. Deleting a vector and reloading the index from disk...")
+        vector_store.delete(vector_ids[:1])
+        vector_store.flush()
+        reloaded = LocalVectorStore(index_name="test-local-store", index_path=index_path)
+        stats = reloaded.get_stats()
+        print(f"✅ Reloaded stats: {stats}")
+        assert stats["total_vector_count"] == 2
+        assert len(reloaded.fetch(vector_ids)) == 2
+    finally:
+        shutil.rmtree(index_path, ignore_errors=True)
+
 def test_llm_models():
     """Test Claude and GPT models with context extraction and ingestion, including model switching."""
     from models import Claude, GPT
@@ -411,6 +447,13 @@ def main(config: Config):
         except Exception as e:
             print(f"\n❌ Error during Pinecone test: {e}")
 
+    if config.test_local_vector_store:
+        try:
+            test_local_vector_store()
+            print("\n🎉 Local Vector Store test completed successfully!")
+        except Exception as e:
+            print(f"\n❌ Error during Local Vector Store test: {e}")
+
     if config.test_llm_models:
         try:
             test_llm_models()
@@ -446,6 +489,7 @@ if __name__ == "__main__":
         test_embeddings=False,
         test_index_manager=False,
         test_pinecone=False,
+        test_local_vector_store=False,
         test_llm_models=False,
         test_simple_agent=False,
         test_emailing=False,
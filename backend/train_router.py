@@ -0,0 +1,130 @@
+"""
+Train the distilled router from logged LLM routing decisions.
+
+Reads the routing log (Config.ROUTER_LOG_PATH), embeds the prompts with the
+classifier model (Config.CLASSIFIER_MODEL) and fits a logistic regression on
+the LLM's choices. Reports agreement with the LLM router on held-out
+prompts, next to the zero-shot embedding classifier, and per-prompt
+inference latency, then saves the weights to Config.ROUTER_DISTILLED_PATH,
+where ModelRouter picks them up on its next start.
+
+Requires scikit-learn. Usage (from the backend directory):
+    python train_router.py --test-size 0.2 --min-agreement 0.9
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from classifier.distilled_router import DistilledRouter, RoutingLog
+from classifier.nlp_classifier import ModelRouter as NLPModelRouter
+from config import Config
+
+
+def measure_latency(router: NLPModelRouter, distilled: DistilledRouter, prompts: list) -> dict:
+    """Per-prompt latency of the distilled router, with and without embedding the prompt."""
+    embed_ms, predict_ms = [], []
+    for prompt in prompts:
+        start = time.perf_counter()
+        embedding = router.embed(prompt)
+        embedded = time.perf_counter()
+        distilled.predict_many(embedding.reshape(1, -1))
+        embed_ms.append((embedded - start) * 1000.0)
+        predict_ms.append((time.perf_counter() - embedded) * 1000.0)
+    total_ms = np.add(embed_ms, predict_ms)
+    return {
+        "predict_p50": np.percentile(predict_ms, 50),
+        "predict_p95": np.percentile(predict_ms, 95),
+        "total_p50": np.percentile(total_ms, 50),
+        "total_p95": np.percentile(total_ms, 95)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Distill the LLM model router into a local classifier")
+    parser.add_argument("--log", default=Config.ROUTER_LOG_PATH, help="Routing log (JSONL)")
+    parser.add_argument("--output", default=Config.ROUTER_DISTILLED_PATH, help="Where to save the router")
+    parser.add_argument("--test-size", type=float, default=0.2, help="Share of prompts held out for evaluation")
+    parser.add_argument("--C", type=float, default=1.0, help="Inverse regularization strength")
+    parser.add_argument("--min-samples", type=int, default=50)
+    parser.add_argument("--min-agreement", type=float, default=0.0,
+                        help="Do not save the router if its held-out agreement is lower")
+    parser.add_argument("--latency-prompts", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The latest decision for a prompt wins
+    decisions = dict(RoutingLog(args.log))
+    if len(decisions) < args.min_samples:
+        sys.exit(f"Only {len(decisions)} distinct logged prompts in {args.log}; need {args.min_samples}")
+    prompts = list(decisions)
+    labels = [decisions[prompt] for prompt in prompts]
+    counts = Counter(labels)
+    if len(counts) < 2:
+        sys.exit(f"All logged decisions are '{labels[0]}'; need at least two families")
+
+    router = NLPModelRouter()
+    start = time.perf_counter()
+    embeddings = router.embed_many(prompts)
+    print(f"Embedded {len(prompts)} prompts with {Config.CLASSIFIER_MODEL} ({Config.EMBEDDING_BACKEND}) in {time.perf_counter() - start:.1f}s")
+    print("Decisions per family: " + ", ".join(f"{family}={count}" for family, count in counts.most_common()))
+
+    indices = np.arange(len(prompts))
+    # Stratify only when every family has enough prompts for both splits
+    stratify = labels if min(counts.values()) >= 2 else None
+    train_idx, test_idx = train_test_split(indices, test_size=args.test_size, random_state=args.seed, stratify=stratify)
+    y = np.array(labels)
+
+    start = time.perf_counter()
+    classifier = LogisticRegression(C=args.C, max_iter=1000)
+    classifier.fit(embeddings[train_idx], y[train_idx])
+    print(f"Trained on {len(train_idx)} prompts in {time.perf_counter() - start:.1f}s")
+
+    distilled = DistilledRouter(
+        [str(c) for c in classifier.classes_], classifier.coef_, classifier.intercept_, Config.CLASSIFIER_MODEL,
+        Config.EMBEDDING_BACKEND
+    )
+    predicted = distilled.predict_many(embeddings[test_idx])
+    distilled_labels = np.array([family for family, _ in predicted])
+    probabilities = np.array([probability for _, probability in predicted])
+    zero_shot = np.array([
+        family for family, _ in router.classify_many_with_confidence([prompts[i] for i in test_idx], embeddings[test_idx])
+    ])
+
+    agreement = float(np.mean(distilled_labels == y[test_idx]))
+    confident = probabilities >= Config.ROUTER_DISTILLED_THRESHOLD
+    print(f"\nAgreement with the LLM router on {len(test_idx)} held-out prompts")
+    print(f"  distilled router:         {agreement:.3f}")
+    print(f"  zero-shot embedding:      {np.mean(zero_shot == y[test_idx]):.3f}")
+    if confident.any():
+        print(f"  distilled, p >= {Config.ROUTER_DISTILLED_THRESHOLD:<8} "
+              f"{np.mean(distilled_labels[confident] == y[test_idx][confident]):.3f} "
+              f"on {confident.mean():.0%} of prompts (the rest still go to the LLM)")
+    for family in distilled.classes:
+        mask = y[test_idx] == family
+        if mask.any():
+            print(f"    {family:<8} {np.mean(distilled_labels[mask] == family):.3f} ({mask.sum()} prompts)")
+
+    latency_prompts = [prompts[i] for i in test_idx[:args.latency_prompts]]
+    latency = measure_latency(router, distilled, latency_prompts)
+    print(f"\nPer-prompt latency over {len(latency_prompts)} prompts")
+    print(f"  predict only:        p50={latency['predict_p50']:.3f} ms  p95={latency['predict_p95']:.3f} ms")
+    print(f"  embed and predict:   p50={latency['total_p50']:.2f} ms  p95={latency['total_p95']:.2f} ms")
+
+    if agreement < args.min_agreement:
+        sys.exit(f"\nAgreement {agreement:.3f} is below --min-agreement {args.min_agreement}; not saving")
+
+    # Refit on every prompt for the saved router
+    classifier.fit(embeddings, y)
+    DistilledRouter(
+        [str(c) for c in classifier.classes_], classifier.coef_, classifier.intercept_, Config.CLASSIFIER_MODEL,
+        Config.EMBEDDING_BACKEND
+    ).save(args.output)
+    print(f"\n✅ Saved distilled router to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
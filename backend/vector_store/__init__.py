@@ -1,4 +1,8 @@
 from .embeddings import EmbeddingManager
+from .model_registry import ModelRegistry, get_model_registry
 from .index_manager import IndexManager
+from .base import BaseVectorStore
 from .vector_store import PineconeVectorStore
+from .local_store import LocalVectorStore
+from .factory import create_vector_store
 #from .context_store import ContextAwareVectorStore
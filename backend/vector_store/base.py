@@ -0,0 +1,585 @@
+"""
+Base class shared by all vector store backends.
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+import numpy as np
+from config import Config
+from .dedup import NearDuplicateIndex, content_id, simhash
+from .embeddings import EmbeddingManager
+from .filters import matches_filter
+from .hot_tier import HotTier
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .retrieval_cache import RetrievalCache
+
+
+class BaseVectorStore(ABC):
+    """
+    Abstract base class for vector stores.
+
+    Handles text embedding, content-hash ID generation, near-duplicate
+    suppression, retrieval caching and the in-memory lexical (BM25) index
+    used for hybrid retrieval, so that backends only need to implement the
+    vector-level operations.
+    """
+
+    def __init__(self, index_name: str, model_name: str = "all-MiniLM-L6-v2"):
+        """
+        Initialize the vector store and its embedding manager.
+
+        Args:
+            index_name: Name of the index
+            model_name: Name of the SentenceTransformer model to use
+        """
+        self.index_name = index_name
+        self.model_name = model_name
+
+        self.embedding_manager = EmbeddingManager(model_name=model_name)
+        self.dimension = self.embedding_manager.dimension
+
+        self.retrieval_cache = None
+        if Config.RETRIEVAL_CACHE_SIZE > 0:
+            self.retrieval_cache = RetrievalCache(
+                max_entries=Config.RETRIEVAL_CACHE_SIZE,
+                ttl_seconds=Config.RETRIEVAL_CACHE_TTL
+            )
+
+        # Lexical index per namespace, maintained on every upsert and delete.
+        # It only covers texts written by this process (or reloaded by the backend).
+        self.hybrid_retrieval = Config.HYBRID_RETRIEVAL
+        self._lexical_indexes: Dict[str, BM25Index] = {}
+        self._lexical_lock = threading.Lock()
+        self._dense_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dense-query")
+
+        # SimHash fingerprints per namespace, covering the same texts as the lexical index
+        self.dedup_near_duplicates = Config.DEDUP_NEAR_DUPLICATES
+        self.dedup_max_distance = Config.DEDUP_MAX_DISTANCE
+        self._near_duplicate_indexes: Dict[str, NearDuplicateIndex] = {}
+        self.duplicates_skipped = 0
+
+        # Each user's latest writes, searched locally until the index returns them
+        self.hot_tier = None
+        if Config.HOT_TIER_SIZE > 0:
+            self.hot_tier = HotTier(self.dimension, Config.HOT_TIER_SIZE, Config.HOT_TIER_MAX_NAMESPACES)
+
+        # Space freed by delete_entries (retention and filter deletes)
+        self.reclaimed_vectors = 0
+        self.reclaimed_bytes = 0
+
+    def _lexical_index(self, namespace: str) -> BM25Index:
+        """Get or create the lexical index of a namespace."""
+        with self._lexical_lock:
+            index = self._lexical_indexes.get(namespace)
+            if index is None:
+                index = self._lexical_indexes[namespace] = BM25Index()
+            return index
+
+    def _near_duplicate_index(self, namespace: str) -> NearDuplicateIndex:
+        """Get or create the near-duplicate index of a namespace."""
+        with self._lexical_lock:
+            index = self._near_duplicate_indexes.get(namespace)
+            if index is None:
+                index = self._near_duplicate_indexes[namespace] = NearDuplicateIndex(self.dedup_max_distance)
+            return index
+
+    def _index_texts(self, ids: List[str], texts: List[str],
+                     metadatas: List[Dict[str, Any]], namespace: str = "") -> None:
+        """Add stored texts to the namespace's lexical and near-duplicate indexes."""
+        self._lexical_index(namespace).add(ids, texts, metadatas)
+        if self.dedup_near_duplicates:
+            self._near_duplicate_index(namespace).add(ids, texts)
+
+    def _replace_text_indexes(self, ids: List[str], texts: List[str],
+                              metadatas: List[Dict[str, Any]], namespace: str = "") -> None:
+        """Rebuild the namespace's lexical and near-duplicate indexes from its stored texts."""
+        lexical_index = BM25Index()
+        lexical_index.add(ids, texts, metadatas)
+        near_duplicate_index = NearDuplicateIndex(self.dedup_max_distance)
+        if self.dedup_near_duplicates:
+            near_duplicate_index.add(ids, texts)
+        with self._lexical_lock:
+            self._lexical_indexes[namespace] = lexical_index
+            self._near_duplicate_indexes[namespace] = near_duplicate_index
+
+    def _sync_namespace(self, namespace: str = "") -> None:
+        """
+        Pick up writes and deletes other processes made to a namespace.
+
+        Backends whose storage is shared between worker processes refresh the
+        namespace's text indexes and retrieval cache here; others do nothing.
+        """
+
+    def find_duplicates(self, texts: List[str], namespace: str = "") -> List[Optional[str]]:
+        """
+        Find texts that are near-duplicates of stored texts or of earlier texts in the list.
+
+        Only texts written by this process (or reloaded by the backend) are
+        compared. Exact repeats too short to fingerprint are not reported;
+        their content-hash IDs make re-upserting them an overwrite.
+
+        Args:
+            texts: Texts about to be upserted
+            namespace: Namespace they will be written to
+
+        Returns:
+            For each text, the ID of the text it duplicates, or None if it is new
+        """
+        if not self.dedup_near_duplicates:
+            return [None] * len(texts)
+
+        self._sync_namespace(namespace)
+        index = self._near_duplicate_indexes.get(namespace)
+        batch = NearDuplicateIndex(self.dedup_max_distance)
+        duplicates = []
+        for text in texts:
+            fingerprint = simhash(text)
+            match = (index.find(fingerprint) if index is not None else None) or batch.find(fingerprint)
+            if match is None:
+                batch.add([content_id(text)], [text])
+            duplicates.append(match)
+
+        skipped = sum(match is not None for match in duplicates)
+        if skipped:
+            with self._lexical_lock:
+                self.duplicates_skipped += skipped
+        return duplicates
+
+    def upsert_texts(self, texts: List[str],
+                    ids: Optional[List[str]] = None,
+                    namespace: str = "",
+                    metadatas: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """
+        Upsert texts into the vector store using SentenceTransformers embeddings.
+
+        Without explicit IDs, each text gets a content-hash ID and texts that
+        are near-duplicates of already stored ones are skipped without being
+        embedded.
+
+        Args:
+            texts: List of text strings to embed and store
+            ids: Optional list of IDs for the vectors
+            namespace: Namespace to write to (one per user)
+            metadatas: Optional extra metadata per text (e.g. {"type": "email"})
+
+        Returns:
+            List of vector IDs, one per text (the existing ID for skipped duplicates)
+        """
+        if not texts:
+            return []
+
+        if ids is not None:
+            print(f"   Generating embeddings for {len(texts)} texts...")
+            embeddings = self.embedding_manager.embed_array(texts)
+            return self.upsert_embeddings(embeddings, texts, ids, namespace, metadatas)
+
+        duplicates = self.find_duplicates(texts, namespace)
+        new_rows = [row for row, duplicate in enumerate(duplicates) if duplicate is None]
+        new_texts = [texts[row] for row in new_rows]
+        if new_texts:
+            print(f"   Generating embeddings for {len(new_texts)} texts...")
+            self.upsert_embeddings(
+                self.embedding_manager.embed_array(new_texts), new_texts, namespace=namespace,
+                metadatas=[metadatas[row] for row in new_rows] if metadatas else None
+            )
+        if len(new_texts) < len(texts):
+            print(f"   Skipped {len(texts) - len(new_texts)} near-duplicate texts")
+        return [duplicate or content_id(text) for text, duplicate in zip(texts, duplicates)]
+
+    def upsert_embeddings(self, embeddings: np.ndarray, texts: List[str],
+                          ids: Optional[List[str]] = None,
+                          namespace: str = "",
+                          metadatas: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """
+        Upsert precomputed embeddings and their texts.
+
+        Args:
+            embeddings: Array of shape (len(texts), dimension)
+            texts: Texts the embeddings were computed from
+            ids: Optional list of IDs for the vectors (defaults to content hashes of the texts)
+            namespace: Namespace to write to (one per user)
+            metadatas: Optional extra metadata per text (e.g. source and chunk index)
+
+        Returns:
+            List of vector IDs
+        """
+        if not texts:
+            return []
+
+        # Content-hash IDs make exact repeats overwrite the existing vector
+        if ids is None:
+            ids = [content_id(text) for text in texts]
+
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), self.dimension)
+        metadatas = self._stored_metadata(texts, metadatas)
+        self._upsert_vectors(ids, embeddings, metadatas, namespace)
+        self._index_texts(ids, texts, metadatas, namespace)
+        if self.hot_tier is not None:
+            self.hot_tier.add(ids, metadatas, embeddings, namespace)
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.invalidate(namespace)
+        return ids
+
+    @staticmethod
+    def _stored_metadata(texts: List[str],
+                         metadatas: Optional[List[Optional[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Metadata stored with each text; created_at (epoch seconds) lets retention age vectors out."""
+        now = int(time.time())
+        return [
+            {"created_at": now, **(extra or {}), "text": text}
+            for text, extra in zip(texts, metadatas or [None] * len(texts))
+        ]
+
+    def remember_recent(self, texts: List[str], namespace: str = "",
+                        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None) -> None:
+        """
+        Make texts that are queued for ingestion visible to queries right away.
+
+        They are kept in the hot tier under the IDs the upsert will give them
+        and embedded by the first query that searches the namespace.
+
+        Args:
+            texts: Texts queued for ingestion
+            namespace: Namespace they will be written to
+            metadatas: Optional extra metadata per text
+        """
+        if self.hot_tier is None or not texts:
+            return
+        self.hot_tier.add([content_id(text) for text in texts], self._stored_metadata(texts, metadatas),
+                          namespace=namespace)
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.invalidate(namespace)
+
+    def forget_recent(self, texts: List[str], namespace: str = "") -> None:
+        """
+        Drop texts passed to remember_recent that will not be upserted after all.
+
+        Args:
+            texts: Texts dropped from ingestion
+            namespace: Namespace they were queued for
+        """
+        if self.hot_tier is None or not texts:
+            return
+        self.hot_tier.remove([content_id(text) for text in texts], namespace)
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.invalidate(namespace)
+
+    def _search_hot_tier(self, query_embedding: np.ndarray, top_k: int,
+                         filter_dict: Optional[Dict[str, Any]], namespace: str) -> List[Dict[str, Any]]:
+        """Search the namespace's recent writes, embedding any that are still pending."""
+        pending = self.hot_tier.pending(namespace)
+        if pending:
+            # The embedding cache hands these to the ingestion worker for free
+            embeddings = self.embedding_manager.embed_array([text for _, text in pending])
+            self.hot_tier.set_embeddings([vector_id for vector_id, _ in pending], embeddings, namespace)
+        return self.hot_tier.search(query_embedding, top_k, filter_dict, namespace)
+
+    @staticmethod
+    def _merge_by_score(result_lists: List[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+        """Merge cosine-scored result lists, keeping each ID once with its best score."""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for results in result_lists:
+            for result in results:
+                if result["id"] not in merged or result["score"] > merged[result["id"]]["score"]:
+                    merged[result["id"]] = result
+        return sorted(merged.values(), key=lambda result: result["score"], reverse=True)[:top_k]
+
+    def query(self, query_text: str, top_k: int = 7, filter_dict: Optional[Dict[str, Any]] = None,
+              namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Query the vector store for similar texts using SentenceTransformers embeddings.
+
+        Args:
+            query_text: Text to search for
+            top_k: Number of results to return
+            filter_dict: Optional filter for metadata
+            namespace: Namespace to search (one per user)
+
+        Returns:
+            List of dictionaries containing id, score, and metadata
+        """
+        self._sync_namespace(namespace)
+
+        # A repeated prompt skips both the encode and the vector query
+        cache_key = None
+        if self.retrieval_cache is not None:
+            cache_key = self.retrieval_cache.make_key(
+                namespace, RetrievalCache.text_digest(query_text), top_k, filter_dict
+            )
+            cached = self.retrieval_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # Recent writes the index may not return yet are searched locally and
+        # merged into the index results; the index is always queried too
+        query_embedding = None
+        hot_results = []
+        if self.hot_tier is not None and self.hot_tier.ids(namespace):
+            query_embedding = self.embedding_manager.embed_array([query_text])[0]
+            hot_results = self._search_hot_tier(query_embedding, top_k * 2, filter_dict, namespace)
+
+        lexical_index = self._lexical_indexes.get(namespace)
+        if self.hybrid_retrieval and lexical_index is not None and len(lexical_index):
+            # Dense search runs on the executor while BM25 runs here; all lists are fused
+            candidates = top_k * 2
+            dense_future = self._dense_executor.submit(
+                self._dense_query, query_text, candidates, filter_dict, namespace, query_embedding
+            )
+            lexical_results = lexical_index.search(query_text, candidates, filter_dict)
+            result_lists = [dense_future.result(), lexical_results]
+            if hot_results:
+                result_lists.append(hot_results)
+            results = reciprocal_rank_fusion(result_lists, top_k)
+        else:
+            results = self._dense_query(query_text, top_k, filter_dict, namespace, query_embedding)
+            if hot_results:
+                results = self._merge_by_score([results, hot_results], top_k)
+
+        if cache_key is not None:
+            self.retrieval_cache.put(cache_key, results)
+        return results
+
+    def _dense_query(self, query_text: str, top_k: int,
+                     filter_dict: Optional[Dict[str, Any]], namespace: str,
+                     query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Embed the query text (unless already embedded) and run the vector search."""
+        if query_embedding is None:
+            query_embedding = self.embedding_manager.embed_array([query_text])[0]
+        return self.query_embedding(query_embedding, top_k, filter_dict, namespace)
+
+    def keyword_search(self, query_text: str, top_k: int = 7,
+                       filter_dict: Optional[Dict[str, Any]] = None,
+                       namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Exact-term lookup against the local BM25 index only.
+
+        Useful for email addresses, event names and IDs, and answered without
+        an embedding or a vector query.
+
+        Args:
+            query_text: Terms to search for
+            top_k: Number of results to return
+            filter_dict: Optional filter for metadata
+            namespace: Namespace to search (one per user)
+
+        Returns:
+            List of dictionaries containing id, score, and metadata
+        """
+        self._sync_namespace(namespace)
+        lexical_index = self._lexical_indexes.get(namespace)
+        if lexical_index is None:
+            return []
+        return lexical_index.search(query_text, top_k, filter_dict)
+
+    def query_embedding(self, query_embedding: np.ndarray, top_k: int = 7,
+                        filter_dict: Optional[Dict[str, Any]] = None,
+                        namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Query the vector store with a precomputed embedding.
+
+        Args:
+            query_embedding: 1D query embedding
+            top_k: Number of results to return
+            filter_dict: Optional filter for metadata
+            namespace: Namespace to search (one per user)
+
+        Returns:
+            List of dictionaries containing id, score, and metadata
+        """
+        query_embedding = np.asarray(query_embedding, dtype=np.float32).reshape(self.dimension)
+        self._sync_namespace(namespace)
+
+        cache_key = None
+        if self.retrieval_cache is not None:
+            cache_key = self.retrieval_cache.make_key(
+                namespace, RetrievalCache.embedding_digest(query_embedding), top_k, filter_dict
+            )
+            cached = self.retrieval_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        results = self._query_vector(query_embedding, top_k, filter_dict, namespace)
+        if cache_key is not None:
+            self.retrieval_cache.put(cache_key, results)
+        return results
+
+    def delete(self, ids: List[str], namespace: str = "") -> bool:
+        """
+        Delete vectors by IDs.
+
+        Args:
+            ids: List of vector IDs to delete
+            namespace: Namespace holding the vectors
+
+        Returns:
+            True if successful
+        """
+        deleted = self._delete(ids, namespace)
+        lexical_index = self._lexical_indexes.get(namespace)
+        if lexical_index is not None:
+            lexical_index.remove(ids)
+        near_duplicate_index = self._near_duplicate_indexes.get(namespace)
+        if near_duplicate_index is not None:
+            near_duplicate_index.remove(ids)
+        if self.hot_tier is not None:
+            self.hot_tier.remove(ids, namespace)
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.invalidate(namespace)
+        return deleted
+
+    def scan(self, filter_dict: Optional[Dict[str, Any]] = None,
+             namespace: str = "") -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        List the stored vectors of a namespace whose metadata matches a filter.
+
+        Args:
+            filter_dict: Optional filter for metadata
+            namespace: Namespace to scan
+
+        Returns:
+            List of (vector ID, metadata)
+        """
+        return [
+            (vector_id, metadata)
+            for batch in self._scan_metadata(namespace)
+            for vector_id, metadata in batch
+            if matches_filter(metadata, filter_dict)
+        ]
+
+    def delete_entries(self, entries: List[Tuple[str, Dict[str, Any]]], namespace: str = "",
+                       batch_size: int = 1000) -> int:
+        """
+        Bulk-delete scanned vectors and count the space reclaimed.
+
+        Args:
+            entries: (vector ID, metadata) pairs from scan()
+            namespace: Namespace holding the vectors
+            batch_size: IDs per delete call
+
+        Returns:
+            Number of vectors deleted
+        """
+        for start in range(0, len(entries), batch_size):
+            batch = entries[start:start + batch_size]
+            self.delete([vector_id for vector_id, _ in batch], namespace)
+            # Vector values plus the stored ID and metadata
+            freed = sum(
+                self.dimension * 4 + len(vector_id) + len(json.dumps(metadata))
+                for vector_id, metadata in batch
+            )
+            with self._lexical_lock:
+                self.reclaimed_vectors += len(batch)
+                self.reclaimed_bytes += freed
+        return len(entries)
+
+    def delete_by_filter(self, filter_dict: Dict[str, Any], namespace: str = "") -> int:
+        """
+        Delete every vector of a namespace whose metadata matches a filter.
+
+        Args:
+            filter_dict: Filter for metadata, e.g. {"type": "conversation", "created_at": {"$lt": cutoff}}
+            namespace: Namespace to delete from
+
+        Returns:
+            Number of vectors deleted
+        """
+        return self.delete_entries(self.scan(filter_dict, namespace), namespace)
+
+    def flush(self) -> None:
+        """Write changes the backend buffers in memory to durable storage."""
+
+    def reclaimed_stats(self) -> Dict[str, int]:
+        """
+        Get the space reclaimed by delete_entries.
+
+        Returns:
+            Dictionary with deleted vector count and estimated bytes freed
+        """
+        with self._lexical_lock:
+            return {"vectors": self.reclaimed_vectors, "bytes": self.reclaimed_bytes}
+
+    @abstractmethod
+    def _scan_metadata(self, namespace: str = "") -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Stream the IDs and metadata of every vector in a namespace.
+
+        Args:
+            namespace: Namespace to scan
+
+        Yields:
+            Lists of (vector ID, metadata)
+        """
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    @abstractmethod
+    def _upsert_vectors(self, ids: List[str], embeddings: np.ndarray,
+                        metadatas: List[Dict[str, Any]], namespace: str = "") -> None:
+        """
+        Store precomputed embeddings with their metadata.
+
+        Args:
+            ids: Vector IDs
+            embeddings: float32 array with one row per ID
+            metadatas: Metadata dictionaries, one per ID
+            namespace: Namespace to write to
+        """
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    @abstractmethod
+    def _query_vector(self, query_embedding: np.ndarray, top_k: int,
+                      filter_dict: Optional[Dict[str, Any]], namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Find the stored vectors most similar to a query embedding.
+
+        Args:
+            query_embedding: 1D float32 embedding of the query text
+            top_k: Number of results to return
+            filter_dict: Optional filter for metadata
+            namespace: Namespace to search
+
+        Returns:
+            List of dictionaries containing id, score, and metadata
+        """
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    @abstractmethod
+    def _delete(self, ids: List[str], namespace: str = "") -> bool:
+        """
+        Delete vectors by IDs from the backend.
+
+        Args:
+            ids: List of vector IDs to delete
+            namespace: Namespace holding the vectors
+
+        Returns:
+            True if successful
+        """
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    @abstractmethod
+    def fetch(self, ids: List[str], namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Fetch vectors by IDs.
+
+        Args:
+            ids: List of vector IDs to fetch
+            namespace: Namespace holding the vectors
+
+        Returns:
+            List of dictionaries containing id, values, and metadata
+        """
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dictionary with index statistics, including per-namespace vector counts
+        """
+        raise NotImplementedError("This method must be implemented by subclasses.")
@@ -0,0 +1,144 @@
+"""
+Cross-request micro-batching for embedding inference.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding calls into one batched encode.
+
+    Callers from different threads submit their texts; a single worker thread
+    waits up to max_wait_ms after the first pending request, gathers whatever
+    else arrived (up to max_batch_size texts), runs one encode and hands each
+    caller its own slice of the result.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 name: str = "embedding-batcher"):
+        """
+        Initialize the batcher.
+
+        Args:
+            encode_fn: Function that embeds a list of texts into a 2D array
+            max_batch_size: Maximum number of texts per batched encode
+            max_wait_ms: Maximum time to wait for more requests after the first one
+            name: Name of the worker thread
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._carry: Optional[Tuple[List[str], Future]] = None
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.texts = 0
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for embedding.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Future resolving to an array with one embedding row per text
+        """
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.empty((0, 0), dtype=np.float32))
+            return future
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, sharing the encode with concurrent callers.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array with one embedding row per text
+        """
+        return self.submit(texts).result()
+
+    def _next_batch(self) -> List[Tuple[List[str], Future]]:
+        """Block for the first request, then gather more until full or the window closes."""
+        first = self._carry if self._carry is not None else self._queue.get()
+        self._carry = None
+
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(request[0]) > self.max_batch_size:
+                # Keep it for the next batch rather than overshooting this one
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: encode one batch at a time and resolve the callers' futures."""
+        while True:
+            batch = self._next_batch()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = np.asarray(self.encode_fn(texts))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def stats(self) -> dict:
+        """
+        Get batching statistics.
+
+        Returns:
+            Dictionary with the number of batches, texts and the average batch size
+        """
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0,
+            "pending": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
@@ -0,0 +1,186 @@
+"""
+Split documents into overlapping chunks sized for embedding.
+"""
+
+import re
+from typing import Callable, List, Optional, Tuple
+
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S", re.MULTILINE)
+# End of a sentence or paragraph in a stream: only final once the following whitespace has arrived
+_STREAM_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def _approximate_tokens(text: str) -> int:
+    """Word-piece token estimate for when no tokenizer is available."""
+    return int(len(text.split()) * 1.3) + 1
+
+
+class StreamingChunker:
+    """
+    Incrementally splits a text stream into overlapping token-bounded chunks.
+
+    Text is fed in arbitrary pieces (e.g. request body reads). Complete
+    sentences are accumulated until the next one would exceed max_tokens,
+    then the chunk is emitted and its last sentences, up to overlap_tokens,
+    start the next one. Only the unfinished sentence and the current chunk
+    are held in memory.
+    """
+
+    def __init__(self, max_tokens: int = 200, overlap_tokens: int = 32,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        """
+        Initialize the chunker.
+
+        Args:
+            max_tokens: Maximum tokens per chunk
+            overlap_tokens: Tokens repeated from the end of the previous chunk
+            count_tokens: Function returning the token count of a text
+                (defaults to a word-based estimate)
+        """
+        self.max_tokens = max(1, max_tokens)
+        self.overlap_tokens = min(overlap_tokens, self.max_tokens // 2)
+        self.count_tokens = count_tokens or _approximate_tokens
+        # A sentence with no terminator is cut at a word boundary once the buffer reaches this size
+        self.max_buffer_chars = self.max_tokens * 16
+
+        self._buffer = ""
+        # Offset in the buffer before which no sentence boundary can start
+        self._scan_from = 0
+        self._sentences: List[Tuple[str, int]] = []
+        self._tokens = 0
+        self._fresh = 0
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add text and return the chunks it completed.
+
+        Args:
+            text: Next piece of the stream
+
+        Returns:
+            Completed chunks, possibly empty
+        """
+        self._buffer += text
+        buffer, start, chunks = self._buffer, 0, []
+        while True:
+            match = _STREAM_BOUNDARY.search(buffer, self._scan_from)
+            if match is not None:
+                sentence, start = buffer[start:match.start()], match.end()
+            elif len(buffer) - start >= self.max_buffer_chars:
+                cut = buffer.rfind(" ", start, start + self.max_buffer_chars)
+                cut = cut if cut > start else start + self.max_buffer_chars
+                sentence, start = buffer[start:cut], cut
+            else:
+                break
+            self._scan_from = start
+            chunks.extend(self._add_sentence(sentence.strip()))
+
+        # Only the unfinished sentence is kept; a boundary can still begin in its trailing whitespace
+        self._buffer = buffer[start:]
+        self._scan_from = len(self._buffer.rstrip())
+        return chunks
+
+    def close(self) -> List[str]:
+        """
+        Flush the remaining text at the end of the stream.
+
+        Returns:
+            The final chunks, possibly empty
+        """
+        chunks = self._add_sentence(self._buffer.strip())
+        self._buffer, self._scan_from = "", 0
+        if self._fresh:
+            chunks.append(self._emit())
+        self._sentences, self._tokens, self._fresh = [], 0, 0
+        return chunks
+
+    def _add_sentence(self, sentence: str) -> List[str]:
+        if not sentence:
+            return []
+        tokens = self.count_tokens(sentence)
+        words = sentence.split()
+        if tokens > self.max_tokens and len(words) > 1:
+            # Split an overlong sentence into word runs that fit
+            chunks = []
+            step = max(1, len(words) * self.max_tokens // (tokens * 2))
+            for start in range(0, len(words), step):
+                chunks.extend(self._add_sentence(" ".join(words[start:start + step])))
+            return chunks
+
+        chunks = []
+        if self._fresh and self._tokens + tokens > self.max_tokens:
+            chunks.append(self._emit())
+            # Carry the tail of the emitted chunk into the next one
+            carried, carried_tokens = [], 0
+            for previous, previous_tokens in reversed(self._sentences):
+                if carried_tokens + previous_tokens > self.overlap_tokens or \
+                        carried_tokens + previous_tokens + tokens > self.max_tokens:
+                    break
+                carried.insert(0, (previous, previous_tokens))
+                carried_tokens += previous_tokens
+            self._sentences, self._tokens, self._fresh = carried, carried_tokens, 0
+
+        self._sentences.append((sentence, tokens))
+        self._tokens += tokens
+        self._fresh += 1
+        return chunks
+
+    def _emit(self) -> str:
+        return " ".join(sentence for sentence, _ in self._sentences)
+
+
+def chunk_text(text: str, max_tokens: int = 200, overlap_tokens: int = 32,
+               count_tokens: Optional[Callable[[str], int]] = None) -> List[str]:
+    """
+    Split plain text into token-bounded chunks with StreamingChunker.
+
+    Args:
+        text: Text to split
+        max_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens repeated from the end of the previous chunk
+        count_tokens: Function returning the token count of a text
+            (defaults to a word-based estimate)
+
+    Returns:
+        List of chunks (empty for blank text)
+    """
+    chunker = StreamingChunker(max_tokens, overlap_tokens, count_tokens)
+    return chunker.feed(text) + chunker.close()
+
+
+def chunk_markdown(text: str, max_tokens: int = 200, overlap_tokens: int = 32,
+                   count_tokens: Optional[Callable[[str], int]] = None) -> List[str]:
+    """
+    Split markdown into token-bounded chunks that never cross a heading.
+
+    Each section (a heading and the text up to the next heading) is chunked
+    separately, and chunks after the first in a section repeat the heading
+    so they keep their context.
+
+    Args:
+        text: Markdown text to split
+        max_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens repeated from the previous chunk within a section
+        count_tokens: Function returning the token count of a text
+            (defaults to a word-based estimate)
+
+    Returns:
+        List of chunks (empty for blank text)
+    """
+    count_tokens = count_tokens or _approximate_tokens
+    starts = [match.start() for match in _MARKDOWN_HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(text))
+
+    chunks = []
+    for start, end in zip(starts, starts[1:]):
+        section = text[start:end].strip()
+        if not section:
+            continue
+        heading = section.splitlines()[0] if _MARKDOWN_HEADING.match(section) else ""
+        heading_tokens = count_tokens(heading) if heading else 0
+        budget = max_tokens - heading_tokens if heading and heading_tokens < max_tokens // 2 else max_tokens
+        for i, chunk in enumerate(chunk_text(section, budget, overlap_tokens, count_tokens)):
+            chunks.append(f"{heading}\n{chunk}" if i and budget < max_tokens else chunk)
+    return chunks
@@ -0,0 +1,155 @@
+"""
+Content-hash vector IDs and SimHash near-duplicate detection.
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+# Bits per SimHash fingerprint, split into bands for candidate lookup
+SIMHASH_BITS = 64
+
+# Texts with fewer words than this only match exact repeats: one changed
+# word moves their fingerprint too far for SimHash to be reliable
+MIN_SIMHASH_WORDS = 8
+
+
+def content_id(text: str) -> str:
+    """
+    Deterministic vector ID for a text.
+
+    Whitespace differences are ignored, so re-posting the same text
+    overwrites the existing vector instead of adding a new one.
+
+    Args:
+        text: Text the vector was embedded from
+
+    Returns:
+        32 hex character ID
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash fingerprint of a text over its lowercase words and word
+    pairs, weighted by count.
+
+    Near-identical texts get fingerprints a small Hamming distance apart;
+    word pairs keep reordered texts apart.
+
+    Args:
+        text: Text to fingerprint
+
+    Returns:
+        Fingerprint, or None for texts too short to fingerprint reliably
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < MIN_SIMHASH_WORDS:
+        return None
+    features = Counter(words) + Counter(f"{first} {second}" for first, second in zip(words, words[1:]))
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features],
+        dtype=np.uint64
+    )
+    weights = np.fromiter(features.values(), dtype=np.int64, count=len(features))
+    bits = ((hashes[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)).astype(np.int64)
+    votes = (bits * 2 - 1).T @ weights
+    return int(sum(1 << int(i) for i in np.flatnonzero(votes > 0)))
+
+
+class NearDuplicateIndex:
+    """
+    SimHash fingerprints of the texts stored in one namespace.
+
+    Fingerprints are split into max_distance + 1 bands; two fingerprints
+    within max_distance bits of each other agree on at least one whole band,
+    so only texts sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        """
+        Initialize an empty index.
+
+        Args:
+            max_distance: Largest Hamming distance treated as a near duplicate
+        """
+        self.max_distance = max_distance
+        self.num_bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.num_bands
+
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, int] = {}
+        self._bands: List[Dict[int, set]] = [{} for _ in range(self.num_bands)]
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (band * self.band_bits)) & mask for band in range(self.num_bands)]
+
+    def find(self, fingerprint: Optional[int]) -> Optional[str]:
+        """
+        Find a stored text near a fingerprint.
+
+        Args:
+            fingerprint: Fingerprint from simhash()
+
+        Returns:
+            ID of a near-duplicate text, or None
+        """
+        if fingerprint is None:
+            return None
+        with self._lock:
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                for doc_id in self._bands[band].get(key, ()):
+                    if bin(self._fingerprints[doc_id] ^ fingerprint).count("1") <= self.max_distance:
+                        return doc_id
+        return None
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """
+        Fingerprint and index texts, replacing any existing entry with the same ID.
+
+        Args:
+            ids: Vector IDs
+            texts: Texts the vectors were embedded from
+        """
+        fingerprints = [simhash(text) for text in texts]
+        with self._lock:
+            for doc_id, fingerprint in zip(ids, fingerprints):
+                self._remove_locked(doc_id)
+                if fingerprint is None:
+                    continue
+                self._fingerprints[doc_id] = fingerprint
+                for band, key in enumerate(self._band_keys(fingerprint)):
+                    self._bands[band].setdefault(key, set()).add(doc_id)
+
+    def remove(self, ids: List[str]) -> None:
+        """
+        Remove texts from the index.
+
+        Args:
+            ids: Vector IDs to remove
+        """
+        with self._lock:
+            for doc_id in ids:
+                self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        fingerprint = self._fingerprints.pop(doc_id, None)
+        if fingerprint is None:
+            return
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            members = self._bands[band].get(key)
+            if members is not None:
+                members.discard(doc_id)
+                if not members:
+                    del self._bands[band][key]
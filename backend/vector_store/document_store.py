@@ -0,0 +1,160 @@
+"""
+SQLite store for chunk texts and metadata, keyed by namespace and vector ID.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# SQLite limits the number of bound parameters per statement
+_MAX_PARAMS = 500
+
+
+class DocumentStore:
+    """
+    Embedded document store that keeps texts out of the vector index.
+
+    The vector index stores only IDs and filter fields; query results are
+    hydrated with one batched lookup here. Each thread uses its own
+    connection, and WAL mode lets several worker processes share the file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        try:
+            connection = self._connection()
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "namespace TEXT NOT NULL, id TEXT NOT NULL, text TEXT NOT NULL, metadata TEXT NOT NULL, "
+                "PRIMARY KEY (namespace, id))"
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to open document store {path}: {e}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the calling thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def put(self, ids: List[str], texts: List[str],
+            metadatas: List[Dict[str, Any]], namespace: str = "") -> None:
+        """
+        Store texts and their metadata, replacing existing entries with the same IDs.
+
+        Args:
+            ids: Vector IDs
+            texts: Chunk texts
+            metadatas: Metadata dictionaries, one per ID (without the text)
+            namespace: Namespace the vectors belong to
+        """
+        rows = [
+            (namespace, doc_id, text, json.dumps(metadata))
+            for doc_id, text, metadata in zip(ids, texts, metadatas)
+        ]
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO documents (namespace, id, text, metadata) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def get(self, ids: List[str], namespace: str = "") -> Dict[str, Dict[str, Any]]:
+        """
+        Look up the metadata of many vectors at once.
+
+        Args:
+            ids: Vector IDs
+            namespace: Namespace the vectors belong to
+
+        Returns:
+            Metadata (including "text") by ID; unknown IDs are left out
+        """
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(ids), _MAX_PARAMS):
+            batch = ids[start:start + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT id, text, metadata FROM documents WHERE namespace = ? AND id IN ({placeholders})",
+                [namespace, *batch]
+            )
+            for doc_id, text, metadata in rows:
+                found[doc_id] = {**json.loads(metadata), "text": text}
+        return found
+
+    def delete(self, ids: List[str], namespace: str = "") -> None:
+        """
+        Remove entries.
+
+        Args:
+            ids: Vector IDs to remove
+            namespace: Namespace the vectors belong to
+        """
+        connection = self._connection()
+        with connection:
+            for start in range(0, len(ids), _MAX_PARAMS):
+                batch = ids[start:start + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                connection.execute(
+                    f"DELETE FROM documents WHERE namespace = ? AND id IN ({placeholders})",
+                    [namespace, *batch]
+                )
+
+    def iter_namespace(self, namespace: str = "",
+                       batch_size: int = 1000) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Stream every entry of a namespace in batches.
+
+        Args:
+            namespace: Namespace to read
+            batch_size: Entries per batch
+
+        Yields:
+            Lists of (ID, metadata including "text")
+        """
+        cursor = self._connection().execute(
+            "SELECT id, text, metadata FROM documents WHERE namespace = ?", (namespace,)
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [(doc_id, {**json.loads(metadata), "text": text}) for doc_id, text, metadata in rows]
+
+    def namespaces(self) -> List[str]:
+        """Namespaces with at least one entry."""
+        return [row[0] for row in self._connection().execute("SELECT DISTINCT namespace FROM documents")]
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        """
+        Number of stored entries.
+
+        Args:
+            namespace: Namespace to count (all namespaces if None)
+
+        Returns:
+            Entry count
+        """
+        if namespace is None:
+            return self._connection().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM documents WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
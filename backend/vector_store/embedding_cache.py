@@ -0,0 +1,200 @@
+"""
+Content-addressed cache for text embeddings.
+"""
+
+import os
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
+from config import Config
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (model name, text hash).
+
+    The first tier is an in-process LRU. The optional second tier is a SQLite
+    file, which lets several worker processes on one host share embeddings.
+    Disk reads and writes hold only the SQLite connection lock, so lookups
+    served from memory never wait on disk I/O.
+    """
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            max_entries: Maximum number of embeddings kept in memory
+            disk_path: Optional path of the SQLite file used as the shared disk tier
+        """
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(disk_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """Build the cache key for a text embedded by a given model."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model_name}:{digest}"
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for a list of texts.
+
+        Args:
+            model_name: Name of the model that produced the embeddings
+            texts: Texts to look up
+
+        Returns:
+            One float32 vector per text, or None where the text is not cached
+        """
+        keys = [self.make_key(model_name, text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    results[i] = vector
+                    self.hits += 1
+                else:
+                    missing.append(i)
+            if not missing or self._conn is None:
+                self.misses += len(missing)
+                return results
+
+        found = self._read_disk([keys[i] for i in missing])
+
+        with self._lock:
+            still_missing = []
+            for i in missing:
+                vector = found.get(keys[i])
+                if vector is None:
+                    still_missing.append(i)
+                    continue
+                results[i] = vector
+                self._remember(keys[i], vector)
+                self.hits += 1
+                self.disk_hits += 1
+            self.misses += len(still_missing)
+        return results
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up keys in the SQLite tier."""
+        found = {}
+        with self._conn_lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                found.update({key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows})
+        return found
+
+    def put_many(self, model_name: str, texts: List[str], vectors: np.ndarray) -> None:
+        """
+        Store embeddings for a list of texts.
+
+        Args:
+            model_name: Name of the model that produced the embeddings
+            texts: Texts that were embedded
+            vectors: Embedding matrix with one row per text
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        keys = [self.make_key(model_name, text) for text in texts]
+
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector.copy())
+
+        if self._conn is not None:
+            with self._conn_lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in zip(keys, vectors)]
+                )
+                self._conn.commit()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the in-memory LRU, evicting the least recently used entry."""
+        vector.flags.writeable = False
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and the in-memory size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_path": self.disk_path
+            }
+
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[EmbeddingCache]:
+    """
+    Get the process-wide embedding cache configured in Config.
+
+    Returns:
+        The shared EmbeddingCache, or None if caching is disabled
+    """
+    global _default_cache
+    if Config.EMBEDDING_CACHE_SIZE <= 0:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache(
+                max_entries=Config.EMBEDDING_CACHE_SIZE,
+                disk_path=Config.EMBEDDING_CACHE_PATH or None
+            )
+        return _default_cache
@@ -2,30 +2,124 @@
 Embedding Manager for generating text embeddings using SentenceTransformers.
 """
 
-from typing import List
-from sentence_transformers import SentenceTransformer
+from typing import Dict, List, Optional
+import numpy as np
+from config import Config
+from .batcher import EmbeddingBatcher
+from .embedding_cache import EmbeddingCache, get_default_cache
+from .model_registry import get_model_registry
 
 class EmbeddingManager:
     """
     Manages text embedding generation using a SentenceTransformer model.
     """
-    
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache: Optional[EmbeddingCache] = None,
+                 use_cache: bool = True, backend: Optional[str] = None):
         """
         Initialize Embedding Manager with a SentenceTransformer model.
+        The model itself is shared through the process-wide model registry.
 
         Args:
             model_name: Name of the SentenceTransformer model to use
+            cache: Embedding cache to use (defaults to the process-wide cache)
+            use_cache: Set to False to always re-encode texts
+            backend: Inference backend ("torch", "onnx" or "onnx-int8"); defaults to Config.EMBEDDING_BACKEND
         """
-        print(f"Loading embedding model: {model_name}...")
-        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        self.backend = backend or Config.EMBEDDING_BACKEND
+        self.model = get_model_registry().get(model_name, self.backend)
+        # Quantized backends produce slightly different vectors, so they get their own cache entries
+        self.cache_model_key = model_name if self.backend == "torch" else f"{model_name}@{self.backend}"
         self.dimension = self.model.get_sentence_embedding_dimension()
-        print(f"Model loaded successfully. Vector dimension: {self.dimension}")
+        self.cache = (cache or get_default_cache()) if use_cache else None
+
+        # Coalesce concurrent encode calls from request threads and ingestion workers
+        self.batcher = None
+        if Config.EMBEDDING_BATCH_MAX_WAIT_MS > 0:
+            self.batcher = EmbeddingBatcher(
+                self._encode,
+                max_batch_size=Config.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=Config.EMBEDDING_BATCH_MAX_WAIT_MS,
+                name=f"embedding-batcher-{model_name}"
+            )
+        print(f"Embedding model {model_name} ({self.backend}) ready. Vector dimension: {self.dimension}")
+
+    @property
+    def max_tokens(self) -> int:
+        """Longest input, in tokens, that the model embeds without truncating."""
+        return getattr(self.model, "max_seq_length", None) or 256
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the model tokens in a text (special tokens excluded).
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return len(text.split())
+        return len(tokenizer.tokenize(text))
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run the model on a list of texts."""
+        return np.asarray(self.model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+    def _encode_batched(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, sharing the model call with concurrent callers when batching is enabled."""
+        if self.batcher is None:
+            return self._encode(texts)
+        return self.batcher.embed(texts)
+
+    def embed_array(self, texts: List[str], dtype: np.dtype = np.float32) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts as a single NumPy matrix.
+
+        Cached texts are served from the embedding cache; only misses are
+        passed to the model.
+
+        Args:
+            texts: List of text strings to embed
+            dtype: Output dtype (float32, or float16 to halve memory)
+
+        Returns:
+            Array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=dtype)
+
+        if self.cache is None:
+            return self._encode_batched(texts).astype(dtype, copy=False)
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=dtype)
+        cached = self.cache.get_many(self.cache_model_key, texts)
+        missing_rows: Dict[str, List[int]] = {}
+        for row, (text, vector) in enumerate(zip(texts, cached)):
+            if vector is None:
+                missing_rows.setdefault(text, []).append(row)
+            else:
+                embeddings[row] = vector
+
+        if missing_rows:
+            missing = list(missing_rows)
+            encoded = self._encode_batched(missing)
+            self.cache.put_many(self.cache_model_key, missing, encoded)
+            for text, vector in zip(missing, encoded):
+                embeddings[missing_rows[text]] = vector
+
+        return embeddings
 
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of texts.
 
+        Prefer embed_array; this converts to Python lists for callers that
+        need JSON-serializable vectors.
+
         Args:
             texts: List of text strings to embed
 
@@ -34,6 +128,22 @@ class EmbeddingManager:
         """
         if not texts:
             return []
-        
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
-        return [vec.tolist() for vec in embeddings]
+        return self.embed_array(texts).tolist()
+
+    def cache_stats(self) -> dict:
+        """
+        Get embedding cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters, or an empty dict if caching is disabled
+        """
+        return self.cache.stats() if self.cache is not None else {}
+
+    def batch_stats(self) -> dict:
+        """
+        Get micro-batching statistics.
+
+        Returns:
+            Dictionary with batch counters, or an empty dict if batching is disabled
+        """
+        return self.batcher.stats() if self.batcher is not None else {}
@@ -0,0 +1,55 @@
+"""
+Factory for selecting the vector store backend from configuration.
+"""
+
+from typing import Optional
+from config import Config
+from .base import BaseVectorStore
+
+
+def create_vector_store(index_name: str = "adaptlm-index",
+                        backend: Optional[str] = None,
+                        autosave: bool = True) -> BaseVectorStore:
+    """
+    Create the configured vector store backend.
+
+    Args:
+        index_name: Name of the index
+        backend: Backend to use ("pinecone" or "local"); defaults to Config.VECTOR_STORE_BACKEND
+        autosave: Persist local writes in the background; without it the caller
+            persists them with flush() (Pinecone writes are always durable)
+
+    Returns:
+        A vector store instance
+
+    Raises:
+        ValueError: If the backend is not supported
+    """
+    backend = (backend or Config.VECTOR_STORE_BACKEND).lower()
+
+    if backend == "pinecone":
+        from .vector_store import PineconeVectorStore
+        return PineconeVectorStore(index_name=index_name, document_store_dir=Config.DOCUMENT_STORE_DIR)
+    elif backend == "local":
+        from .local_store import LocalVectorStore
+        return LocalVectorStore(
+            index_name=index_name,
+            index_path=Config.LOCAL_INDEX_PATH,
+            autosave=autosave,
+            index_type=Config.LOCAL_INDEX_TYPE,
+            hnsw_params={
+                "M": Config.HNSW_M,
+                "ef_construction": Config.HNSW_EF_CONSTRUCTION,
+                "ef_search": Config.HNSW_EF_SEARCH
+            },
+            quantization=Config.LOCAL_QUANTIZATION,
+            rescore_factor=Config.QUANTIZATION_RESCORE_FACTOR,
+            segment_params={
+                "max_segments": Config.SEGMENT_MAX_COUNT,
+                "max_deleted_ratio": Config.SEGMENT_MAX_DELETED_RATIO
+            },
+            compact_interval=Config.SEGMENT_COMPACT_INTERVAL,
+            persist_interval=Config.LOCAL_PERSIST_INTERVAL
+        )
+
+    raise ValueError(f"Vector store backend {backend} not supported. Use: pinecone, local")
@@ -0,0 +1,62 @@
+"""
+Pinecone-style metadata filter evaluation for in-process indexes.
+"""
+
+from typing import Any, Dict, Optional
+
+
+def matches_filter(metadata: Dict[str, Any], filter_dict: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check whether metadata satisfies a Pinecone-style metadata filter.
+
+    Supports plain equality plus the $eq, $ne, $gt, $gte, $lt, $lte, $in,
+    $nin, $and and $or operators.
+
+    Args:
+        metadata: Metadata dictionary of a stored vector
+        filter_dict: Filter to evaluate (None matches everything)
+
+    Returns:
+        True if the metadata matches the filter
+    """
+    if not filter_dict:
+        return True
+
+    for key, condition in filter_dict.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for op, expected in condition.items():
+            if op == "$eq":
+                ok = value == expected
+            elif op == "$ne":
+                ok = value != expected
+            elif op == "$in":
+                ok = value in expected
+            elif op == "$nin":
+                ok = value not in expected
+            elif value is None:
+                ok = False
+            elif op == "$gt":
+                ok = value > expected
+            elif op == "$gte":
+                ok = value >= expected
+            elif op == "$lt":
+                ok = value < expected
+            elif op == "$lte":
+                ok = value <= expected
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            if not ok:
+                return False
+    return True
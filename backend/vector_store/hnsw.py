@@ -0,0 +1,370 @@
+"""
+Hierarchical Navigable Small World (HNSW) graph for approximate nearest-neighbour search.
+"""
+
+import heapq
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+class HNSWIndex:
+    """
+    HNSW index over L2-normalized vectors, scored by inner product (cosine).
+
+    Supports incremental inserts, deletes (tombstones that are still used for
+    graph traversal but never returned) and persistence to a single .npz file.
+    Replacing a label tombstones its old node too, and the graph is rebuilt
+    from the live vectors once tombstones outnumber them.
+
+    Parameters follow the HNSW paper: M is the number of links per node on
+    the upper layers (2 * M on layer 0), ef_construction the candidate list
+    size while inserting and ef_search the candidate list size while querying.
+    """
+
+    def __init__(self, dimension: int, M: int = 16, ef_construction: int = 100,
+                 ef_search: int = 64, seed: int = 42):
+        """
+        Initialize an empty HNSW index.
+
+        Args:
+            dimension: Vector dimension
+            M: Links per node on the upper layers
+            ef_construction: Candidate list size used while inserting
+            ef_search: Default candidate list size used while querying
+            seed: Seed for the random level generator
+        """
+        self.dimension = dimension
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.level_mult = 1.0 / math.log(max(M, 2))
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """Clear the graph and all stored vectors."""
+        self.vectors = np.empty((0, self.dimension), dtype=np.float32)
+        self.count = 0
+        self.levels: List[int] = []
+        self.links: List[List[List[int]]] = []
+        self.labels: List[str] = []
+        self.label_to_node: Dict[str, int] = {}
+        self.deleted = np.zeros(0, dtype=bool)
+        self.num_deleted = 0
+        self.entry_point = -1
+        self.max_level = -1
+
+    def __len__(self) -> int:
+        return self.count - self.num_deleted
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow the vector matrix and tombstone mask geometrically."""
+        capacity = self.vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        grown = np.empty((new_capacity, self.dimension), dtype=np.float32)
+        grown[:self.count] = self.vectors[:self.count]
+        self.vectors = grown
+        deleted = np.zeros(new_capacity, dtype=bool)
+        deleted[:self.count] = self.deleted[:self.count]
+        self.deleted = deleted
+
+    def _random_level(self) -> int:
+        return int(-math.log(1.0 - self._rng.random()) * self.level_mult)
+
+    def _search_layer(self, query: np.ndarray, entry_points: List[int], ef: int,
+                      level: int) -> List[Tuple[float, int]]:
+        """
+        Best-first search of one layer.
+
+        Returns:
+            Up to ef (similarity, node) pairs, unordered
+        """
+        visited = set(entry_points)
+        sims = self.vectors[entry_points] @ query
+        candidates = [(-float(sim), node) for sim, node in zip(sims, entry_points)]
+        heapq.heapify(candidates)
+        results = [(float(sim), node) for sim, node in zip(sims, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if -neg_sim < results[0][0] and len(results) >= ef:
+                break
+
+            neighbors = [n for n in self.links[node][level] if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+
+            # Score all unvisited neighbours with one matrix-vector product
+            for sim, neighbor in zip((self.vectors[neighbors] @ query).tolist(), neighbors):
+                if len(results) < ef or sim > results[0][0]:
+                    heapq.heappush(candidates, (-sim, neighbor))
+                    heapq.heappush(results, (sim, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return results
+
+    def _select_neighbors(self, candidates: List[Tuple[float, int]], M: int) -> List[int]:
+        """
+        Neighbour selection heuristic: prefer candidates that are closer to the
+        base point than to any already selected neighbour, then fill up with
+        the closest discarded ones.
+        """
+        ordered = sorted(candidates, reverse=True)
+        if len(ordered) <= M:
+            return [node for _, node in ordered]
+
+        nodes = [node for _, node in ordered]
+        # Pairwise similarities between all candidates, computed once; closest[i]
+        # tracks candidate i's highest similarity to any selected neighbour
+        candidate_vectors = self.vectors[nodes]
+        gram = candidate_vectors @ candidate_vectors.T
+        closest = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected: List[int] = []
+        discarded: List[int] = []
+        for i, (sim, _) in enumerate(ordered):
+            if len(selected) >= M:
+                break
+            if sim > closest[i]:
+                selected.append(i)
+                np.maximum(closest, gram[i], out=closest)
+            else:
+                discarded.append(i)
+
+        for i in discarded:
+            if len(selected) >= M:
+                break
+            selected.append(i)
+        return [nodes[i] for i in selected]
+
+    def add(self, labels: List[str], vectors: np.ndarray) -> None:
+        """
+        Insert vectors; an existing label is replaced.
+
+        Args:
+            labels: External IDs, one per vector
+            vectors: L2-normalized float32 array with one row per label
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        with self._lock:
+            self._ensure_capacity(self.count + len(labels))
+            for label, vector in zip(labels, vectors):
+                old = self.label_to_node.get(label)
+                if old is not None:
+                    self.deleted[old] = True
+                    self.num_deleted += 1
+                self._insert(label, vector)
+            self._maybe_rebuild()
+
+    def _insert(self, label: str, vector: np.ndarray) -> None:
+        """Insert one vector into the graph."""
+        node = self.count
+        self.count += 1
+        self.vectors[node] = vector
+        level = self._random_level()
+        self.levels.append(level)
+        self.links.append([[] for _ in range(level + 1)])
+        self.labels.append(label)
+        self.label_to_node[label] = node
+
+        if self.entry_point == -1:
+            self.entry_point = node
+            self.max_level = level
+            return
+
+        entry = self.entry_point
+        for layer in range(self.max_level, level, -1):
+            entry = max(self._search_layer(vector, [entry], 1, layer))[1]
+
+        entry_points = [entry]
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(vector, entry_points, self.ef_construction, layer)
+            max_links = self.M0 if layer == 0 else self.M
+            neighbors = self._select_neighbors(found, self.M)
+            self.links[node][layer] = neighbors
+
+            for neighbor in neighbors:
+                neighbor_links = self.links[neighbor][layer]
+                neighbor_links.append(node)
+                if len(neighbor_links) > max_links:
+                    sims = (self.vectors[neighbor_links] @ self.vectors[neighbor]).tolist()
+                    self.links[neighbor][layer] = self._select_neighbors(
+                        list(zip(sims, neighbor_links)), max_links
+                    )
+            entry_points = [n for _, n in found]
+
+        if level > self.max_level:
+            self.entry_point = node
+            self.max_level = level
+
+    def remove(self, labels: List[str]) -> int:
+        """
+        Tombstone vectors by label.
+
+        Args:
+            labels: External IDs to remove
+
+        Returns:
+            Number of vectors removed
+        """
+        removed = 0
+        with self._lock:
+            for label in labels:
+                node = self.label_to_node.pop(label, None)
+                if node is None:
+                    continue
+                self.deleted[node] = True
+                self.num_deleted += 1
+                removed += 1
+            self._maybe_rebuild()
+        return removed
+
+    def _maybe_rebuild(self) -> None:
+        """Rebuild once tombstones outnumber the live vectors."""
+        if self.num_deleted > max(len(self), 1000):
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Rebuild the graph from the live vectors, dropping tombstones."""
+        with self._lock:
+            live = [node for node in range(self.count) if not self.deleted[node]]
+            labels = [self.labels[node] for node in live]
+            vectors = self.vectors[live].copy()
+            self._reset()
+            self.add(labels, vectors)
+
+    def get_vector(self, label: str) -> Optional[np.ndarray]:
+        """Return the stored vector of a label, or None."""
+        node = self.label_to_node.get(label)
+        return None if node is None else self.vectors[node]
+
+    def search(self, query: np.ndarray, top_k: int, ef: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Approximate nearest-neighbour search.
+
+        Args:
+            query: L2-normalized float32 query vector
+            top_k: Number of results to return
+            ef: Candidate list size (defaults to ef_search, never below top_k)
+
+        Returns:
+            List of (label, similarity) pairs, best first
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(self.dimension)
+        with self._lock:
+            if self.entry_point == -1 or top_k <= 0:
+                return []
+
+            entry = self.entry_point
+            for layer in range(self.max_level, 0, -1):
+                entry = max(self._search_layer(query, [entry], 1, layer))[1]
+
+            # Over-fetch by the tombstone ratio so deletes do not starve results
+            ef = max(ef or self.ef_search, top_k)
+            if self.num_deleted:
+                ef = min(int(ef * self.count / max(len(self), 1)), self.count)
+            found = self._search_layer(query, [entry], ef, 0)
+
+            results = []
+            for sim, node in sorted(found, reverse=True):
+                if self.deleted[node]:
+                    continue
+                results.append((self.labels[node], sim))
+                if len(results) >= top_k:
+                    break
+            return results
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """
+        Copy the graph into the arrays save() writes, so they can be written
+        to disk while the index keeps changing.
+
+        Returns:
+            Arrays by .npz entry name
+        """
+        with self._lock:
+            link_counts = [len(layer) for node_links in self.links for layer in node_links]
+            link_data = [n for node_links in self.links for layer in node_links for n in layer]
+            return {
+                "vectors": self.vectors[:self.count].copy(),
+                "levels": np.asarray(self.levels, dtype=np.int32),
+                "link_counts": np.asarray(link_counts, dtype=np.int32),
+                "link_data": np.asarray(link_data, dtype=np.int32),
+                "labels": np.asarray(self.labels, dtype=str),
+                "deleted": self.deleted[:self.count].copy(),
+                "params": np.asarray([self.M, self.ef_construction, self.ef_search,
+                                      self.entry_point, self.max_level], dtype=np.int64)
+            }
+
+    def save(self, path: str, state: Optional[Dict[str, np.ndarray]] = None) -> None:
+        """
+        Persist the index to a .npz file.
+
+        Args:
+            path: Destination file path
+            state: Arrays from state() to write instead of the current graph
+        """
+        state = self.state() if state is None else state
+        with open(path, "wb") as f:
+            np.savez(f, **state)
+
+    @classmethod
+    def load(cls, path: str, ef_construction: Optional[int] = None,
+             ef_search: Optional[int] = None) -> "HNSWIndex":
+        """
+        Load an index saved with save().
+
+        M shapes the stored graph and is always taken from the file.
+
+        Args:
+            path: Path of the .npz file
+            ef_construction: Candidate list size for later inserts (defaults to the saved value)
+            ef_search: Default query candidate list size (defaults to the saved value)
+
+        Returns:
+            The loaded HNSWIndex
+        """
+        data = np.load(path)
+        M, saved_ef_construction, saved_ef_search, entry_point, max_level = data["params"].tolist()
+        vectors = data["vectors"]
+        index = cls(vectors.shape[1], M=M,
+                    ef_construction=ef_construction or saved_ef_construction,
+                    ef_search=ef_search or saved_ef_search)
+
+        index.count = vectors.shape[0]
+        index.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        index.deleted = data["deleted"].astype(bool)
+        index.num_deleted = int(index.deleted.sum())
+        index.levels = data["levels"].tolist()
+        index.labels = data["labels"].tolist()
+        index.entry_point = entry_point
+        index.max_level = max_level
+
+        link_counts = data["link_counts"].tolist()
+        link_data = data["link_data"].tolist()
+        index.links = []
+        position = 0
+        count_position = 0
+        for level in index.levels:
+            node_links = []
+            for _ in range(level + 1):
+                size = link_counts[count_position]
+                node_links.append(link_data[position:position + size])
+                position += size
+                count_position += 1
+            index.links.append(node_links)
+
+        index.label_to_node = {
+            label: node for node, label in enumerate(index.labels) if not index.deleted[node]
+        }
+        return index
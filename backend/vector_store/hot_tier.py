@@ -0,0 +1,204 @@
+"""
+In-memory ring of each user's most recent writes, searched alongside the vector index.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+from .filters import matches_filter
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class _Ring:
+    """Fixed-capacity ring of (ID, metadata, embedding) for one namespace."""
+
+    def __init__(self, capacity: int, dimension: int):
+        self.ids: List[Optional[str]] = [None] * capacity
+        self.metadata: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self.embeddings = np.zeros((capacity, dimension), dtype=np.float32)
+        self.embedded = np.zeros(capacity, dtype=bool)
+        self.slots: Dict[str, int] = {}
+        self.next = 0
+
+
+class HotTier:
+    """
+    Per-namespace rings of recently written texts and their embeddings.
+
+    Texts are added as soon as they are queued for ingestion, before they
+    have an embedding; the embedding is filled in by the first query that
+    needs it (or by the upsert, whichever comes first). Queries search the
+    ring with one matrix product and merge the hits with the index results,
+    so a user's latest turns are visible before an eventually consistent
+    index returns them. The least recently used namespaces are evicted once
+    max_namespaces is reached.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 32, max_namespaces: int = 1000):
+        """
+        Initialize an empty hot tier.
+
+        Args:
+            dimension: Embedding dimension
+            capacity: Most recent texts kept per namespace
+            max_namespaces: Namespaces kept before the least recently used is evicted
+        """
+        self.dimension = dimension
+        self.capacity = max(1, capacity)
+        self.max_namespaces = max(1, max_namespaces)
+
+        self._lock = threading.Lock()
+        self._rings: "OrderedDict[str, _Ring]" = OrderedDict()
+        self.hits = 0
+
+    def add(self, ids: List[str], metadatas: List[Dict[str, Any]],
+            embeddings: Optional[np.ndarray] = None, namespace: str = "") -> None:
+        """
+        Add texts to a namespace's ring, replacing entries with the same IDs.
+
+        Args:
+            ids: Vector IDs
+            metadatas: Metadata dictionaries, including "text"
+            embeddings: Embeddings, or None if not computed yet
+            namespace: Namespace the texts belong to
+        """
+        with self._lock:
+            ring = self._rings.get(namespace)
+            if ring is None:
+                ring = self._rings[namespace] = _Ring(self.capacity, self.dimension)
+                if len(self._rings) > self.max_namespaces:
+                    self._rings.popitem(last=False)
+            self._rings.move_to_end(namespace)
+
+            for row, (vector_id, metadata) in enumerate(zip(ids, metadatas)):
+                slot = ring.slots.get(vector_id)
+                if slot is None:
+                    slot = ring.next
+                    ring.next = (ring.next + 1) % self.capacity
+                    evicted = ring.ids[slot]
+                    if evicted is not None:
+                        del ring.slots[evicted]
+                    ring.ids[slot] = vector_id
+                    ring.slots[vector_id] = slot
+                    ring.embedded[slot] = False
+                ring.metadata[slot] = metadata
+                if embeddings is not None:
+                    ring.embeddings[slot] = _normalize(embeddings[row])
+                    ring.embedded[slot] = True
+
+    def pending(self, namespace: str = "") -> List[Tuple[str, str]]:
+        """
+        Texts in a namespace's ring that have no embedding yet.
+
+        Args:
+            namespace: Namespace to check
+
+        Returns:
+            List of (ID, text)
+        """
+        with self._lock:
+            ring = self._rings.get(namespace)
+            if ring is None:
+                return []
+            return [
+                (ring.ids[slot], ring.metadata[slot].get("text", ""))
+                for slot in ring.slots.values() if not ring.embedded[slot]
+            ]
+
+    def set_embeddings(self, ids: List[str], embeddings: np.ndarray, namespace: str = "") -> None:
+        """
+        Fill in embeddings for entries that are still in the ring.
+
+        Args:
+            ids: Vector IDs from pending()
+            embeddings: One embedding per ID
+            namespace: Namespace holding them
+        """
+        with self._lock:
+            ring = self._rings.get(namespace)
+            if ring is None:
+                return
+            for vector_id, embedding in zip(ids, embeddings):
+                slot = ring.slots.get(vector_id)
+                if slot is not None:
+                    ring.embeddings[slot] = _normalize(embedding)
+                    ring.embedded[slot] = True
+
+    def ids(self, namespace: str = "") -> Set[str]:
+        """IDs currently held for a namespace."""
+        with self._lock:
+            ring = self._rings.get(namespace)
+            return set(ring.slots) if ring is not None else set()
+
+    def search(self, query_embedding: np.ndarray, top_k: int,
+               filter_dict: Optional[Dict[str, Any]] = None, namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Rank a namespace's embedded entries by cosine similarity to a query.
+
+        Args:
+            query_embedding: 1D query embedding
+            top_k: Number of results to return
+            filter_dict: Optional filter for metadata
+            namespace: Namespace to search
+
+        Returns:
+            List of dictionaries containing id, score, and metadata
+        """
+        with self._lock:
+            ring = self._rings.get(namespace)
+            if ring is None:
+                return []
+            self._rings.move_to_end(namespace)
+            slots = [
+                slot for slot in ring.slots.values()
+                if ring.embedded[slot] and matches_filter(ring.metadata[slot], filter_dict)
+            ]
+            if not slots:
+                return []
+            scores = ring.embeddings[slots] @ _normalize(query_embedding)
+            order = np.argsort(-scores)[:top_k]
+            results = [
+                {"id": ring.ids[slots[i]], "score": float(scores[i]), "metadata": ring.metadata[slots[i]]}
+                for i in order
+            ]
+            self.hits += len(results)
+            return results
+
+    def remove(self, ids: List[str], namespace: str = "") -> None:
+        """
+        Drop entries from a namespace's ring.
+
+        Args:
+            ids: Vector IDs to drop
+            namespace: Namespace holding them
+        """
+        with self._lock:
+            ring = self._rings.get(namespace)
+            if ring is None:
+                return
+            for vector_id in ids:
+                slot = ring.slots.pop(vector_id, None)
+                if slot is not None:
+                    ring.ids[slot] = None
+                    ring.metadata[slot] = None
+                    ring.embedded[slot] = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hot tier statistics.
+
+        Returns:
+            Dictionary with namespace and entry counts and hits
+        """
+        with self._lock:
+            return {
+                "namespaces": len(self._rings),
+                "entries": sum(len(ring.slots) for ring in self._rings.values()),
+                "capacity_per_namespace": self.capacity,
+                "hits": self.hits
+            }
@@ -6,7 +6,8 @@ import os
 import time
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec, PodSpec
+from pinecone import ServerlessSpec, PodSpec
+from .pinecone_client import get_index, get_pinecone_client
 
 load_dotenv()
 
@@ -15,7 +16,7 @@ class IndexManager:
         self.api_key = os.getenv("PINECONE_API_KEY")
         if not self.api_key:
             raise ValueError("PINECONE_API_KEY not found in environment variables")
-        self.pc = Pinecone(api_key=self.api_key)
+        self.pc = get_pinecone_client()
 
     def list_indexes(self) -> List[Dict[str, Any]]:
         try:
@@ -39,10 +40,9 @@ class IndexManager:
                      pod_type: Optional[str] = None, pods: Optional[int] = None,
                      model_name: str = "all-MiniLM-L6-v2") -> bool:
         try:
-            # Auto-detect dimension from embedding model if not specified
-            from .embeddings import EmbeddingManager
-            embedding_manager = EmbeddingManager(model_name=model_name)
-            dimension = embedding_manager.dimension
+            # Auto-detect dimension from the shared embedding model
+            from .model_registry import get_model_registry
+            dimension = get_model_registry().dimension(model_name)
             print(f"Auto-detected dimension: {dimension} (from model: {model_name})")
             
             if serverless:
@@ -106,7 +106,7 @@ class IndexManager:
 
     def index_stats(self, name: str) -> Dict[str, Any]:
         try:
-            index = self.pc.Index(name)
+            index = get_index(name)
             stats = index.describe_index_stats()
             return {
                 "total_vector_count": stats.total_vector_count,
@@ -120,7 +120,7 @@ class IndexManager:
     def get_index(self, name: str):
         """Get a Pinecone index instance."""
         try:
-            return self.pc.Index(name)
+            return get_index(name)
         except Exception as e:
             raise Exception(f"Failed to get index '{name}': {e}")
 
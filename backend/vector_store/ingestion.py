@@ -0,0 +1,303 @@
+"""
+Write-behind ingestion service with a bounded queue and batched upserts.
+"""
+
+import atexit
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config import Config
+from .base import BaseVectorStore
+from .dedup import content_id
+
+# Queue item: (text, namespace, enqueue time, extra metadata)
+_Item = Tuple[str, str, float, Optional[Dict[str, Any]]]
+_STOP = None
+
+
+class IngestionService:
+    """
+    Embeds and upserts texts in the background.
+
+    Texts are placed on a bounded queue and consumed by a fixed pool of worker
+    threads. Each worker collects up to batch_size texts, or whatever arrived
+    within flush_interval_ms, embeds them in one call and writes them with a
+    single multi-vector upsert per namespace. Near-duplicates of stored texts
+    are dropped before embedding. When the queue is full, submit blocks for
+    put_timeout seconds and then rejects the text so callers can shed load.
+    """
+
+    def __init__(self, vector_store: BaseVectorStore,
+                 max_queue_size: int = 1000,
+                 num_workers: int = 2,
+                 batch_size: int = 64,
+                 flush_interval_ms: float = 250.0,
+                 put_timeout: float = 0.5):
+        """
+        Initialize the ingestion service and start its workers.
+
+        Args:
+            vector_store: Vector store that receives the upserts
+            max_queue_size: Maximum number of texts waiting to be ingested
+            num_workers: Number of worker threads
+            batch_size: Maximum number of texts per upsert
+            flush_interval_ms: Maximum time a worker waits to fill a batch
+            put_timeout: Seconds submit waits for queue space before rejecting
+        """
+        self.vector_store = vector_store
+        self.max_queue_size = max_queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.put_timeout = put_timeout
+
+        self._queue: "queue.Queue[Optional[_Item]]" = queue.Queue(maxsize=max_queue_size)
+        self._metrics_lock = threading.Lock()
+        self._closed = False
+
+        self.enqueued = 0
+        self.ingested = 0
+        self.failed = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self._lag_total = 0.0
+
+        self._workers = [
+            threading.Thread(target=self._run, name=f"ingestion-worker-{i}", daemon=True)
+            for i in range(max(1, num_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, text: str, namespace: str = "", timeout: Optional[float] = None,
+               metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Queue a text for ingestion.
+
+        Args:
+            text: The text to embed and upsert
+            namespace: Namespace (user) the text belongs to
+            timeout: Seconds to wait for queue space (defaults to put_timeout)
+            metadata: Optional extra metadata (e.g. {"type": "conversation"})
+
+        Returns:
+            True if the text was queued, False if it was rejected
+        """
+        if not text or not isinstance(text, str):
+            return False
+        if self._closed:
+            print("❌ Ingestion service is shut down, dropping context")
+            return False
+
+        try:
+            self._queue.put((text, namespace, time.monotonic(), metadata),
+                            timeout=self.put_timeout if timeout is None else timeout)
+        except queue.Full:
+            with self._metrics_lock:
+                self.rejected += 1
+            print(f"❌ Ingestion queue full ({self.max_queue_size}), rejecting context")
+            return False
+
+        with self._metrics_lock:
+            self.enqueued += 1
+        # Queries see the text right away instead of after the upsert
+        self.vector_store.remember_recent([text], namespace, [metadata])
+        return True
+
+    def free_slots(self) -> int:
+        """
+        Get the number of texts the queue can take right now.
+
+        Returns:
+            Free queue slots (concurrent submitters may take them first)
+        """
+        if self.max_queue_size <= 0:
+            return sys.maxsize
+        return max(0, self.max_queue_size - self._queue.qsize())
+
+    def _next_batch(self) -> Tuple[List[_Item], bool]:
+        """
+        Collect the next batch of items.
+
+        Returns:
+            The batch, and whether the worker received the stop signal
+        """
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        """Worker loop: upsert batches until the stop signal arrives."""
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._ingest(batch)
+            if stop:
+                return
+
+    def _ingest(self, batch: List[_Item]) -> None:
+        """Embed a batch once and upsert it with one vector store call per namespace."""
+        rows_by_namespace: Dict[str, List[int]] = {}
+        for row, (_, namespace, _, _) in enumerate(batch):
+            rows_by_namespace.setdefault(namespace, []).append(row)
+
+        # Near-duplicates are dropped before they cost an embedding
+        duplicates = 0
+        for namespace, rows in rows_by_namespace.items():
+            texts = [batch[row][0] for row in rows]
+            matches = self.vector_store.find_duplicates(texts, namespace)
+            rows_by_namespace[namespace] = [row for row, match in zip(rows, matches) if match is None]
+            duplicates += sum(match is not None for match in matches)
+            # submit() put them in the hot tier under IDs that will never be stored
+            self.vector_store.forget_recent(
+                [text for text, match in zip(texts, matches) if match is not None and match != content_id(text)],
+                namespace
+            )
+        if duplicates:
+            with self._metrics_lock:
+                self.duplicates += duplicates
+            print(f"   Skipped {duplicates} near-duplicate contexts")
+
+        new_rows = sorted(row for rows in rows_by_namespace.values() for row in rows)
+        if not new_rows:
+            return
+        try:
+            embedded = self.vector_store.embedding_manager.embed_array([batch[row][0] for row in new_rows])
+        except Exception as e:
+            with self._metrics_lock:
+                self.failed += len(new_rows)
+            print(f"❌ Error embedding {len(new_rows)} contexts: {e}")
+            for namespace, rows in rows_by_namespace.items():
+                self.vector_store.forget_recent([batch[row][0] for row in rows], namespace)
+            return
+        embedding_rows = {row: i for i, row in enumerate(new_rows)}
+
+        for namespace, rows in rows_by_namespace.items():
+            if not rows:
+                continue
+            try:
+                self.vector_store.upsert_embeddings(
+                    embedded[[embedding_rows[row] for row in rows]],
+                    [batch[row][0] for row in rows],
+                    namespace=namespace,
+                    metadatas=[batch[row][3] for row in rows]
+                )
+            except Exception as e:
+                with self._metrics_lock:
+                    self.failed += len(rows)
+                print(f"❌ Error ingesting {len(rows)} contexts: {e}")
+                self.vector_store.forget_recent([batch[row][0] for row in rows], namespace)
+                continue
+
+            now = time.monotonic()
+            lags = [now - batch[row][2] for row in rows]
+            with self._metrics_lock:
+                self.ingested += len(rows)
+                self.batches += 1
+                self.lag_last = lags[-1]
+                self.lag_max = max(self.lag_max, max(lags))
+                self._lag_total += sum(lags)
+            print(f"✅ Ingested {len(rows)} contexts in one upsert")
+
+    def shutdown(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stop accepting texts and drain everything already queued.
+
+        Args:
+            timeout: Maximum seconds to wait for each worker to finish
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth, throughput and lag metrics.
+
+        Returns:
+            Dictionary with ingestion metrics (lags in milliseconds)
+        """
+        with self._queue.mutex:
+            pending = [item for item in self._queue.queue if item is not _STOP]
+        oldest = time.monotonic() - pending[0][2] if pending else 0.0
+
+        with self._metrics_lock:
+            return {
+                "queue_depth": len(pending),
+                "max_queue_size": self.max_queue_size,
+                "workers": len(self._workers),
+                "enqueued": self.enqueued,
+                "ingested": self.ingested,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "duplicates": self.duplicates,
+                "batches": self.batches,
+                "avg_batch_size": self.ingested / self.batches if self.batches else 0.0,
+                "lag_ms_last": self.lag_last * 1000.0,
+                "lag_ms_max": self.lag_max * 1000.0,
+                "lag_ms_avg": self._lag_total / self.ingested * 1000.0 if self.ingested else 0.0,
+                "oldest_pending_ms": oldest * 1000.0
+            }
+
+
+_services: Dict[int, IngestionService] = {}
+_services_lock = threading.Lock()
+
+
+def get_ingestion_service(vector_store: BaseVectorStore) -> IngestionService:
+    """
+    Get the shared ingestion service for a vector store, creating it on first use.
+
+    Args:
+        vector_store: Vector store that receives the upserts
+
+    Returns:
+        The IngestionService configured in Config
+    """
+    with _services_lock:
+        service = _services.get(id(vector_store))
+        if service is None:
+            service = IngestionService(
+                vector_store,
+                max_queue_size=Config.INGEST_QUEUE_SIZE,
+                num_workers=Config.INGEST_WORKERS,
+                batch_size=Config.INGEST_BATCH_SIZE,
+                flush_interval_ms=Config.INGEST_FLUSH_INTERVAL_MS,
+                put_timeout=Config.INGEST_PUT_TIMEOUT
+            )
+            _services[id(vector_store)] = service
+        return service
+
+
+@atexit.register
+def shutdown_ingestion_services() -> None:
+    """Drain every ingestion queue before the process exits."""
+    with _services_lock:
+        services = list(_services.values())
+    for service in services:
+        service.shutdown()
+        # The drained writes may only be buffered by the store so far
+        service.vector_store.flush()
@@ -0,0 +1,176 @@
+"""
+In-memory BM25 inverted index and reciprocal rank fusion for hybrid retrieval.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from .filters import matches_filter
+
+# Email addresses are kept whole so exact lookups match; everything else splits on word characters
+_TOKEN_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+|\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase lexical tokens.
+
+    Email addresses produce the whole address plus its word pieces, so both
+    "jane.doe@example.com" and "jane" match.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(match)
+        if "@" in match:
+            tokens.extend(re.findall(r"\w+", match))
+    return tokens
+
+
+class BM25Index:
+    """
+    Incrementally maintained BM25 index over the texts of one namespace.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Index documents, replacing any existing document with the same ID.
+
+        Args:
+            ids: Document (vector) IDs
+            texts: Document texts
+            metadatas: Metadata returned with search hits
+        """
+        with self._lock:
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                self._remove_locked(doc_id)
+                terms = Counter(tokenize(text))
+                for term, count in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = count
+                length = sum(terms.values())
+                self._doc_terms[doc_id] = terms
+                self._doc_lengths[doc_id] = length
+                self._metadata[doc_id] = metadata
+                self._total_length += length
+
+    def remove(self, ids: List[str]) -> None:
+        """
+        Remove documents from the index.
+
+        Args:
+            ids: Document IDs to remove
+        """
+        with self._lock:
+            for doc_id in ids:
+                self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        """Remove one document; the caller holds the lock."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._metadata.pop(doc_id, None)
+
+    def search(self, query_text: str, top_k: int = 7,
+               filter_dict: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Score documents against a query with BM25.
+
+        Args:
+            query_text: Query text
+            top_k: Number of results to return
+            filter_dict: Optional filter for metadata
+
+        Returns:
+            List of dictionaries containing id, score, and metadata
+        """
+        query_terms = set(tokenize(query_text))
+        with self._lock:
+            num_docs = len(self._doc_lengths)
+            if not num_docs or not query_terms or top_k <= 0:
+                return []
+            avg_length = self._total_length / num_docs
+
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1.0 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            results = []
+            for doc_id, score in ranked:
+                metadata = self._metadata[doc_id]
+                if filter_dict and not matches_filter(metadata, filter_dict):
+                    continue
+                results.append({"id": doc_id, "score": score, "metadata": metadata})
+                if len(results) >= top_k:
+                    break
+            return results
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], top_k: int,
+                           k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion.
+
+    Each document scores sum(1 / (k + rank)) over the lists it appears in.
+
+    Args:
+        result_lists: Ranked lists of dictionaries containing id, score, and metadata
+        top_k: Number of fused results to return
+        k: Rank damping constant
+
+    Returns:
+        Fused list of dictionaries containing id, score (the fused score), and metadata
+    """
+    fused: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            score, metadata = fused.get(result["id"], (0.0, result.get("metadata")))
+            fused[result["id"]] = (score + 1.0 / (k + rank), metadata)
+
+    ranked = sorted(fused.items(), key=lambda item: item[1][0], reverse=True)[:top_k]
+    return [
+        {"id": doc_id, "score": score, "metadata": metadata}
+        for doc_id, (score, metadata) in ranked
+    ]
@@ -0,0 +1,1441 @@
+"""
+Local in-process vector store backed by a contiguous NumPy matrix.
+"""
+
+import os
+import json
+import atexit
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote, unquote
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
+import numpy as np
+from .base import BaseVectorStore
+from .filters import matches_filter
+from .hnsw import HNSWIndex
+from .quantization import QUANTIZATION_MODES, code_scores, quantize
+
+try:
+    import fcntl
+except ImportError:  # Windows: segment writes are only coordinated within one process
+    fcntl = None
+
+# Vector files written by the different partition formats; saving one format removes the others'
+_PARTITION_FILES = ("vectors.npy", "hnsw.npz", "codes.npz", "vectors.f32", "manifest.json")
+
+
+class _FlatPartition:
+    """
+    Vectors of a single namespace, kept in one contiguous float32 matrix.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.vectors = np.empty((0, dimension), dtype=np.float32)
+        self.count = 0
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.id_to_row: Dict[str, int] = {}
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.vectors.nbytes
+
+    @classmethod
+    def load(cls, directory: str, dimension: int) -> "_FlatPartition":
+        """Load a partition persisted by save()."""
+        vectors = np.load(os.path.join(directory, "vectors.npy"))
+        with open(os.path.join(directory, "records.json"), "r") as f:
+            records = json.load(f)
+
+        if vectors.ndim != 2 or vectors.shape[1] != dimension:
+            raise ValueError(
+                f"Local index dimension {vectors.shape[-1]} does not match model dimension {dimension}"
+            )
+
+        partition = cls(dimension)
+        partition.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        partition.count = len(records["ids"])
+        partition.ids = list(records["ids"])
+        partition.metadata = list(records["metadata"])
+        partition.id_to_row = {vector_id: row for row, vector_id in enumerate(partition.ids)}
+        return partition
+
+    def snapshot(self) -> Callable[[str], None]:
+        """Copy the partition's state; the returned function saves the copy to a directory."""
+        vectors, ids, metadata = self.vectors[:self.count].copy(), list(self.ids), list(self.metadata)
+        return lambda directory: self._write(directory, vectors, ids, metadata)
+
+    def save(self, directory: str) -> None:
+        """Write the partition to disk atomically."""
+        self.snapshot()(directory)
+
+    @staticmethod
+    def _write(directory: str, vectors: np.ndarray, ids: List[str], metadata: List[Dict[str, Any]]) -> None:
+        os.makedirs(directory, exist_ok=True)
+        vectors_path = os.path.join(directory, "vectors.npy")
+        records_path = os.path.join(directory, "records.json")
+        with open(vectors_path + ".tmp", "wb") as f:
+            np.save(f, vectors)
+        with open(records_path + ".tmp", "w") as f:
+            json.dump({"ids": ids, "metadata": metadata}, f)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(records_path + ".tmp", records_path)
+        _remove_stale_files(directory, keep=("vectors.npy",))
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow the vector matrix geometrically so appends stay amortized O(1)."""
+        capacity = self.vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        grown = np.empty((new_capacity, self.dimension), dtype=np.float32)
+        grown[:self.count] = self.vectors[:self.count]
+        self.vectors = grown
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Insert or overwrite normalized vectors."""
+        self._ensure_capacity(self.count + len(ids))
+        for vector_id, vector, metadata in zip(ids, vectors, metadatas):
+            row = self.id_to_row.get(vector_id)
+            if row is None:
+                row = self.count
+                self.count += 1
+                self.ids.append(vector_id)
+                self.metadata.append(metadata)
+                self.id_to_row[vector_id] = row
+            else:
+                self.metadata[row] = metadata
+            self.vectors[row] = vector
+
+    def query(self, query: np.ndarray, top_k: int,
+              filter_dict: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Exact cosine search with a normalized query vector."""
+        if self.count == 0 or top_k <= 0:
+            return []
+
+        scores = self.vectors[:self.count] @ query
+        if filter_dict:
+            mask = np.fromiter(
+                (matches_filter(metadata, filter_dict) for metadata in self.metadata),
+                dtype=bool, count=self.count
+            )
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(top_k, self.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {
+                "id": self.ids[row],
+                "score": float(scores[row]),
+                "metadata": self.metadata[row]
+            }
+            for row in top if np.isfinite(scores[row])
+        ]
+
+    def vectors_for(self, ids: List[str]) -> np.ndarray:
+        """Stored vectors of the given IDs, in order."""
+        return self.vectors[[self.id_to_row[vector_id] for vector_id in ids]]
+
+    def delete(self, ids: List[str]) -> int:
+        """
+        Remove vectors by moving the last row into each freed slot, which keeps
+        the matrix contiguous. Returns the number of vectors removed.
+        """
+        removed = 0
+        for vector_id in ids:
+            row = self.id_to_row.pop(vector_id, None)
+            if row is None:
+                continue
+            last = self.count - 1
+            if row != last:
+                moved_id = self.ids[last]
+                self.vectors[row] = self.vectors[last]
+                self.ids[row] = moved_id
+                self.metadata[row] = self.metadata[last]
+                self.id_to_row[moved_id] = row
+            self.ids.pop()
+            self.metadata.pop()
+            self.count -= 1
+            removed += 1
+        return removed
+
+    def fetch(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch stored vectors and metadata by ID."""
+        results = []
+        for vector_id in ids:
+            row = self.id_to_row.get(vector_id)
+            if row is None:
+                continue
+            results.append({
+                "id": vector_id,
+                "values": self.vectors[row].tolist(),
+                "metadata": self.metadata[row]
+            })
+        return results
+
+
+class _HNSWPartition:
+    """
+    Vectors of a single namespace, indexed by an HNSW graph.
+
+    Queries visit a small part of the graph instead of scoring every vector.
+    Filtered queries over-fetch and post-filter, falling back to an exact
+    scan when the filter is too selective for the graph results.
+    """
+
+    INDEX_FILE = "hnsw.npz"
+    FILTER_OVERFETCH = 4
+
+    def __init__(self, dimension: int, M: int = 16, ef_construction: int = 100, ef_search: int = 64):
+        self.dimension = dimension
+        self.index = HNSWIndex(dimension, M=M, ef_construction=ef_construction, ef_search=ef_search)
+        self.metadata_by_id: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def count(self) -> int:
+        return len(self.metadata_by_id)
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self.metadata_by_id)
+
+    @property
+    def metadata(self) -> List[Dict[str, Any]]:
+        return list(self.metadata_by_id.values())
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.index.vectors.nbytes
+
+    @classmethod
+    def load(cls, directory: str, dimension: int, ef_construction: Optional[int] = None,
+             ef_search: Optional[int] = None) -> "_HNSWPartition":
+        """Load a partition persisted by save(), with the configured ef parameters."""
+        index = HNSWIndex.load(os.path.join(directory, cls.INDEX_FILE),
+                               ef_construction=ef_construction, ef_search=ef_search)
+        with open(os.path.join(directory, "records.json"), "r") as f:
+            records = json.load(f)
+
+        if index.dimension != dimension:
+            raise ValueError(
+                f"Local index dimension {index.dimension} does not match model dimension {dimension}"
+            )
+
+        partition = cls(dimension)
+        partition.index = index
+        partition.metadata_by_id = dict(zip(records["ids"], records["metadata"]))
+        return partition
+
+    def snapshot(self) -> Callable[[str], None]:
+        """Copy the partition's state; the returned function saves the copy to a directory."""
+        state, ids, metadata = self.index.state(), self.ids, self.metadata
+        return lambda directory: self._write(directory, state, ids, metadata)
+
+    def save(self, directory: str) -> None:
+        """Write the partition to disk atomically."""
+        self.snapshot()(directory)
+
+    def _write(self, directory: str, state: Dict[str, np.ndarray], ids: List[str],
+               metadata: List[Dict[str, Any]]) -> None:
+        os.makedirs(directory, exist_ok=True)
+        index_path = os.path.join(directory, self.INDEX_FILE)
+        records_path = os.path.join(directory, "records.json")
+        self.index.save(index_path + ".tmp", state)
+        with open(records_path + ".tmp", "w") as f:
+            json.dump({"ids": ids, "metadata": metadata}, f)
+        os.replace(index_path + ".tmp", index_path)
+        os.replace(records_path + ".tmp", records_path)
+        _remove_stale_files(directory, keep=(self.INDEX_FILE,))
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Insert or overwrite normalized vectors."""
+        self.index.add(ids, vectors)
+        for vector_id, metadata in zip(ids, metadatas):
+            self.metadata_by_id[vector_id] = metadata
+
+    def query(self, query: np.ndarray, top_k: int,
+              filter_dict: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Approximate cosine search with a normalized query vector."""
+        if self.count == 0 or top_k <= 0:
+            return []
+
+        fetch_k = top_k * self.FILTER_OVERFETCH if filter_dict else top_k
+        results = []
+        for vector_id, score in self.index.search(query, fetch_k, ef=max(self.index.ef_search, fetch_k)):
+            metadata = self.metadata_by_id[vector_id]
+            if filter_dict and not matches_filter(metadata, filter_dict):
+                continue
+            results.append({"id": vector_id, "score": score, "metadata": metadata})
+            if len(results) >= top_k:
+                return results
+
+        if filter_dict and fetch_k < self.count:
+            return self._filtered_scan(query, top_k, filter_dict)
+        return results
+
+    def _filtered_scan(self, query: np.ndarray, top_k: int,
+                       filter_dict: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Exact search over only the vectors that pass the filter."""
+        ids = [
+            vector_id for vector_id, metadata in self.metadata_by_id.items()
+            if matches_filter(metadata, filter_dict)
+        ]
+        if not ids:
+            return []
+
+        scores = self.vectors_for(ids) @ query
+        top = np.argsort(-scores)[:top_k]
+        return [
+            {"id": ids[row], "score": float(scores[row]), "metadata": self.metadata_by_id[ids[row]]}
+            for row in top
+        ]
+
+    def vectors_for(self, ids: List[str]) -> np.ndarray:
+        """Stored vectors of the given IDs, in order."""
+        return self.index.vectors[[self.index.label_to_node[vector_id] for vector_id in ids]]
+
+    def delete(self, ids: List[str]) -> int:
+        """Remove vectors by ID. Returns the number of vectors removed."""
+        removed = self.index.remove(ids)
+        for vector_id in ids:
+            self.metadata_by_id.pop(vector_id, None)
+        return removed
+
+    def fetch(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch stored vectors and metadata by ID."""
+        results = []
+        for vector_id in ids:
+            vector = self.index.get_vector(vector_id)
+            if vector is None:
+                continue
+            results.append({
+                "id": vector_id,
+                "values": vector.tolist(),
+                "metadata": self.metadata_by_id[vector_id]
+            })
+        return results
+
+
+class _QuantizedPartition:
+    """
+    Vectors of a single namespace, kept in RAM as int8 or binary codes.
+
+    The float32 vectors live in a memory-mapped file next to the codes, so
+    only the rows of the best code-scored candidates are read back to rescore
+    them exactly. RAM per vector drops from 4 bytes per dimension to about 1
+    (int8) or 1/8 (binary).
+
+    The float32 file is append-only: upserts add rows and deletes only drop
+    codes, so rows that the saved codes refer to are never overwritten. Once
+    more than half of the file is garbage, save() copies the live rows to a
+    new file. Each save writes new codes and commits by replacing
+    records.json, which names the codes and float32 files to load.
+    """
+
+    LEGACY_CODES_FILE = "codes.npz"
+    LEGACY_VECTORS_FILE = "vectors.f32"
+    # Garbage rows tolerated in the float32 file before it is compacted
+    MIN_COMPACT_ROWS = 1024
+
+    def __init__(self, dimension: int, directory: str, mode: str = "int8", rescore_factor: int = 4):
+        if mode not in ("int8", "binary"):
+            raise ValueError(f"Quantization mode {mode} not supported. Use: int8, binary")
+
+        self.dimension = dimension
+        self.directory = directory
+        self.mode = mode
+        self.rescore_factor = max(1, rescore_factor)
+
+        width = dimension if mode == "int8" else (dimension + 7) // 8
+        self.codes = np.empty((0, width), dtype=np.int8 if mode == "int8" else np.uint8)
+        self.scales = np.empty(0, dtype=np.float32)
+        # Row of each code's float32 vector in the vectors file
+        self.vector_rows = np.empty(0, dtype=np.int64)
+        self.count = 0
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.id_to_row: Dict[str, int] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_file = self._new_file_name("vectors", "f32")
+        # Rows of the vectors file written so far, live or not
+        self.vector_count = 0
+        self.vectors: Optional[np.memmap] = None
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.vector_rows.nbytes
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.directory, self.vectors_file)
+
+    @staticmethod
+    def _new_file_name(prefix: str, extension: str) -> str:
+        return f"{prefix}-{time.time_ns():x}-{uuid.uuid4().hex[:8]}.{extension}"
+
+    @classmethod
+    def is_saved(cls, directory: str) -> bool:
+        """Whether a directory holds a partition persisted by save()."""
+        return any(name == cls.LEGACY_CODES_FILE or name.startswith("codes-") for name in os.listdir(directory))
+
+    def _open_vectors(self, rows: int) -> None:
+        """Map the float32 file, growing it to at least the given number of rows."""
+        row_bytes = self.dimension * 4
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        if size < rows * row_bytes:
+            if self.vectors is not None:
+                self.vectors.flush()
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+            size = rows * row_bytes
+
+        capacity = size // row_bytes
+        self.vectors = None
+        if capacity:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+",
+                                     shape=(capacity, self.dimension))
+
+    @classmethod
+    def load(cls, directory: str, dimension: int, rescore_factor: int = 4) -> "_QuantizedPartition":
+        """Load a partition persisted by save()."""
+        with open(os.path.join(directory, "records.json"), "r") as f:
+            records = json.load(f)
+        partition = cls(dimension, directory, mode=records["quantization"], rescore_factor=rescore_factor)
+
+        # Partitions saved before the float32 file was append-only have one row per code
+        codes_file = records.get("codes_file", cls.LEGACY_CODES_FILE)
+        with np.load(os.path.join(directory, codes_file)) as data:
+            codes, scales = data["codes"], data["scales"]
+            vector_rows = data["vector_rows"] if "vector_rows" in data else np.arange(len(codes))
+        if codes.shape[1] != partition.codes.shape[1]:
+            raise ValueError(
+                f"Local index codes of width {codes.shape[1]} do not match model dimension {dimension}"
+            )
+
+        partition.codes = codes.astype(partition.codes.dtype)
+        partition.scales = scales.astype(np.float32)
+        partition.vector_rows = vector_rows.astype(np.int64)
+        partition.count = len(records["ids"])
+        partition.ids = list(records["ids"])
+        partition.metadata = list(records["metadata"])
+        partition.id_to_row = {vector_id: row for row, vector_id in enumerate(partition.ids)}
+
+        # Rows appended after the last save are garbage and get overwritten
+        partition.vectors_file = records.get("vectors_file", cls.LEGACY_VECTORS_FILE)
+        partition.vector_count = int(partition.vector_rows.max()) + 1 if partition.count else 0
+        partition._open_vectors(0)
+        if partition.vector_count and (partition.vectors is None
+                                       or partition.vectors.shape[0] < partition.vector_count):
+            raise ValueError(f"Local index vector file {partition.vectors_path} is truncated")
+        return partition
+
+    def snapshot(self) -> Callable[[str], None]:
+        """Copy the partition's state; the returned function saves the copy to a directory."""
+        self._maybe_compact()
+        if self.vectors is not None:
+            self.vectors.flush()
+        codes, scales = self.codes[:self.count].copy(), self.scales[:self.count].copy()
+        vector_rows = self.vector_rows[:self.count].copy()
+        ids, metadata, vectors_file = list(self.ids), list(self.metadata), self.vectors_file
+        return lambda directory: self._write(directory, codes, scales, vector_rows, ids, metadata, vectors_file)
+
+    def save(self, directory: str) -> None:
+        """Flush the float32 file and write codes and records atomically."""
+        self.snapshot()(directory)
+
+    def _write(self, directory: str, codes: np.ndarray, scales: np.ndarray, vector_rows: np.ndarray,
+               ids: List[str], metadata: List[Dict[str, Any]], vectors_file: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        # The codes file is new, so it is only used once records.json refers to it
+        codes_file = self._new_file_name("codes", "npz")
+        records_path = os.path.join(directory, "records.json")
+        with open(os.path.join(directory, codes_file), "wb") as f:
+            np.savez(f, codes=codes, scales=scales, vector_rows=vector_rows)
+        with open(records_path + ".tmp", "w") as f:
+            json.dump({
+                "ids": ids, "metadata": metadata, "quantization": self.mode,
+                "codes_file": codes_file, "vectors_file": vectors_file
+            }, f)
+        os.replace(records_path + ".tmp", records_path)
+        _remove_stale_files(directory, keep=(codes_file, vectors_file))
+
+    def _maybe_compact(self) -> None:
+        """Copy the live float32 rows to a new file once most of the current one is garbage."""
+        if self.vector_count - self.count <= max(self.count, self.MIN_COMPACT_ROWS):
+            return
+        old_vectors = self.vectors
+        self.vectors_file = self._new_file_name("vectors", "f32")
+        self.vectors = None
+        self._open_vectors(max(self.count, 1))
+        rows = self.vector_rows[:self.count]
+        self.vectors[:self.count] = old_vectors[rows] if self.count else 0
+        self.vector_rows[:self.count] = np.arange(self.count)
+        self.vector_count = self.count
+        # The old file stays on disk until the next save no longer refers to it
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow the codes and the float32 file geometrically."""
+        capacity = self.codes.shape[0]
+        if needed > capacity:
+            new_capacity = max(needed, capacity * 2, 64)
+            codes = np.empty((new_capacity, self.codes.shape[1]), dtype=self.codes.dtype)
+            codes[:self.count] = self.codes[:self.count]
+            scales = np.ones(new_capacity, dtype=np.float32)
+            scales[:self.count] = self.scales[:self.count]
+            vector_rows = np.zeros(new_capacity, dtype=np.int64)
+            vector_rows[:self.count] = self.vector_rows[:self.count]
+            self.codes, self.scales, self.vector_rows = codes, scales, vector_rows
+
+        needed_rows = self.vector_count + needed - self.count
+        vector_capacity = 0 if self.vectors is None else self.vectors.shape[0]
+        if needed_rows > vector_capacity:
+            self._open_vectors(max(needed_rows, vector_capacity * 2, 64))
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Insert or overwrite normalized vectors, appending them to the float32 file."""
+        self._ensure_capacity(self.count + len(ids))
+        codes, scales = quantize(vectors, self.mode)
+        first = self.vector_count
+        self.vectors[first:first + len(ids)] = vectors
+        self.vector_count += len(ids)
+        for i, (vector_id, metadata) in enumerate(zip(ids, metadatas)):
+            row = self.id_to_row.get(vector_id)
+            if row is None:
+                row = self.count
+                self.count += 1
+                self.ids.append(vector_id)
+                self.metadata.append(metadata)
+                self.id_to_row[vector_id] = row
+            else:
+                self.metadata[row] = metadata
+            self.codes[row] = codes[i]
+            if len(scales):
+                self.scales[row] = scales[i]
+            self.vector_rows[row] = first + i
+
+    def query(self, query: np.ndarray, top_k: int,
+              filter_dict: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score the codes, then rescore the best candidates with their float32 vectors."""
+        if self.count == 0 or top_k <= 0:
+            return []
+
+        scores = code_scores(self.codes[:self.count], self.scales, query, self.mode)
+        if filter_dict:
+            mask = np.fromiter(
+                (matches_filter(metadata, filter_dict) for metadata in self.metadata),
+                dtype=bool, count=self.count
+            )
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(top_k * self.rescore_factor, self.count)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.isfinite(scores[candidates])]
+        if not len(candidates):
+            return []
+
+        # Sorted rows keep the reads from the memory-mapped file sequential
+        candidates = candidates[np.argsort(self.vector_rows[candidates])]
+        exact = self.vectors[self.vector_rows[candidates]] @ query
+        top = np.argsort(-exact)[:top_k]
+        return [
+            {
+                "id": self.ids[candidates[i]],
+                "score": float(exact[i]),
+                "metadata": self.metadata[candidates[i]]
+            }
+            for i in top
+        ]
+
+    def vectors_for(self, ids: List[str]) -> np.ndarray:
+        """Stored float32 vectors of the given IDs, in order."""
+        return np.asarray(self.vectors[self.vector_rows[[self.id_to_row[vector_id] for vector_id in ids]]])
+
+    def delete(self, ids: List[str]) -> int:
+        """
+        Remove vectors by moving the last code into each freed slot. The
+        float32 rows stay in the file until it is compacted.
+        Returns the number of vectors removed.
+        """
+        removed = 0
+        for vector_id in ids:
+            row = self.id_to_row.pop(vector_id, None)
+            if row is None:
+                continue
+            last = self.count - 1
+            if row != last:
+                moved_id = self.ids[last]
+                self.codes[row] = self.codes[last]
+                self.scales[row] = self.scales[last]
+                self.vector_rows[row] = self.vector_rows[last]
+                self.ids[row] = moved_id
+                self.metadata[row] = self.metadata[last]
+                self.id_to_row[moved_id] = row
+            self.ids.pop()
+            self.metadata.pop()
+            self.count -= 1
+            removed += 1
+        return removed
+
+    def fetch(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch stored float32 vectors and metadata by ID."""
+        results = []
+        for vector_id in ids:
+            row = self.id_to_row.get(vector_id)
+            if row is None:
+                continue
+            results.append({
+                "id": vector_id,
+                "values": self.vectors[self.vector_rows[row]].tolist(),
+                "metadata": self.metadata[row]
+            })
+        return results
+
+
+class _Segment:
+    """
+    One immutable segment: a read-only memory-mapped float32 file plus the
+    IDs and metadata of its rows. Deleted rows are masked, never rewritten.
+    """
+
+    def __init__(self, name: str, vectors: np.ndarray, ids: List[str], metadata: List[Dict[str, Any]]):
+        self.name = name
+        self.vectors = vectors
+        self.ids = ids
+        self.metadata = metadata
+        self.deleted = np.zeros(len(ids), dtype=bool)
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def deleted_ratio(self) -> float:
+        return float(self.deleted.mean()) if self.count else 1.0
+
+    @classmethod
+    def open(cls, directory: str, name: str, dimension: int) -> "_Segment":
+        """Map a segment written by write()."""
+        with open(os.path.join(directory, name + ".json"), "r") as f:
+            records = json.load(f)
+        count = len(records["ids"])
+        vectors = np.memmap(os.path.join(directory, name + ".f32"), dtype=np.float32,
+                            mode="r", shape=(count, dimension))
+        return cls(name, vectors, records["ids"], records["metadata"])
+
+    @classmethod
+    def write(cls, directory: str, name: str, vector_chunks, ids: List[str],
+              metadata: List[Dict[str, Any]], dimension: int) -> "_Segment":
+        """Write a segment from an iterable of float32 row blocks, then map it."""
+        vectors_path = os.path.join(directory, name + ".f32")
+        records_path = os.path.join(directory, name + ".json")
+        with open(vectors_path + ".tmp", "wb") as f:
+            for chunk in vector_chunks:
+                np.ascontiguousarray(chunk, dtype=np.float32).tofile(f)
+        with open(records_path + ".tmp", "w") as f:
+            json.dump({"ids": ids, "metadata": metadata}, f)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(records_path + ".tmp", records_path)
+        return cls.open(directory, name, dimension)
+
+    def remove_files(self, directory: str) -> None:
+        """Unlink the segment files; processes that still map them keep a valid view."""
+        for suffix in (".f32", ".json"):
+            path = os.path.join(directory, self.name + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class _SegmentedPartition:
+    """
+    Vectors of a single namespace in append-only, memory-mapped segment files.
+
+    Every upsert writes a new immutable segment, and deletes and overwrites
+    only record tombstones in the manifest, so opening a namespace maps its
+    files instead of reading them into RAM, and every worker process on the
+    host shares the same pages through the OS page cache. Writers serialize
+    on a file lock, and other processes pick up their changes when the
+    manifest changes. compact() merges small segments and rewrites segments
+    that are mostly tombstones.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    LOCK_FILE = ".lock"
+    COPY_CHUNK_ROWS = 8192
+    # Segment files not in the manifest are only cleaned up once they are
+    # this old, so files another process is still writing are left alone
+    ORPHAN_AGE_SECONDS = 3600
+
+    def __init__(self, dimension: int, directory: str, max_segments: int = 8,
+                 max_deleted_ratio: float = 0.3):
+        self.dimension = dimension
+        self.directory = directory
+        self.max_segments = max(2, max_segments)
+        self.max_deleted_ratio = max_deleted_ratio
+
+        self._lock = threading.RLock()
+        self.segments: Dict[str, _Segment] = {}
+        self.id_to_location: Dict[str, Tuple[_Segment, int]] = {}
+        self._manifest_stamp = None
+        # Bumped whenever a manifest written by another process is loaded
+        self.generation = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, self.MANIFEST_FILE)
+        self.refresh()
+
+    @property
+    def count(self) -> int:
+        return len(self.id_to_location)
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self.id_to_location)
+
+    @property
+    def metadata(self) -> List[Dict[str, Any]]:
+        return [segment.metadata[row] for segment, row in self.id_to_location.values()]
+
+    @property
+    def memory_bytes(self) -> int:
+        # Vectors are mapped from disk and shared through the page cache
+        return sum(segment.deleted.nbytes for segment in self.segments.values())
+
+    @classmethod
+    def load(cls, directory: str, dimension: int, **params) -> "_SegmentedPartition":
+        """Open a partition from its manifest."""
+        return cls(dimension, directory, **params)
+
+    def snapshot(self) -> Callable[[str], None]:
+        """Segments are written as they change, so there is nothing to copy."""
+        return self.save
+
+    def save(self, directory: str) -> None:
+        """Segments and the manifest are durable once written; only clean up other formats."""
+        _remove_stale_files(directory, keep=(self.MANIFEST_FILE,))
+        records_path = os.path.join(directory, "records.json")
+        if os.path.exists(records_path):
+            os.remove(records_path)
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize writers across processes sharing the directory."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, self.LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self) -> None:
+        """Pick up segments and tombstones written by other processes."""
+        with self._lock:
+            stamp = self._stamp()
+            if stamp is None or stamp == self._manifest_stamp:
+                return
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+
+            segments = {}
+            for entry in manifest["segments"]:
+                segment = self.segments.get(entry["name"])
+                if segment is None:
+                    segment = _Segment.open(self.directory, entry["name"], self.dimension)
+                segment.deleted[:] = False
+                segment.deleted[entry["deleted"]] = True
+                segments[segment.name] = segment
+
+            self.segments = segments
+            self.id_to_location = {}
+            for segment in segments.values():
+                for row in np.flatnonzero(~segment.deleted).tolist():
+                    self.id_to_location[segment.ids[row]] = (segment, row)
+            self._manifest_stamp = stamp
+            self.generation += 1
+
+    def _write_manifest(self) -> None:
+        """Atomically replace the manifest; the caller holds the file lock."""
+        manifest = {
+            "segments": [
+                {
+                    "name": segment.name,
+                    "count": segment.count,
+                    "deleted": np.flatnonzero(segment.deleted).tolist()
+                }
+                for segment in self.segments.values()
+            ]
+        }
+        with open(self.manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+        self._manifest_stamp = self._stamp()
+
+    @staticmethod
+    def _segment_name() -> str:
+        return f"seg-{time.time_ns():x}-{uuid.uuid4().hex[:8]}"
+
+    def _tombstone(self, ids: List[str]) -> int:
+        """Mask the current rows of the given IDs."""
+        removed = 0
+        for vector_id in ids:
+            location = self.id_to_location.pop(vector_id, None)
+            if location is None:
+                continue
+            segment, row = location
+            segment.deleted[row] = True
+            removed += 1
+        return removed
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Append normalized vectors as a new segment, tombstoning older copies."""
+        # The last occurrence of a repeated ID wins
+        rows = sorted({vector_id: i for i, vector_id in enumerate(ids)}.values())
+        if not rows:
+            return
+
+        with self._lock, self._file_lock():
+            self.refresh()
+            segment = _Segment.write(
+                self.directory, self._segment_name(), [vectors[rows]],
+                [ids[i] for i in rows], [metadatas[i] for i in rows], self.dimension
+            )
+            self._tombstone(segment.ids)
+            self.segments[segment.name] = segment
+            for row, vector_id in enumerate(segment.ids):
+                self.id_to_location[vector_id] = (segment, row)
+            self._write_manifest()
+
+    def query(self, query: np.ndarray, top_k: int,
+              filter_dict: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Exact cosine search over every segment, skipping tombstones."""
+        with self._lock:
+            self.refresh()
+            if not self.id_to_location or top_k <= 0:
+                return []
+
+            candidates = []
+            for segment in self.segments.values():
+                if segment.deleted.all():
+                    continue
+                scores = np.asarray(segment.vectors @ query)
+                live = ~segment.deleted
+                if filter_dict:
+                    live &= np.fromiter(
+                        (matches_filter(metadata, filter_dict) for metadata in segment.metadata),
+                        dtype=bool, count=segment.count
+                    )
+                scores = np.where(live, scores, -np.inf)
+
+                k = min(top_k, segment.count)
+                top = np.argpartition(-scores, k - 1)[:k]
+                candidates.extend(
+                    (float(scores[row]), segment, row) for row in top if np.isfinite(scores[row])
+                )
+
+            candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            return [
+                {"id": segment.ids[row], "score": score, "metadata": segment.metadata[row]}
+                for score, segment, row in candidates[:top_k]
+            ]
+
+    def vectors_for(self, ids: List[str]) -> np.ndarray:
+        """Stored vectors of the given IDs, in order."""
+        with self._lock:
+            vectors = np.empty((len(ids), self.dimension), dtype=np.float32)
+            for i, vector_id in enumerate(ids):
+                segment, row = self.id_to_location[vector_id]
+                vectors[i] = segment.vectors[row]
+            return vectors
+
+    def delete(self, ids: List[str]) -> int:
+        """Record tombstones for vectors by ID. Returns the number of vectors removed."""
+        with self._lock, self._file_lock():
+            self.refresh()
+            removed = self._tombstone(ids)
+            if removed:
+                self._write_manifest()
+            return removed
+
+    def fetch(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch stored vectors and metadata by ID."""
+        with self._lock:
+            self.refresh()
+            results = []
+            for vector_id in ids:
+                location = self.id_to_location.get(vector_id)
+                if location is None:
+                    continue
+                segment, row = location
+                results.append({
+                    "id": vector_id,
+                    "values": segment.vectors[row].tolist(),
+                    "metadata": segment.metadata[row]
+                })
+            return results
+
+    def _pick_victims(self) -> List[_Segment]:
+        """Segments that are mostly tombstones, plus the smallest ones once there are too many."""
+        segments = list(self.segments.values())
+        victims = [segment for segment in segments if segment.deleted_ratio > self.max_deleted_ratio]
+        if len(segments) > self.max_segments:
+            rest = sorted(
+                (segment for segment in segments if segment not in victims),
+                key=lambda segment: segment.count - int(segment.deleted.sum())
+            )
+            victims.extend(rest[:len(segments) - self.max_segments // 2])
+        return victims
+
+    def compact(self) -> bool:
+        """
+        Merge segments chosen by _pick_victims into one.
+
+        The merged segment is written without holding any lock; deletes that
+        land meanwhile are carried over as tombstones when it is swapped in.
+
+        Returns:
+            True if segments were merged
+        """
+        with self._lock, self._file_lock():
+            self.refresh()
+            self._remove_orphans()
+            victims = self._pick_victims()
+            if not victims:
+                return False
+            live_rows = [np.flatnonzero(~segment.deleted) for segment in victims]
+
+        ids = [segment.ids[row] for segment, rows in zip(victims, live_rows) for row in rows.tolist()]
+        metadata = [segment.metadata[row] for segment, rows in zip(victims, live_rows) for row in rows.tolist()]
+        merged = None
+        if ids:
+            chunks = (
+                segment.vectors[rows[start:start + self.COPY_CHUNK_ROWS]]
+                for segment, rows in zip(victims, live_rows)
+                for start in range(0, len(rows), self.COPY_CHUNK_ROWS)
+            )
+            merged = _Segment.write(self.directory, self._segment_name(), chunks, ids, metadata, self.dimension)
+
+        with self._lock, self._file_lock():
+            self.refresh()
+            if any(self.segments.get(segment.name) is not segment for segment in victims):
+                # Another process compacted these segments first
+                if merged is not None:
+                    merged.remove_files(self.directory)
+                return False
+
+            if merged is not None:
+                merged.deleted[:] = np.concatenate([
+                    segment.deleted[rows] for segment, rows in zip(victims, live_rows)
+                ])
+            for segment in victims:
+                del self.segments[segment.name]
+            if merged is not None:
+                self.segments[merged.name] = merged
+                for row in np.flatnonzero(~merged.deleted).tolist():
+                    self.id_to_location[merged.ids[row]] = (merged, row)
+            self._write_manifest()
+            for segment in victims:
+                segment.remove_files(self.directory)
+
+        print(f"✅ Compacted {len(victims)} segments into one with {len(ids)} vectors in {self.directory}")
+        return True
+
+    def _remove_orphans(self) -> None:
+        """Delete old segment files that no manifest refers to (e.g. after a crash mid-write)."""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.startswith("seg-"):
+                continue
+            segment_name = name.split(".", 1)[0]
+            path = os.path.join(self.directory, name)
+            if segment_name not in self.segments and now - os.path.getmtime(path) > self.ORPHAN_AGE_SECONDS:
+                os.remove(path)
+
+
+def _remove_stale_files(directory: str, keep: tuple) -> None:
+    """Delete vector files left behind by another partition format or an older save."""
+    for name in _PARTITION_FILES:
+        path = os.path.join(directory, name)
+        if name not in keep and os.path.exists(path):
+            os.remove(path)
+    for name in os.listdir(directory):
+        if name.startswith(("codes-", "vectors-")) and name not in keep:
+            os.remove(os.path.join(directory, name))
+    if "manifest.json" not in keep:
+        for name in os.listdir(directory):
+            if name.startswith("seg-") or name == _SegmentedPartition.LOCK_FILE:
+                os.remove(os.path.join(directory, name))
+
+
+class LocalVectorStore(BaseVectorStore):
+    """
+    In-process vector store with the same interface as PineconeVectorStore.
+
+    Each namespace is a separate partition of L2-normalized vectors. A "flat"
+    partition keeps them in one contiguous float32 matrix, so a query is a
+    single exact matrix-vector product over that namespace only. An "hnsw"
+    partition indexes them in an HNSW graph for approximate search on large
+    namespaces. Flat partitions can instead hold int8 or binary codes in RAM,
+    rescoring the best candidates against float32 vectors in a memory-mapped
+    file. Partitions are persisted to disk as a .npy matrix (flat), .npz
+    graph (hnsw) or .npz codes plus .f32 vectors (quantized), together with a
+    JSON file of IDs and metadata, one directory per namespace.
+
+    A "segmented" partition is never loaded into RAM: its append-only segment
+    files are memory-mapped, so worker processes on one host share them and
+    see each other's writes. A background thread compacts the segments.
+
+    Upserts and deletes only mark their namespace dirty; flush() persists
+    the dirty namespaces. With autosave, a background thread flushes every
+    persist_interval seconds and once more at exit.
+
+    Only one process may write a flat, hnsw or quantized index; a second
+    process that tries to is refused. Use "segmented" for several workers.
+    """
+
+    INDEX_TYPES = ("flat", "hnsw", "segmented")
+    WRITER_LOCK_FILE = ".writer.lock"
+
+    def __init__(self, index_name: str = "adaptlm-index",
+                 model_name: str = "all-MiniLM-L6-v2",
+                 index_path: str = "./data/local_index",
+                 autosave: bool = True,
+                 index_type: str = "flat",
+                 hnsw_params: Optional[Dict[str, int]] = None,
+                 quantization: str = "none",
+                 rescore_factor: int = 4,
+                 segment_params: Optional[Dict[str, Any]] = None,
+                 compact_interval: float = 30.0,
+                 persist_interval: float = 1.0):
+        """
+        Initialize Local Vector Store.
+        If a persisted index exists on disk, it will be loaded.
+        Args:
+            index_name: Name of the index (used as the directory name on disk)
+            model_name: Name of the SentenceTransformer model to use
+            index_path: Root directory where local indexes are persisted
+            autosave: Persist namespaces changed by upserts and deletes in the background
+            index_type: "flat" (exact search), "hnsw" (approximate graph search) or
+                "segmented" (exact search over memory-mapped segment files)
+            hnsw_params: Optional M, ef_construction and ef_search for HNSW partitions
+            quantization: "none", "int8" or "binary" codes for flat partitions
+            rescore_factor: Candidates rescored with float32 vectors, as a multiple of top_k
+            segment_params: Optional max_segments and max_deleted_ratio for segmented partitions
+            compact_interval: Seconds between background compaction passes (0 disables them)
+            persist_interval: Seconds between background saves of changed namespaces
+        """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Local index type {index_type} not supported. Use: flat, hnsw, segmented")
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Quantization mode {quantization} not supported. Use: none, int8, binary")
+        if quantization != "none" and index_type != "flat":
+            raise ValueError("Quantization is only supported for the flat local index type")
+
+        super().__init__(index_name=index_name, model_name=model_name)
+
+        self.index_path = index_path
+        self.index_dir = os.path.join(index_path, index_name.lower().replace("_", ""))
+        self.autosave = autosave
+        self.index_type = index_type
+        self.hnsw_params = hnsw_params or {}
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self.segment_params = segment_params or {}
+
+        self._lock = threading.RLock()
+        self._persist_lock = threading.Lock()
+        self._partitions: Dict[str, Any] = {}
+        # Namespaces changed since they were last persisted
+        self._dirty: set = set()
+        # Lock file held by the only process allowed to write a flat, hnsw or
+        # quantized index, and that process's ID
+        self._writer_file = None
+        self._writer_pid: Optional[int] = None
+
+        # Segment manifest generation each namespace's text indexes were built from
+        self._indexed_generations: Dict[str, int] = {}
+
+        self._load()
+        for namespace, partition in self._partitions.items():
+            self._index_partition(partition, namespace)
+        total = sum(partition.count for partition in self._partitions.values())
+        index_kind = self.index_type if quantization == "none" else f"{quantization}-quantized"
+        print(f"Using local {index_kind} index '{self.index_dir}' with {total} vectors "
+              f"in {len(self._partitions)} namespaces (dimension {self.dimension})")
+
+        self._background_stop = threading.Event()
+        if index_type == "segmented" and compact_interval > 0:
+            threading.Thread(
+                target=self._run_compactor, args=(compact_interval,),
+                name="segment-compactor", daemon=True
+            ).start()
+        if autosave:
+            threading.Thread(
+                target=self._run_persister, args=(max(persist_interval, 0.01),),
+                name="local-index-persister", daemon=True
+            ).start()
+            atexit.register(self.flush)
+
+    def _new_partition(self, directory: str):
+        """Create an empty partition of the configured index type."""
+        if self.index_type == "hnsw":
+            return _HNSWPartition(self.dimension, **self.hnsw_params)
+        if self.index_type == "segmented":
+            return _SegmentedPartition(self.dimension, directory, **self.segment_params)
+        if self.quantization != "none":
+            return _QuantizedPartition(self.dimension, directory, self.quantization, self.rescore_factor)
+        return _FlatPartition(self.dimension)
+
+    def _acquire_writer(self) -> None:
+        """
+        Make this process the only writer of a flat, hnsw or quantized index.
+
+        Those partitions live in process memory and each save rewrites them
+        whole, so a second process writing the same directory would overwrite
+        the first one's changes. The lock is taken at the first write, so
+        processes that only read never hold it.
+
+        Raises:
+            RuntimeError: If another process writes the index
+        """
+        if self.index_type == "segmented" or self._writer_pid == os.getpid():
+            return
+        if fcntl is not None:
+            os.makedirs(self.index_dir, exist_ok=True)
+            # A forked child must not reuse the parent's lock file, which shares its lock
+            writer_file = open(os.path.join(self.index_dir, self.WRITER_LOCK_FILE), "a")
+            try:
+                fcntl.flock(writer_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                writer_file.close()
+                raise RuntimeError(
+                    f"Local index '{self.index_dir}' is written by another process; "
+                    f"only LOCAL_INDEX_TYPE=segmented supports several worker processes"
+                )
+            self._writer_file = writer_file
+        self._writer_pid = os.getpid()
+
+    def _namespace_dir(self, namespace: str) -> str:
+        """Directory holding one namespace's files."""
+        name = "ns-" + quote(namespace, safe="") if namespace else "default"
+        return os.path.join(self.index_dir, "namespaces", name)
+
+    def _get_partition(self, namespace: str):
+        """
+        Look up a namespace's partition. Segmented namespaces created by
+        another worker process since startup are opened on first access.
+        """
+        partition = self._partitions.get(namespace)
+        if partition is None and self.index_type == "segmented":
+            directory = self._namespace_dir(namespace)
+            if os.path.exists(os.path.join(directory, _SegmentedPartition.MANIFEST_FILE)):
+                partition = self._partitions[namespace] = _SegmentedPartition.load(
+                    directory, self.dimension, **self.segment_params
+                )
+                self._index_partition(partition, namespace)
+        return partition
+
+    def _index_partition(self, partition, namespace: str) -> None:
+        """Build a namespace's lexical and near-duplicate indexes from its stored texts."""
+        self._replace_text_indexes(
+            partition.ids,
+            [metadata.get("text", "") for metadata in partition.metadata],
+            partition.metadata,
+            namespace
+        )
+        if isinstance(partition, _SegmentedPartition):
+            self._indexed_generations[namespace] = partition.generation
+
+    def _sync_namespace(self, namespace: str = "") -> None:
+        """
+        Reload a segmented namespace's manifest and, if another process
+        changed it, rebuild its text indexes and drop its cached results.
+        """
+        if self.index_type != "segmented":
+            return
+        with self._lock:
+            partition = self._get_partition(namespace)
+            if partition is None:
+                return
+            partition.refresh()
+            if partition.generation == self._indexed_generations.get(namespace):
+                return
+            self._index_partition(partition, namespace)
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.invalidate(namespace)
+
+    def _load(self) -> None:
+        """Load all persisted namespaces from disk, if present."""
+        namespaces_dir = os.path.join(self.index_dir, "namespaces")
+        if not os.path.isdir(namespaces_dir):
+            return
+
+        try:
+            for name in os.listdir(namespaces_dir):
+                directory = os.path.join(namespaces_dir, name)
+                namespace = unquote(name[3:]) if name.startswith("ns-") else ""
+                if os.path.exists(os.path.join(directory, _SegmentedPartition.MANIFEST_FILE)):
+                    partition = _SegmentedPartition.load(directory, self.dimension, **self.segment_params)
+                elif not os.path.exists(os.path.join(directory, "records.json")):
+                    continue
+                elif os.path.exists(os.path.join(directory, _HNSWPartition.INDEX_FILE)):
+                    partition = _HNSWPartition.load(
+                        directory, self.dimension,
+                        ef_construction=self.hnsw_params.get("ef_construction"),
+                        ef_search=self.hnsw_params.get("ef_search")
+                    )
+                elif _QuantizedPartition.is_saved(directory):
+                    partition = _QuantizedPartition.load(directory, self.dimension, self.rescore_factor)
+                else:
+                    partition = _FlatPartition.load(directory, self.dimension)
+                self._partitions[namespace] = self._convert(partition, directory)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to load local index: {e}")
+
+    def _convert(self, partition, directory: str):
+        """Rebuild a loaded partition if it was persisted with another index type."""
+        if self.index_type == "hnsw":
+            matches = isinstance(partition, _HNSWPartition)
+        elif self.index_type == "segmented":
+            matches = isinstance(partition, _SegmentedPartition)
+        elif self.quantization != "none":
+            matches = isinstance(partition, _QuantizedPartition) and partition.mode == self.quantization
+        else:
+            matches = isinstance(partition, _FlatPartition)
+        if matches:
+            return partition
+
+        target = self.index_type if self.quantization == "none" else self.quantization
+        print(f"Converting local partition with {partition.count} vectors to {target}")
+        ids = partition.ids
+        vectors = partition.vectors_for(ids)
+        converted = self._new_partition(directory)
+        converted.upsert(ids, vectors, partition.metadata)
+        if self.autosave:
+            converted.save(directory)
+        return converted
+
+    def persist(self, namespace: Optional[str] = None) -> None:
+        """
+        Write the index to disk atomically.
+
+        Args:
+            namespace: Only persist this namespace (all namespaces if None)
+        """
+        # Copy the partitions under the store lock, but write them outside it
+        # so that queries and upserts are not blocked for the whole write
+        with self._persist_lock:
+            with self._lock:
+                self._acquire_writer()
+                namespaces = list(self._partitions) if namespace is None else [namespace]
+                writes = [
+                    (self._partitions[name].snapshot(), self._namespace_dir(name))
+                    for name in namespaces if name in self._partitions
+                ]
+            try:
+                for write, directory in writes:
+                    write(directory)
+            except Exception as e:
+                raise Exception(f"Failed to persist local index: {e}")
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows so that a dot product equals cosine similarity."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _upsert_vectors(self, ids: List[str], embeddings: np.ndarray,
+                        metadatas: List[Dict[str, Any]], namespace: str = "") -> None:
+        """
+        Insert or overwrite vectors in a namespace's matrix.
+
+        Args:
+            ids: Vector IDs
+            embeddings: float32 array with one row per ID
+            metadatas: Metadata dictionaries, one per ID
+            namespace: Namespace to write to
+        """
+        vectors = self._normalize(embeddings)
+
+        with self._lock:
+            self._acquire_writer()
+            partition = self._get_partition(namespace)
+            if partition is None:
+                partition = self._partitions[namespace] = self._new_partition(
+                    self._namespace_dir(namespace)
+                )
+            partition.upsert(ids, vectors, metadatas)
+            self._dirty.add(namespace)
+        print(f"   Successfully upserted {len(ids)} vectors")
+
+    def _query_vector(self, query_embedding: np.ndarray, top_k: int,
+                      filter_dict: Optional[Dict[str, Any]], namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Cosine search over one namespace's partition.
+
+        Args:
+            query_embedding: 1D float32 embedding of the query text
+            top_k: Number of results to return
+            filter_dict: Optional filter for metadata
+            namespace: Namespace to search
+
+        Returns:
+            List of dictionaries containing id, score, and metadata
+        """
+        query = self._normalize(query_embedding)
+
+        with self._lock:
+            partition = self._get_partition(namespace)
+            if partition is None:
+                return []
+            return partition.query(query, top_k, filter_dict)
+
+    def _delete(self, ids: List[str], namespace: str = "") -> bool:
+        """
+        Delete vectors by IDs.
+
+        Args:
+            ids: List of vector IDs to delete
+            namespace: Namespace holding the vectors
+
+        Returns:
+            True if successful
+        """
+        with self._lock:
+            self._acquire_writer()
+            partition = self._get_partition(namespace)
+            if partition is None:
+                return True
+            partition.delete(ids)
+            self._dirty.add(namespace)
+        return True
+
+    def _scan_metadata(self, namespace: str = "") -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Stream the IDs and metadata of every vector in a namespace.
+
+        Args:
+            namespace: Namespace to scan
+
+        Yields:
+            Lists of (vector ID, metadata)
+        """
+        with self._lock:
+            partition = self._get_partition(namespace)
+            if partition is None:
+                return
+            entries = list(zip(partition.ids, partition.metadata))
+        yield entries
+
+    def fetch(self, ids: List[str], namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        Fetch vectors by IDs.
+
+        Args:
+            ids: List of vector IDs to fetch
+            namespace: Namespace holding the vectors
+
+        Returns:
+            List of dictionaries containing id, values (normalized), and metadata
+        """
+        with self._lock:
+            partition = self._get_partition(namespace)
+            if partition is None:
+                return []
+            return partition.fetch(ids)
+
+    def compact(self) -> int:
+        """
+        Compact the segments of every segmented namespace that needs it.
+
+        Returns:
+            Number of namespaces that were compacted
+        """
+        with self._lock:
+            partitions = [
+                partition for partition in self._partitions.values()
+                if isinstance(partition, _SegmentedPartition)
+            ]
+
+        compacted = 0
+        for partition in partitions:
+            try:
+                if partition.compact():
+                    compacted += 1
+            except Exception as e:
+                print(f"❌ Error compacting segments in {partition.directory}: {e}")
+        return compacted
+
+    def _run_compactor(self, interval: float) -> None:
+        """Background loop that compacts segments every interval seconds."""
+        while not self._background_stop.wait(interval):
+            self.compact()
+
+    def flush(self) -> None:
+        """Persist every namespace changed since it was last persisted."""
+        if self._writer_pid is not None and self._writer_pid != os.getpid():
+            # A forked child inherited the parent's partitions but not its writer lock
+            return
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for namespace in dirty:
+            try:
+                self.persist(namespace)
+            except Exception as e:
+                # Retried on the next pass
+                with self._lock:
+                    self._dirty.add(namespace)
+                print(f"❌ Error persisting local namespace '{namespace}': {e}")
+
+    def _run_persister(self, interval: float) -> None:
+        """Background loop that persists changed namespaces every interval seconds."""
+        while not self._background_stop.wait(interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background threads, persist pending changes and release the writer lock."""
+        self._background_stop.set()
+        if self.autosave:
+            self.flush()
+        with self._lock:
+            if self._writer_file is not None and self._writer_pid == os.getpid():
+                self._writer_file.close()
+                self._writer_file = None
+                self._writer_pid = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dictionary with index statistics, including per-namespace vector counts
+        """
+        with self._lock:
+            namespaces = {
+                namespace: {"vector_count": partition.count, "memory_bytes": partition.memory_bytes}
+                for namespace, partition in self._partitions.items()
+            }
+            return {
+                "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+                "dimension": self.dimension,
+                "index_fullness": 0.0,
+                "namespaces": namespaces,
+                "reclaimed": self.reclaimed_stats()
+            }
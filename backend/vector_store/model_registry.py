@@ -0,0 +1,191 @@
+"""
+Process-wide registry of SentenceTransformer models.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import psutil
+from sentence_transformers import SentenceTransformer
+from config import Config
+
+# "torch" runs the PyTorch weights, "onnx" an exported ONNX graph on ONNX Runtime,
+# "onnx-int8" the same graph with dynamically int8-quantized weights
+INFERENCE_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class ModelRegistry:
+    """
+    Loads each SentenceTransformer model once per process and shares it.
+
+    Models are loaded lazily on first use. A per-model lock makes concurrent
+    first requests wait for a single load without blocking loads of other
+    models. Calling preload() before a pre-forking server (gunicorn --preload)
+    forks its workers lets them share the weights copy-on-write.
+
+    The same model can be loaded with several inference backends; each
+    (model, backend) pair is a separate entry.
+    """
+
+    def __init__(self, onnx_dir: Optional[str] = None, onnx_quantization: Optional[str] = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            onnx_dir: Directory for exported int8 ONNX models (defaults to Config.EMBEDDING_ONNX_DIR)
+            onnx_quantization: ONNX Runtime quantization config for "onnx-int8"
+                ("arm64", "avx2", "avx512" or "avx512_vnni"; defaults to Config.EMBEDDING_ONNX_QUANTIZATION)
+        """
+        self.onnx_dir = onnx_dir or Config.EMBEDDING_ONNX_DIR
+        self.onnx_quantization = onnx_quantization or Config.EMBEDDING_ONNX_QUANTIZATION
+
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._models: Dict[Tuple[str, str], SentenceTransformer] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, model_name: str, backend: str = "torch") -> SentenceTransformer:
+        """
+        Get a model, loading it on first use.
+
+        Args:
+            model_name: Name of the SentenceTransformer model
+            backend: Inference backend ("torch", "onnx" or "onnx-int8")
+
+        Returns:
+            The shared SentenceTransformer instance
+        """
+        key = (model_name, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Inference backend {backend} not supported. Use: {', '.join(INFERENCE_BACKENDS)}")
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(model_name, backend)
+        return model
+
+    def _load(self, model_name: str, backend: str) -> SentenceTransformer:
+        """Load a model and record its load time and memory; the caller holds its load lock."""
+        print(f"Loading model: {model_name} ({backend})...")
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        start = time.perf_counter()
+        try:
+            if backend == "torch":
+                model = SentenceTransformer(model_name)
+            elif backend == "onnx":
+                model = SentenceTransformer(model_name, backend="onnx")
+            else:
+                model = self._load_onnx_int8(model_name)
+        except Exception as e:
+            raise Exception(f"Failed to load model {model_name} ({backend}): {e}")
+        load_seconds = time.perf_counter() - start
+
+        stats = {
+            "backend": backend,
+            "load_seconds": load_seconds,
+            "rss_delta_bytes": process.memory_info().rss - rss_before,
+            # ONNX backends hold their weights in ONNX Runtime, outside of torch parameters
+            "parameter_bytes": sum(p.numel() * p.element_size() for p in model.parameters()),
+            "dimension": model.get_sentence_embedding_dimension(),
+            "loaded_at": time.time()
+        }
+        with self._lock:
+            self._models[(model_name, backend)] = model
+            self._stats[model_name if backend == "torch" else f"{model_name}@{backend}"] = stats
+        print(f"Model {model_name} ({backend}) loaded in {load_seconds:.1f}s "
+              f"(RSS +{stats['rss_delta_bytes'] / 2**20:.0f} MiB)")
+        return model
+
+    def _load_onnx_int8(self, model_name: str) -> SentenceTransformer:
+        """
+        Load the dynamically int8-quantized ONNX export of a model, exporting
+        and quantizing it into onnx_dir on first use.
+        """
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        export_dir = os.path.join(self.onnx_dir, model_name.replace("/", "__"))
+        file_name = f"onnx/model_qint8_{self.onnx_quantization}.onnx"
+        if not os.path.exists(os.path.join(export_dir, file_name)):
+            print(f"Exporting {model_name} to int8 ONNX ({self.onnx_quantization}) in {export_dir}...")
+            onnx_model = SentenceTransformer(model_name, backend="onnx")
+            onnx_model.save_pretrained(export_dir)
+            export_dynamic_quantized_onnx_model(onnx_model, self.onnx_quantization, export_dir)
+
+        return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": file_name})
+
+    def dimension(self, model_name: str, backend: str = "torch") -> int:
+        """
+        Get the embedding dimension of a model, loading it if needed.
+
+        Args:
+            model_name: Name of the SentenceTransformer model
+            backend: Inference backend to load it with
+
+        Returns:
+            Embedding dimension
+        """
+        return self.get(model_name, backend).get_sentence_embedding_dimension()
+
+    def preload(self, model_names: List[str], backend: str = "torch") -> None:
+        """
+        Load models ahead of time, e.g. in the gunicorn master before forking.
+
+        Args:
+            model_names: Names of the models to load
+            backend: Inference backend to load them with
+        """
+        for model_name in model_names:
+            self.get(model_name, backend)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-model load statistics.
+
+        Returns:
+            Dictionary with load time and memory per loaded model, plus process RSS
+        """
+        with self._lock:
+            models = {name: dict(stats) for name, stats in self._stats.items()}
+        return {
+            "models": models,
+            "process_rss_bytes": psutil.Process().memory_info().rss
+        }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Get the process-wide model registry.
+
+    Returns:
+        The shared ModelRegistry
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def preload_models(model_names: Optional[List[str]] = None) -> None:
+    """
+    Load the configured models into the registry.
+
+    Args:
+        model_names: Models to load (defaults to Config.PRELOAD_MODELS)
+    """
+    names = model_names if model_names is not None else Config.PRELOAD_MODELS
+    get_model_registry().preload(names, backend=Config.EMBEDDING_BACKEND)
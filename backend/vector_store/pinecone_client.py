@@ -0,0 +1,96 @@
+"""
+Process-wide Pinecone client and index handles, over REST or gRPC.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from config import Config
+
+load_dotenv()
+
+PINECONE_TRANSPORTS = ("rest", "grpc")
+
+# Per process: gRPC channels must not be shared across fork()
+_clients: Dict[Tuple[int, str], Any] = {}
+_indexes: Dict[Tuple[int, str, str], Any] = {}
+_lock = threading.Lock()
+
+
+def get_pinecone_client(transport: Optional[str] = None):
+    """
+    Get the shared Pinecone client of this process.
+
+    Args:
+        transport: "rest" or "grpc" (defaults to Config.PINECONE_TRANSPORT)
+
+    Returns:
+        A Pinecone (REST) or PineconeGRPC client
+
+    Raises:
+        ValueError: If the API key is missing or the transport is not supported
+    """
+    transport = (transport or Config.PINECONE_TRANSPORT).lower()
+    if transport not in PINECONE_TRANSPORTS:
+        raise ValueError(f"Pinecone transport {transport} not supported. Use: {', '.join(PINECONE_TRANSPORTS)}")
+
+    key = (os.getpid(), transport)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            api_key = os.getenv("PINECONE_API_KEY")
+            if not api_key:
+                raise ValueError("PINECONE_API_KEY not found in environment variables")
+            if transport == "grpc":
+                try:
+                    from pinecone.grpc import PineconeGRPC
+                except ImportError as e:
+                    raise Exception(f"Pinecone gRPC transport requires pinecone[grpc]: {e}")
+                client = PineconeGRPC(api_key=api_key)
+            else:
+                from pinecone import Pinecone
+                client = Pinecone(api_key=api_key)
+            _clients[key] = client
+        return client
+
+
+def get_index(name: str, transport: Optional[str] = None):
+    """
+    Get the shared data-plane handle of an index.
+
+    Every caller in the process reuses the same handle, and with it one
+    HTTP connection pool or one gRPC channel. The handle's thread pool
+    (Config.PINECONE_POOL_THREADS) runs async upsert batches.
+
+    Args:
+        name: Index name
+        transport: "rest" or "grpc" (defaults to Config.PINECONE_TRANSPORT)
+
+    Returns:
+        An Index (REST) or GRPCIndex
+    """
+    transport = (transport or Config.PINECONE_TRANSPORT).lower()
+    client = get_pinecone_client(transport)
+    key = (os.getpid(), transport, name)
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = client.Index(name, pool_threads=Config.PINECONE_POOL_THREADS)
+        return index
+
+
+def wait_all(requests) -> None:
+    """
+    Wait for async requests from either transport.
+
+    gRPC returns futures (result()), REST returns ApplyResults (get()).
+
+    Args:
+        requests: Results of calls made with async_req=True
+    """
+    for request in requests:
+        if hasattr(request, "result"):
+            request.result()
+        else:
+            request.get()
@@ -0,0 +1,88 @@
+"""
+Scalar (int8) and binary quantization of L2-normalized embeddings.
+"""
+
+from typing import Tuple
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# Bits set in every byte value, used to popcount XORed binary codes
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# Rows converted to float32 at a time while scoring int8 codes, bounding the temporary copy
+_SCORE_CHUNK_ROWS = 16384
+
+
+def code_size(dimension: int, mode: str) -> int:
+    """
+    Bytes stored in RAM per vector.
+
+    Args:
+        dimension: Vector dimension
+        mode: "none", "int8" or "binary"
+
+    Returns:
+        Size of one encoded vector in bytes
+    """
+    if mode == "int8":
+        return dimension + 4  # codes plus one float32 scale
+    if mode == "binary":
+        return (dimension + 7) // 8
+    return dimension * 4
+
+
+def quantize(vectors: np.ndarray, mode: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode float32 vectors.
+
+    int8 codes use one scale per vector (its largest absolute component maps
+    to 127), so no training data is needed. Binary codes keep the sign of
+    every component, packed 8 per byte.
+
+    Args:
+        vectors: float32 array of shape (n, dimension)
+        mode: "int8" or "binary"
+
+    Returns:
+        Tuple of (codes, scales); scales is empty for binary codes
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if mode == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    if mode == "binary":
+        return np.packbits(vectors > 0, axis=1), np.empty(0, dtype=np.float32)
+    raise ValueError(f"Quantization mode {mode} not supported. Use: int8, binary")
+
+
+def code_scores(codes: np.ndarray, scales: np.ndarray, query: np.ndarray, mode: str) -> np.ndarray:
+    """
+    Approximate similarity of a float32 query to every encoded vector.
+
+    int8 scores estimate the inner product; binary scores are the number of
+    matching signs, which ranks the same way as negative Hamming distance.
+
+    Args:
+        codes: Codes from quantize()
+        scales: Scales from quantize()
+        query: Normalized float32 query vector
+        mode: "int8" or "binary"
+
+    Returns:
+        float32 array with one score per code
+    """
+    count = codes.shape[0]
+    if mode == "int8":
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, _SCORE_CHUNK_ROWS):
+            end = min(start + _SCORE_CHUNK_ROWS, count)
+            scores[start:end] = codes[start:end].astype(np.float32) @ query
+        return scores * scales[:count]
+    if mode == "binary":
+        query_code = np.packbits(query > 0)
+        distances = _POPCOUNT[np.bitwise_xor(codes, query_code)].sum(axis=1, dtype=np.int32)
+        return (codes.shape[1] * 8 - distances).astype(np.float32)
+    raise ValueError(f"Quantization mode {mode} not supported. Use: int8, binary")
@@ -0,0 +1,265 @@
+"""
+Background retention job: ages out, caps and consolidates stored vectors by type.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import Config
+from .base import BaseVectorStore
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process runs its own retention job
+    fcntl = None
+
+# type -> (max age in seconds, max vectors per namespace); None means no limit
+Policies = Dict[str, Tuple[Optional[float], Optional[int]]]
+
+# Longest piece of a turn kept in a summary
+_SUMMARY_LINE_CHARS = 160
+
+
+def parse_retention_policies(spec: str) -> Policies:
+    """
+    Parse a policy spec such as "conversation:90:2000,email:180:".
+
+    Each entry is type:max_age_days:max_count; an empty field means no limit.
+
+    Args:
+        spec: Comma separated policies
+
+    Returns:
+        Policies by vector type
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    policies = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        parts = entry.split(":")
+        if len(parts) != 3 or not parts[0]:
+            raise ValueError(f"Invalid retention policy '{entry}'. Use: type:max_age_days:max_count")
+        kind, max_age_days, max_count = parts
+        policies[kind] = (
+            float(max_age_days) * 86400 if max_age_days else None,
+            int(max_count) if max_count else None
+        )
+    return policies
+
+
+def summarize_turns(texts: List[str]) -> str:
+    """
+    Extractive summary of conversation turns: the user's line and the first
+    sentence of the reply from each turn.
+
+    Args:
+        texts: Turns formatted as "User: ...\\nAssistant: ..."
+
+    Returns:
+        One consolidated text
+    """
+    lines = []
+    for text in texts:
+        user, _, reply = text.partition("\nAssistant:")
+        line = user.replace("User:", "", 1).strip()
+        reply = reply.strip().split(". ")[0]
+        if reply:
+            line = f"{line} -> {reply}"
+        lines.append("- " + line[:_SUMMARY_LINE_CHARS])
+    return f"Summary of {len(texts)} earlier conversation turns:\n" + "\n".join(lines)
+
+
+class RetentionService:
+    """
+    Periodically enforces retention policies on every namespace.
+
+    For each vector type, vectors older than the policy's max age and the
+    oldest vectors beyond its max count are bulk-deleted. Vectors without a
+    created_at timestamp (written before timestamps existed) are never aged
+    out. When summarizing, conversation turns are consolidated into "summary"
+    vectors before they are deleted.
+
+    With a lock file, only the process holding an exclusive lock on it runs
+    the background job, so pre-forked server workers do not scan and delete
+    the same namespaces concurrently. The others retry the lock every
+    interval and take over if the holder exits.
+    """
+
+    def __init__(self, vector_store: BaseVectorStore, policies: Policies,
+                 interval: float = 3600.0, summarize: bool = False, summary_group_size: int = 10,
+                 summarizer: Callable[[List[str]], str] = summarize_turns,
+                 lock_path: Optional[str] = None):
+        """
+        Initialize the service and start its thread if interval is positive.
+
+        Args:
+            vector_store: Vector store to enforce the policies on
+            policies: Policies by vector type
+            interval: Seconds between runs (0 disables the background thread)
+            summarize: Consolidate conversation turns before deleting them
+            summary_group_size: Turns consolidated into each summary vector
+            summarizer: Function turning a group of turns into one text
+            lock_path: Optional file whose lock holder is the only process running the job
+        """
+        self.vector_store = vector_store
+        self.policies = policies
+        self.interval = interval
+        self.summarize = summarize
+        self.summary_group_size = max(2, summary_group_size)
+        self.summarizer = summarizer
+        self.lock_path = lock_path
+        self._lock_file = None
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.runs = 0
+        self.deleted = 0
+        self.summaries = 0
+        self.last_run_seconds = 0.0
+        self.last_run_at = 0.0
+
+        if interval > 0 and policies:
+            threading.Thread(target=self._run, name="retention", daemon=True).start()
+
+    def _is_leader(self) -> bool:
+        """Whether this process holds the retention lock, taking it if it is free."""
+        if self._lock_file is not None or not self.lock_path or fcntl is None:
+            return True
+        directory = os.path.dirname(self.lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held until the process exits
+        self._lock_file = lock_file
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if self._is_leader():
+                    self.run_once()
+            except Exception as e:
+                print(f"❌ Retention run failed: {e}")
+
+    def stop(self) -> None:
+        """Stop the background thread after its current run."""
+        self._stop.set()
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """
+        Enforce every policy on every namespace once.
+
+        Args:
+            now: Current time in epoch seconds (defaults to time.time())
+
+        Returns:
+            Number of vectors deleted
+        """
+        with self._lock:
+            start = time.perf_counter()
+            now = time.time() if now is None else now
+            deleted = 0
+            for namespace in list(self.vector_store.get_stats()["namespaces"]):
+                for kind, (max_age, max_count) in self.policies.items():
+                    deleted += self._enforce(namespace, kind, max_age, max_count, now)
+
+            self.runs += 1
+            self.deleted += deleted
+            self.last_run_seconds = time.perf_counter() - start
+            self.last_run_at = now
+        if deleted:
+            print(f"✅ Retention deleted {deleted} vectors in {self.last_run_seconds:.1f}s")
+        return deleted
+
+    def _enforce(self, namespace: str, kind: str, max_age: Optional[float],
+                 max_count: Optional[int], now: float) -> int:
+        """Delete the vectors of one type in one namespace that the policy no longer keeps."""
+        entries = self.vector_store.scan({"type": kind, "created_at": {"$gte": 0}}, namespace)
+        entries.sort(key=lambda entry: entry[1]["created_at"])
+
+        expired = 0
+        if max_age is not None:
+            cutoff = now - max_age
+            while expired < len(entries) and entries[expired][1]["created_at"] < cutoff:
+                expired += 1
+        if max_count is not None:
+            expired = max(expired, len(entries) - max_count)
+        if not expired:
+            return 0
+
+        removed = entries[:expired]
+        if self.summarize and kind == "conversation":
+            self._consolidate(removed, namespace)
+        return self.vector_store.delete_entries(removed, namespace)
+
+    def _consolidate(self, entries: List[Tuple[str, Dict[str, Any]]], namespace: str) -> None:
+        """Write one summary vector per group of turns, oldest first; the caller holds the lock."""
+        groups = [entries[i:i + self.summary_group_size] for i in range(0, len(entries), self.summary_group_size)]
+        texts = [self.summarizer([metadata.get("text", "") for _, metadata in group]) for group in groups]
+        metadatas = [
+            # Summaries keep the age of their newest turn
+            {"type": "summary", "created_at": group[-1][1]["created_at"], "summarized_turns": len(group)}
+            for group in groups
+        ]
+        self.vector_store.upsert_texts(texts, namespace=namespace, metadatas=metadatas)
+        self.summaries += len(groups)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get retention run statistics.
+
+        Returns:
+            Dictionary with run counts, deletions and the store's reclaimed space
+        """
+        return {
+            "policies": {
+                kind: {"max_age_days": max_age / 86400 if max_age else None, "max_count": max_count}
+                for kind, (max_age, max_count) in self.policies.items()
+            },
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "summaries": self.summaries,
+            "last_run_seconds": self.last_run_seconds,
+            "last_run_at": self.last_run_at,
+            "leader": self._lock_file is not None or not self.lock_path or fcntl is None,
+            "reclaimed": self.vector_store.reclaimed_stats()
+        }
+
+
+_services: Dict[int, RetentionService] = {}
+_services_lock = threading.Lock()
+
+
+def get_retention_service(vector_store: BaseVectorStore) -> RetentionService:
+    """
+    Get the retention service of a vector store, starting it on first use.
+
+    Args:
+        vector_store: Vector store to enforce the policies on
+
+    Returns:
+        The RetentionService configured in Config
+    """
+    with _services_lock:
+        service = _services.get(id(vector_store))
+        if service is None:
+            service = RetentionService(
+                vector_store,
+                parse_retention_policies(Config.RETENTION_POLICIES),
+                interval=Config.RETENTION_INTERVAL,
+                summarize=Config.RETENTION_SUMMARIZE,
+                summary_group_size=Config.RETENTION_SUMMARY_GROUP_SIZE,
+                lock_path=Config.RETENTION_LOCK_PATH or None
+            )
+            _services[id(vector_store)] = service
+        return service
@@ -0,0 +1,144 @@
+"""
+Retrieval result cache with per-namespace write invalidation.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+
+class RetrievalCache:
+    """
+    Caches query results keyed by (namespace, query, top_k, filter).
+
+    Every namespace has a version counter that is part of the key. Upserts and
+    deletes bump the counter, so entries written before the change can never
+    be served again; they simply age out. Entries also expire after a TTL.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300.0):
+        """
+        Initialize the retrieval cache.
+
+        Args:
+            max_entries: Maximum number of cached result lists
+            ttl_seconds: Seconds after which an entry expires
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse case and whitespace so trivially different prompts share an entry."""
+        return re.sub(r"\s+", " ", text).strip().lower()
+
+    @staticmethod
+    def text_digest(text: str) -> str:
+        """Digest of a query text after normalization."""
+        return hashlib.sha256(RetrievalCache.normalize_text(text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def embedding_digest(embedding: np.ndarray) -> str:
+        """Digest of a query embedding, rounded so float noise maps to the same entry."""
+        rounded = np.round(np.asarray(embedding, dtype=np.float32), 4)
+        return hashlib.sha256(rounded.tobytes()).hexdigest()
+
+    def make_key(self, namespace: str, digest: str, top_k: int,
+                 filter_dict: Optional[Dict[str, Any]]) -> Tuple:
+        """
+        Build a cache key for the namespace's current version.
+
+        Args:
+            namespace: Namespace being searched
+            digest: Text or embedding digest of the query
+            top_k: Number of results requested
+            filter_dict: Optional metadata filter
+
+        Returns:
+            Hashable cache key
+        """
+        filter_key = json.dumps(filter_dict, sort_keys=True, default=str) if filter_dict else ""
+        with self._lock:
+            version = self._versions.get(namespace, 0)
+        return (namespace, version, digest, top_k, filter_key)
+
+    def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            A copy of the cached results, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(result) for result in entry[1]]
+
+    def put(self, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        """
+        Store results, unless the namespace changed since the key was built.
+
+        Args:
+            key: Key from make_key
+            results: Query results to cache
+        """
+        namespace, version = key[0], key[1]
+        with self._lock:
+            if self._versions.get(namespace, 0) != version:
+                return
+            self._entries[key] = (time.monotonic(), [dict(result) for result in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str) -> None:
+        """
+        Invalidate every cached result for a namespace.
+
+        Args:
+            namespace: Namespace that was written to
+        """
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and the current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl
+            }
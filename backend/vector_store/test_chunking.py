@@ -0,0 +1,46 @@
+"""
+Chunking of streamed and whole documents.
+"""
+
+import pytest
+from vector_store.chunking import StreamingChunker, chunk_text
+
+TEXT = " ".join(
+    f"Sentence {i} talks about topic {i % 7} in some detail." + ("\n\n" if i % 11 == 0 else "")
+    for i in range(300)
+)
+
+
+def _stream(text, feed_size, **kwargs):
+    chunker = StreamingChunker(**kwargs)
+    chunks = []
+    for start in range(0, len(text), feed_size):
+        chunks.extend(chunker.feed(text[start:start + feed_size]))
+    return chunks + chunker.close()
+
+
+@pytest.mark.parametrize("feed_size", [1, 7, 64, 4096])
+def test_stream_output_does_not_depend_on_feed_size(feed_size):
+    expected = _stream(TEXT, len(TEXT), max_tokens=40, overlap_tokens=8)
+    assert _stream(TEXT, feed_size, max_tokens=40, overlap_tokens=8) == expected
+
+
+def test_stream_matches_chunk_text():
+    assert _stream(TEXT, 13, max_tokens=40, overlap_tokens=8) == chunk_text(TEXT, max_tokens=40, overlap_tokens=8)
+
+
+def test_chunks_respect_max_tokens_and_cover_the_text():
+    count_tokens = lambda text: len(text.split())
+    chunks = _stream(TEXT, 100, max_tokens=30, overlap_tokens=6, count_tokens=count_tokens)
+
+    assert all(count_tokens(chunk) <= 30 for chunk in chunks)
+    for i in range(300):
+        assert any(f"Sentence {i} " in chunk for chunk in chunks)
+
+
+def test_unterminated_text_is_cut_at_word_boundaries():
+    text = "word " * 5000
+    chunks = _stream(text, 333, max_tokens=20, overlap_tokens=0, count_tokens=lambda t: len(t.split()))
+
+    assert chunks
+    assert all(set(chunk.split()) == {"word"} for chunk in chunks)
@@ -0,0 +1,115 @@
+"""
+Round trips of the on-disk local index partitions.
+"""
+
+import numpy as np
+import pytest
+from vector_store.hnsw import HNSWIndex
+from vector_store.local_store import _QuantizedPartition, _SegmentedPartition
+
+DIMENSION = 16
+
+
+def _vectors(n, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _ids(n, prefix="v"):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+def test_segmented_upsert_delete_compact_reload(tmp_path):
+    vectors = _vectors(40)
+    ids = _ids(40)
+    partition = _SegmentedPartition(DIMENSION, str(tmp_path), max_segments=2, max_deleted_ratio=0.3)
+    for start in range(0, 40, 10):
+        partition.upsert(ids[start:start + 10], vectors[start:start + 10],
+                         [{"i": i} for i in range(start, start + 10)])
+    partition.delete(ids[:15])
+    # Overwriting an ID tombstones its old row
+    partition.upsert(["v20"], vectors[:1], [{"i": -1}])
+
+    assert partition.compact()
+    assert len(partition.segments) <= 2
+
+    reloaded = _SegmentedPartition.load(str(tmp_path), DIMENSION)
+    assert sorted(reloaded.ids) == sorted(ids[15:])
+    np.testing.assert_allclose(reloaded.vectors_for(ids[21:]), vectors[21:])
+    np.testing.assert_allclose(reloaded.vectors_for(["v20"]), vectors[:1])
+    assert reloaded.fetch(["v20"])[0]["metadata"] == {"i": -1}
+    assert reloaded.query(vectors[30], 1, None)[0]["id"] == "v30"
+
+
+def test_segmented_sees_writes_of_another_instance(tmp_path):
+    vectors = _vectors(4)
+    writer = _SegmentedPartition(DIMENSION, str(tmp_path))
+    reader = _SegmentedPartition(DIMENSION, str(tmp_path))
+    writer.upsert(_ids(4), vectors, [{}] * 4)
+    writer.delete(["v0"])
+
+    reader.refresh()
+    assert sorted(reader.ids) == _ids(4)[1:]
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_delete_then_reload(tmp_path, mode):
+    vectors = _vectors(100)
+    ids = _ids(100)
+    partition = _QuantizedPartition(DIMENSION, str(tmp_path), mode)
+    partition.upsert(ids, vectors, [{"i": i} for i in range(100)])
+    partition.delete(ids[:30])
+    partition.save(str(tmp_path))
+
+    reloaded = _QuantizedPartition.load(str(tmp_path), DIMENSION)
+    assert reloaded.ids == partition.ids
+    np.testing.assert_allclose(reloaded.vectors_for(ids[30:]), vectors[30:])
+    assert reloaded.query(vectors[50], 1, None)[0]["id"] == "v50"
+
+
+def test_quantized_unsaved_changes_keep_saved_vectors_intact(tmp_path):
+    vectors = _vectors(50)
+    ids = _ids(50)
+    partition = _QuantizedPartition(DIMENSION, str(tmp_path))
+    partition.upsert(ids, vectors, [{}] * 50)
+    partition.save(str(tmp_path))
+
+    # Changes after the last save, as if the process then crashed
+    partition.delete(ids[:25])
+    partition.upsert(["v40"], vectors[:1], [{}])
+    partition.vectors.flush()
+
+    reloaded = _QuantizedPartition.load(str(tmp_path), DIMENSION)
+    np.testing.assert_allclose(reloaded.vectors_for(ids), vectors)
+
+
+def test_quantized_compacts_rewritten_rows(tmp_path):
+    vectors = _vectors(20)
+    ids = _ids(20)
+    partition = _QuantizedPartition(DIMENSION, str(tmp_path))
+    partition.MIN_COMPACT_ROWS = 10
+    for _ in range(3):
+        partition.upsert(ids, vectors, [{}] * 20)
+    partition.save(str(tmp_path))
+
+    assert partition.vector_count == 20
+    reloaded = _QuantizedPartition.load(str(tmp_path), DIMENSION)
+    np.testing.assert_allclose(reloaded.vectors_for(ids), vectors)
+
+
+def test_hnsw_rebuild_drops_tombstones(tmp_path):
+    vectors = _vectors(200)
+    ids = _ids(200)
+    index = HNSWIndex(DIMENSION, M=8, ef_construction=64, ef_search=64)
+    index.add(ids, vectors)
+    index.remove(ids[:150])
+    index.rebuild()
+
+    assert index.count == len(index) == 50
+    assert index.search(vectors[180], 1)[0][0] == "v180"
+    assert all(label in ids[150:] for label, _ in index.search(vectors[0], 10))
+
+    path = str(tmp_path / "hnsw.npz")
+    index.save(path)
+    reloaded = HNSWIndex.load(path)
+    assert reloaded.search(vectors[180], 1)[0][0] == "v180"
@@ -0,0 +1,34 @@
+"""
+Hybrid retrieval fusion and near-duplicate detection.
+"""
+
+from vector_store.dedup import NearDuplicateIndex, simhash
+from vector_store.lexical import reciprocal_rank_fusion
+
+
+def _results(*ids):
+    return [{"id": doc_id, "score": 1.0, "metadata": {"text": doc_id}} for doc_id in ids]
+
+
+def test_rrf_ranks_documents_found_by_both_lists_first():
+    fused = reciprocal_rank_fusion([_results("a", "b", "c"), _results("c", "d", "a")], top_k=3)
+
+    assert [result["id"] for result in fused] == ["a", "c", "b"]
+    assert fused[0]["score"] == 1 / 61 + 1 / 63
+    assert fused[0]["metadata"] == {"text": "a"}
+
+
+def test_rrf_truncates_to_top_k():
+    assert len(reciprocal_rank_fusion([_results("a", "b", "c")], top_k=2)) == 2
+
+
+def test_simhash_finds_near_duplicates_only():
+    text = "The quarterly planning meeting moved to Thursday afternoon in the large conference room"
+    index = NearDuplicateIndex(max_distance=3)
+    index.add(["doc"], [text])
+
+    assert index.find(simhash(text + ".")) == "doc"
+    assert index.find(simhash("Lunch with the design team is on Friday at the Italian place downtown")) is None
+
+    index.remove(["doc"])
+    assert index.find(simhash(text)) is None
@@ -1,22 +1,31 @@
 import os
-import uuid
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+import numpy as np
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec
-from .embeddings import EmbeddingManager
+from pinecone import ServerlessSpec
+from config import Config
+from .base import BaseVectorStore
+from .document_store import DocumentStore
+from .pinecone_client import get_index, get_pinecone_client, wait_all
 
 load_dotenv()
 
-class PineconeVectorStore:
+class PineconeVectorStore(BaseVectorStore):
     """
     Pinecone Vector Store for storing and retrieving embeddings using SentenceTransformers.
+
+    With a document store, chunk texts are kept locally and Pinecone only
+    stores IDs and filter fields; query results are hydrated with one
+    batched local lookup.
     """
     
     def __init__(self, index_name: str = "adaptlm-index",
                 model_name: str = "all-MiniLM-L6-v2",
                 environment: str = "us-east-1", 
-                cloud: str = "aws"
+                cloud: str = "aws",
+                document_store_dir: Optional[str] = None,
+                transport: Optional[str] = None
                 ):
         """
         Initialize Pinecone Vector Store.
@@ -27,33 +36,51 @@ class PineconeVectorStore:
             model_name: Name of the SentenceTransformer model to use
             environment: Environment of the Pinecone index
             cloud: Cloud provider of the Pinecone index
+            document_store_dir: Directory for the local text store (None keeps texts in Pinecone metadata)
+            transport: "rest" or "grpc" (defaults to Config.PINECONE_TRANSPORT)
         """
-        self.index_name = index_name
-        self.model_name = model_name
         self.environment = environment
         self.cloud = cloud
+        self.transport = (transport or Config.PINECONE_TRANSPORT).lower()
+
+        self.document_store = None
+        if document_store_dir:
+            self.document_store = DocumentStore(
+                os.path.join(document_store_dir, f"{index_name.lower().replace('_', '')}.sqlite3")
+            )
 
         self.api_key = os.getenv("PINECONE_API_KEY")
         
         if not self.api_key:
             raise ValueError("PINECONE_API_KEY not found in environment variables")
         
-        # Initialize Pinecone
-        self.pc = Pinecone(api_key=self.api_key)
+        # Shared per-process client (one connection pool or gRPC channel)
+        self.pc = get_pinecone_client(self.transport)
         
         # Initialize embedding manager first to get the actual dimension
-        self.embedding_manager = EmbeddingManager(model_name=model_name)
-        
-        # NOTE: Not used right now
-        self.dimension = self.embedding_manager.dimension
-
-        # Use the embedding model's actual dimension if not specified
-        self.dimension = self.embedding_manager.dimension
+        super().__init__(index_name=index_name, model_name=model_name)
             
         print(f"Using dimension: {self.dimension} (from model: {model_name})")
         
         # Get or create index
         self.index = self._get_or_create_index()
+
+        if self.document_store is not None:
+            self._load_local_indexes()
+
+    def _load_local_indexes(self) -> None:
+        """Rebuild the lexical and near-duplicate indexes from the document store."""
+        count = 0
+        for namespace in self.document_store.namespaces():
+            for rows in self.document_store.iter_namespace(namespace):
+                self._index_texts(
+                    [doc_id for doc_id, _ in rows],
+                    [metadata["text"] for _, metadata in rows],
+                    [metadata for _, metadata in rows],
+                    namespace
+                )
+                count += len(rows)
+        print(f"Loaded {count} texts from document store '{self.document_store.path}'")
     
     def _get_or_create_index(self):
         """Get existing index or create a new one."""
@@ -61,7 +88,7 @@ class PineconeVectorStore:
             index_username = self.index_name.lower().replace("_", "")
             # Check if index exists
             if index_username in [idx.name for idx in self.pc.list_indexes()]:
-                return self.pc.Index(index_username)
+                return get_index(index_username, self.transport)
             else:
                 # Create new index
                 self.pc.create_index(
@@ -73,73 +100,100 @@ class PineconeVectorStore:
                 # Wait for index to be ready
                 print(f"Creating index '{index_username}' with dimension {self.dimension}...")
                 time.sleep(5)  # Give it a moment to start
-                return self.pc.Index(index_username)
+                return get_index(index_username, self.transport)
         except Exception as e:
             raise Exception(f"Failed to initialize Pinecone index: {e}")
     
-    def upsert_texts(self, texts: List[str], 
-                    ids: Optional[List[str]] = None) -> List[str]:
+    def _upsert_vectors(self, ids: List[str], embeddings: np.ndarray,
+                        metadatas: List[Dict[str, Any]], namespace: str = "") -> None:
         """
-        Upsert texts into the vector store using SentenceTransformers embeddings.
+        Upsert precomputed embeddings into Pinecone.
         
         Args:
-            texts: List of text strings to embed and store
-            ids: Optional list of IDs for the vectors
-            
-        Returns:
-            List of vector IDs
+            ids: Vector IDs
+            embeddings: float32 array with one row per ID
+            metadatas: Metadata dictionaries, one per ID
+            namespace: Pinecone namespace to write to
         """
-        if not texts:
-            return []
-        
-        print(f"   Generating embeddings for {len(texts)} texts...")
-        # Generate embeddings using SentenceTransformers
-        embeddings = self.embedding_manager.embed_texts(texts)
-        
-        # Generate IDs if not provided
-        if ids is None:
-            ids = [str(uuid.uuid4()) for _ in texts]
-        
-        # Prepare vectors for upsert
+        previous = None
+        if self.document_store is not None:
+            # Texts are stored first, so a vector is never returned without its text
+            filter_fields = [{k: v for k, v in metadata.items() if k != "text"} for metadata in metadatas]
+            try:
+                previous = self.document_store.get(ids, namespace)
+                self.document_store.put(
+                    ids, [metadata.get("text", "") for metadata in metadatas], filter_fields, namespace
+                )
+            except Exception as e:
+                raise Exception(f"Failed to store documents: {e}")
+            metadatas = filter_fields
+
+        # Prepare vectors for upsert; the request body is the only place lists are built
         vectors = []
-        for i, (embedding, vector_id) in enumerate(zip(embeddings, ids)):
-            vectors.append({
-                "id": vector_id,
-                "values": embedding,
-                "metadata": {"text": texts[i]}
-            })
+        for embedding, vector_id, metadata in zip(embeddings.tolist(), ids, metadatas):
+            vector = {"id": vector_id, "values": embedding}
+            if metadata:
+                vector["metadata"] = metadata
+            vectors.append(vector)
         
-        # Upsert to Pinecone
+        # Upsert to Pinecone; large upserts are split into batches sent in parallel
+        batch_size = Config.PINECONE_UPSERT_BATCH_SIZE
         try:
-            self.index.upsert(vectors=vectors)
+            if len(vectors) <= batch_size:
+                self.index.upsert(vectors=vectors, namespace=namespace)
+            else:
+                wait_all([
+                    self.index.upsert(vectors=vectors[start:start + batch_size], namespace=namespace, async_req=True)
+                    for start in range(0, len(vectors), batch_size)
+                ])
             print(f"   Successfully upserted {len(vectors)} vectors")
-            return ids
         except Exception as e:
             print(f"   Error upserting vectors: {e}")
+            if previous is not None:
+                self._restore_documents(ids, previous, namespace)
             raise Exception(f"Failed to upsert vectors: {e}")
+
+    def _restore_documents(self, ids: List[str], previous: Dict[str, Dict[str, Any]],
+                           namespace: str = "") -> None:
+        """
+        Undo the document store writes of a failed upsert: drop the new
+        entries and put back the ones they replaced.
+        """
+        try:
+            self.document_store.delete([vector_id for vector_id in ids if vector_id not in previous], namespace)
+            if previous:
+                restored = list(previous)
+                self.document_store.put(
+                    restored,
+                    [previous[vector_id].get("text", "") for vector_id in restored],
+                    [{k: v for k, v in previous[vector_id].items() if k != "text"} for vector_id in restored],
+                    namespace
+                )
+        except Exception as e:
+            print(f"   Error rolling back stored documents: {e}")
     
-    def query(self, query_text: str, top_k: int = 7, filter_dict: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def _query_vector(self, query_embedding: np.ndarray, top_k: int,
+                      filter_dict: Optional[Dict[str, Any]], namespace: str = "") -> List[Dict[str, Any]]:
         """
-        Query the vector store for similar texts using SentenceTransformers embeddings.
+        Query Pinecone for vectors similar to a query embedding.
         
         Args:
-            query_text: Text to search for
+            query_embedding: 1D float32 embedding of the query text
             top_k: Number of results to return
             filter_dict: Optional filter for metadata
+            namespace: Pinecone namespace to search
             
         Returns:
             List of dictionaries containing id, score, and metadata
         """
-        # Generate query embedding using SentenceTransformers
-        query_embedding = self.embedding_manager.embed_texts([query_text])[0]
-        
-        # Query Pinecone
+        # Query Pinecone; with a document store only IDs and scores come back
         try:
             results = self.index.query(
-                vector=query_embedding,
+                vector=query_embedding.tolist(),
                 top_k=top_k,
-                include_metadata=True,
-                filter=filter_dict
+                include_metadata=self.document_store is None,
+                filter=filter_dict,
+                namespace=namespace
             )
             print(f"   Pinecone returned {len(results.matches)} matches")
             
@@ -151,25 +205,49 @@ class PineconeVectorStore:
                     "score": match.score,
                     "metadata": match.metadata
                 })
-            
-            return formatted_results
-            
         except Exception as e:
             print(f"   Error querying Pinecone: {e}")
             raise Exception(f"Failed to query vectors: {e}")
-    
-    def delete(self, ids: List[str]) -> bool:
+
+        if self.document_store is not None:
+            self._hydrate(formatted_results, namespace)
+        return formatted_results
+
+    def _hydrate(self, results: List[Dict[str, Any]], namespace: str = "") -> None:
+        """
+        Fill in result metadata from the document store in one batched lookup.
+        Vectors written before the document store existed still carry their
+        text in Pinecone and are fetched from there instead.
+        """
+        try:
+            documents = self.document_store.get([result["id"] for result in results], namespace)
+            missing = [result["id"] for result in results if result["id"] not in documents]
+            if missing:
+                fetched = self.index.fetch(ids=missing, namespace=namespace)
+                for vector_id, vector in fetched.vectors.items():
+                    documents[vector_id] = vector.metadata or {}
+        except Exception as e:
+            print(f"   Error hydrating query results: {e}")
+            raise Exception(f"Failed to query vectors: {e}")
+
+        for result in results:
+            result["metadata"] = {**(result["metadata"] or {}), **documents.get(result["id"], {})}
+
+    def _delete(self, ids: List[str], namespace: str = "") -> bool:
         """
         Delete vectors by IDs.
         
         Args:
             ids: List of vector IDs to delete
+            namespace: Pinecone namespace holding the vectors
             
         Returns:
             True if successful
         """
         try:
-            self.index.delete(ids=ids)
+            self.index.delete(ids=ids, namespace=namespace)
+            if self.document_store is not None:
+                self.document_store.delete(ids, namespace)
             return True
         except Exception as e:
             raise Exception(f"Failed to delete vectors: {e}")
@@ -181,7 +259,7 @@ class PineconeVectorStore:
         Get index statistics.
         
         Returns:
-            Dictionary with index statistics
+            Dictionary with index statistics, including per-namespace vector counts
         """
         try:
             stats = self.index.describe_index_stats()
@@ -189,28 +267,51 @@ class PineconeVectorStore:
                 "total_vector_count": stats.total_vector_count,
                 "dimension": stats.dimension,
                 "index_fullness": stats.index_fullness,
-                "namespaces": stats.namespaces
+                "namespaces": {
+                    name: {"vector_count": summary.vector_count}
+                    for name, summary in stats.namespaces.items()
+                },
+                "reclaimed": self.reclaimed_stats()
             }
         except Exception as e:
             raise Exception(f"Failed to get index stats: {e}")
     
-    def fetch(self, ids: List[str]) -> List[Dict[str, Any]]:
+    def _scan_metadata(self, namespace: str = "") -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Stream the IDs and metadata of every vector in a namespace from the
+        document store (Pinecone cannot list metadata).
+        
+        Args:
+            namespace: Pinecone namespace to scan
+            
+        Yields:
+            Lists of (vector ID, metadata)
+        """
+        if self.document_store is None:
+            raise Exception("Scanning Pinecone vectors requires a document store (set DOCUMENT_STORE_DIR)")
+        yield from self.document_store.iter_namespace(namespace)
+    
+    def fetch(self, ids: List[str], namespace: str = "") -> List[Dict[str, Any]]:
         """
         Fetch vectors by IDs.
         
         Args:
             ids: List of vector IDs to fetch
+            namespace: Pinecone namespace holding the vectors
             
         Returns:
             List of dictionaries containing id, values, and metadata
         """
         try:
-            results = self.index.fetch(ids=ids)
+            results = self.index.fetch(ids=ids, namespace=namespace)
+            documents = {}
+            if self.document_store is not None:
+                documents = self.document_store.get(list(results.vectors), namespace)
             return [
                 {
                     "id": vector_id,
                     "values": vector.values,
-                    "metadata": vector.metadata
+                    "metadata": {**(vector.metadata or {}), **documents.get(vector_id, {})}
                 }
                 for vector_id, vector in results.vectors.items()
             ]
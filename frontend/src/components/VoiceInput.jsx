@@ -2,6 +2,7 @@ import { useState, useEffect, useRef } from 'react'
 import { FaMicrophone, FaMicrophoneSlash, FaVolumeUp } from 'react-icons/fa'
 import { TbRefresh } from "react-icons/tb";
 import { useVoice, fetchVoiceLLM, fetchContext } from '../contexts/VoiceContext'
+import { useAuth } from '../contexts/AuthContext'
 import vapi from '../vapi'
 
 const VoiceInput = ({ onMessageReceived, isListening, setIsListening, isVoiceMode, onVoiceModeToggle, onVoiceMessage }) => {
@@ -14,6 +15,8 @@ const VoiceInput = ({ onMessageReceived, isListening, setIsListening, isVoiceMod
   const [context, setContext] = useState(["This is a placeholder context. RAG pipeline not yet implemented."])
   const [lastUserMessage, setLastUserMessage] = useState('')
   const { selectedVoice } = useVoice()
+  const { currentUser } = useAuth()
+  const uid = currentUser?.uid || 'anonymous'
 
   // Fetch voice LLM and context on component mount and when needed
   useEffect(() => {
@@ -23,7 +26,7 @@ const VoiceInput = ({ onMessageReceived, isListening, setIsListening, isVoiceMod
     }
 
     const getContext = async () => {
-      const ctx = await fetchContext()
+      const ctx = await fetchContext(uid)
       setContext(ctx || ["This is a placeholder context. RAG pipeline not yet implemented."])
     }
 
@@ -36,7 +39,7 @@ const VoiceInput = ({ onMessageReceived, isListening, setIsListening, isVoiceMod
     const llm = await fetchVoiceLLM()
     setVoiceLLM(llm || 'gpt')
     
-    const ctx = await fetchContext()
+    const ctx = await fetchContext(uid)
     setContext(ctx || ["This is a placeholder context. RAG pipeline not yet implemented."])
     await stopCall()
   }
@@ -52,7 +55,9 @@ const VoiceInput = ({ onMessageReceived, isListening, setIsListening, isVoiceMod
           'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-          context: conversation_pair
+          context: conversation_pair,
+          uid,
+          type: 'conversation'
         })
       })
 
@@ -25,9 +25,9 @@ export const fetchVoiceLLM = async () => {
   }
 }
 
-export const fetchContext = async () => {
+export const fetchContext = async (uid = 'anonymous') => {
   try {
-    const response = await fetch('http://localhost:8080/api/get_context')
+    const response = await fetch(`http://localhost:8080/api/get_context?uid=${encodeURIComponent(uid)}`)
     const data = await response.json()
     return data.context
   } catch (error) {
@@ -36,14 +36,14 @@ export const fetchContext = async () => {
   }
 }
 
-export const postContext = async (context) => {
+export const postContext = async (context, uid = 'anonymous') => {
   try {
     const response = await fetch('http://localhost:8080/api/post_context', {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json'
       },
-      body: JSON.stringify({ context })
+      body: JSON.stringify({ context, uid })
     })
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`)